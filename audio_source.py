@@ -0,0 +1,437 @@
+import time
+import wave
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from resampler import StreamingResampler
+
+
+def load_wav(path: Path | str) -> tuple[np.ndarray, int]:
+    """
+    Read a 16-bit PCM WAV file.
+
+    Args:
+        path (Path | str): Path to the WAV file.
+
+    Returns:
+        tuple[np.ndarray, int]: Mono int16 samples (channels are averaged) and the sample rate.
+
+    Raises:
+        ValueError: If the file is not 16-bit PCM.
+    """
+    with wave.open(str(path), "rb") as wav_file:
+        if wav_file.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported.")
+        channels = wav_file.getnchannels()
+        sample_rate = wav_file.getframerate()
+        samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return samples, sample_rate
+
+
+class AudioInputStream:
+    """
+    An open capture stream returned by AudioSource.open_stream().
+    """
+
+    def read(self, num_frames: int) -> bytes:
+        """
+        Block until num_frames int16 frames are available and return them.
+
+        Args:
+            num_frames (int): Number of frames to read.
+
+        Returns:
+            bytes: Raw little-endian int16 PCM.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Stop and release the stream.
+        """
+
+
+class AudioSource:
+    """
+    Interface of an audio capture backend (microphone, file replay, generator).
+
+    The recorder, the microphone selector, the wake word detector and the shared
+    capture service only talk to this interface, so the whole pipeline can run
+    without sound hardware.
+    """
+
+    def list_input_devices(self) -> list[dict]:
+        """
+        List the available input devices.
+
+        Returns:
+            list[dict]: One dict per device with 'index', 'name', 'channels' and 'sample_rate'.
+        """
+        raise NotImplementedError
+
+    def is_format_supported(self, sample_rate: int, device_index: Optional[int] = None, channels: int = 1) -> bool:
+        """
+        Tell whether a stream can be opened natively at this rate.
+
+        Args:
+            sample_rate (int): Requested sample rate in Hz.
+            device_index (int | None): Input device index.
+            channels (int): Number of channels.
+
+        Returns:
+            bool: True if supported.
+        """
+        raise NotImplementedError
+
+    def default_sample_rate(self, device_index: Optional[int] = None) -> int:
+        """
+        Return the preferred sample rate of a device.
+
+        Args:
+            device_index (int | None): Input device index.
+
+        Returns:
+            int: Sample rate in Hz.
+        """
+        raise NotImplementedError
+
+    def open_stream(
+        self,
+        sample_rate: int,
+        chunk_size: int,
+        channels: int = 1,
+        device_index: Optional[int] = None
+    ) -> AudioInputStream:
+        """
+        Open a blocking int16 capture stream.
+
+        Args:
+            sample_rate (int): Sample rate in Hz.
+            chunk_size (int): Frames per buffer.
+            channels (int): Number of channels.
+            device_index (int | None): Input device index.
+
+        Returns:
+            AudioInputStream: The open stream.
+        """
+        raise NotImplementedError
+
+    def terminate(self) -> None:
+        """
+        Release the backend.
+        """
+
+
+class _PyAudioInputStream(AudioInputStream):
+    def __init__(self, stream) -> None:
+        self._stream = stream
+
+    def read(self, num_frames: int) -> bytes:
+        return self._stream.read(num_frames, exception_on_overflow=False)
+
+    def close(self) -> None:
+        self._stream.stop_stream()
+        self._stream.close()
+
+
+class PyAudioSource(AudioSource):
+    """
+    Live microphone capture through PyAudio. One PortAudio instance is reused for every stream.
+    """
+
+    def __init__(self) -> None:
+        import pyaudio
+
+        self._pyaudio = pyaudio
+        self._audio = None
+        self._lock = threading.Lock()
+
+    @property
+    def audio(self):
+        """
+        The underlying pyaudio.PyAudio instance, created on first use.
+        """
+        with self._lock:
+            if self._audio is None:
+                self._audio = self._pyaudio.PyAudio()
+            return self._audio
+
+    def list_input_devices(self) -> list[dict]:
+        devices = []
+        info = self.audio.get_host_api_info_by_index(0)
+        for i in range(info.get('deviceCount')):
+            device_info = self.audio.get_device_info_by_host_api_device_index(0, i)
+            if device_info.get('maxInputChannels') > 0:
+                devices.append({
+                    'index': i,
+                    'name': device_info.get('name'),
+                    'channels': device_info.get('maxInputChannels'),
+                    'sample_rate': device_info.get('defaultSampleRate')
+                })
+        return devices
+
+    def is_format_supported(self, sample_rate: int, device_index: Optional[int] = None, channels: int = 1) -> bool:
+        try:
+            return self.audio.is_format_supported(
+                sample_rate,
+                input_device=device_index,
+                input_channels=channels,
+                input_format=self._pyaudio.paInt16
+            )
+        except ValueError:
+            return False
+
+    def default_sample_rate(self, device_index: Optional[int] = None) -> int:
+        if device_index is None:
+            device_info = self.audio.get_default_input_device_info()
+        else:
+            device_info = self.audio.get_device_info_by_index(device_index)
+        return int(device_info.get('defaultSampleRate'))
+
+    def open_stream(
+        self,
+        sample_rate: int,
+        chunk_size: int,
+        channels: int = 1,
+        device_index: Optional[int] = None
+    ) -> AudioInputStream:
+        stream = self.audio.open(
+            format=self._pyaudio.paInt16,
+            channels=channels,
+            rate=sample_rate,
+            input=True,
+            frames_per_buffer=chunk_size,
+            input_device_index=device_index
+        )
+        return _PyAudioInputStream(stream)
+
+    def terminate(self) -> None:
+        with self._lock:
+            if self._audio is not None:
+                self._audio.terminate()
+                self._audio = None
+
+
+class _BufferInputStream(AudioInputStream):
+    def __init__(self, source: "_BufferAudioSource", sample_rate: int, channels: int) -> None:
+        self._source = source
+        source._samples_at(sample_rate)  # Resample once, before the first read
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self._start_time = time.monotonic()
+        self._frames_read = 0
+
+    def read(self, num_frames: int) -> bytes:
+        if self._source.speed:
+            # Pace the replay: frame N is not delivered before N / rate / speed seconds
+            due = self._start_time + (self._frames_read + num_frames) / self._sample_rate / self._source.speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self._frames_read += num_frames
+
+        # Looked up on every read: FileAudioSource.load() may replace the signal
+        chunk = self._source._take(self._source._samples_at(self._sample_rate), self._sample_rate, num_frames)
+        if self._channels > 1:
+            chunk = np.repeat(chunk, self._channels)
+        return chunk.tobytes()
+
+
+class _BufferAudioSource(AudioSource):
+    """
+    Common logic of the sources replaying an in-memory signal.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_rate: int, speed: float = 1.0, at_end: str = "silence") -> None:
+        if at_end not in ("silence", "loop", "stop"):
+            raise ValueError("at_end must be 'silence', 'loop' or 'stop'.")
+        self.sample_rate = int(sample_rate)
+        self.speed = speed
+        self.at_end = at_end
+        self._samples = np.ascontiguousarray(samples, dtype=np.int16)
+        self._resampled: dict[int, np.ndarray] = {self.sample_rate: self._samples}
+        self._position = 0.0  # Seconds consumed, shared by every stream opened on this source
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self) -> float:
+        """
+        Length of the signal in seconds.
+        """
+        return len(self._samples) / self.sample_rate
+
+    @property
+    def exhausted(self) -> bool:
+        """
+        True once the whole signal has been delivered (never for at_end='loop').
+        """
+        return self.at_end != "loop" and self._position >= self.duration
+
+    def rewind(self) -> None:
+        """
+        Restart the replay from the beginning.
+        """
+        with self._lock:
+            self._position = 0.0
+
+    def _samples_at(self, sample_rate: int) -> np.ndarray:
+        with self._lock:
+            if sample_rate not in self._resampled:
+                resampler = StreamingResampler(self.sample_rate, sample_rate)
+                self._resampled[sample_rate] = np.concatenate((resampler.process(self._samples), resampler.flush()))
+            return self._resampled[sample_rate]
+
+    def _take(self, samples: np.ndarray, sample_rate: int, num_frames: int) -> np.ndarray:
+        with self._lock:
+            start = int(round(self._position * sample_rate))
+            if self.at_end == "loop" and len(samples):
+                start %= len(samples)
+                indices = (start + np.arange(num_frames)) % len(samples)
+                chunk = samples[indices]
+            else:
+                if self.at_end == "stop" and start >= len(samples):
+                    raise EOFError("End of audio source reached.")
+                chunk = np.zeros(num_frames, dtype=np.int16)
+                available = samples[start:start + num_frames]
+                chunk[:len(available)] = available
+            self._position += num_frames / sample_rate
+        return chunk
+
+    def list_input_devices(self) -> list[dict]:
+        return [{
+            'index': 0,
+            'name': self.__class__.__name__,
+            'channels': 1,
+            'sample_rate': float(self.sample_rate)
+        }]
+
+    def is_format_supported(self, sample_rate: int, device_index: Optional[int] = None, channels: int = 1) -> bool:
+        return True
+
+    def default_sample_rate(self, device_index: Optional[int] = None) -> int:
+        return self.sample_rate
+
+    def open_stream(
+        self,
+        sample_rate: int,
+        chunk_size: int,
+        channels: int = 1,
+        device_index: Optional[int] = None
+    ) -> AudioInputStream:
+        return _BufferInputStream(self, sample_rate, channels)
+
+
+class FileAudioSource(_BufferAudioSource):
+    """
+    Replays a WAV file or a NumPy array as if it were a microphone.
+    """
+
+    def __init__(
+        self,
+        audio: Path | str | np.ndarray,
+        sample_rate: Optional[int] = None,
+        speed: float = 1.0,
+        at_end: str = "silence"
+    ) -> None:
+        """
+        Initialize the file source.
+
+        Args:
+            audio (Path | str | np.ndarray): WAV file path or mono int16 samples.
+            sample_rate (int | None): Sample rate of the array. Ignored for WAV files.
+            speed (float): Replay speed relative to real time. 0 replays as fast as possible.
+            at_end (str): Behaviour after the last sample: 'silence' (zeros), 'loop' or 'stop' (EOFError).
+
+        Raises:
+            ValueError: If an array is given without its sample rate.
+        """
+        if isinstance(audio, np.ndarray):
+            if sample_rate is None:
+                raise ValueError("sample_rate is required when replaying an array.")
+            samples = audio
+        else:
+            samples, sample_rate = load_wav(audio)
+        super().__init__(samples, sample_rate, speed=speed, at_end=at_end)
+
+    def load(self, audio: Path | str | np.ndarray, sample_rate: Optional[int] = None) -> None:
+        """
+        Replace the signal and restart the replay, without reopening the streams.
+
+        Args:
+            audio (Path | str | np.ndarray): WAV file path or mono int16 samples.
+            sample_rate (int | None): Sample rate of the array. Ignored for WAV files.
+
+        Raises:
+            ValueError: If an array is given without its sample rate.
+        """
+        if isinstance(audio, np.ndarray):
+            if sample_rate is None:
+                raise ValueError("sample_rate is required when replaying an array.")
+            samples = audio
+        else:
+            samples, sample_rate = load_wav(audio)
+        with self._lock:
+            self.sample_rate = int(sample_rate)
+            self._samples = np.ascontiguousarray(samples, dtype=np.int16)
+            self._resampled = {self.sample_rate: self._samples}
+            self._position = 0.0
+
+
+class SyntheticAudioSource(_BufferAudioSource):
+    """
+    Generates a scripted signal (silence, tone, noise, speech-like bursts).
+
+    The pattern is a list of (kind, seconds) or (kind, seconds, value) tuples where
+    kind is 'silence', 'noise', 'tone' (value = frequency in Hz) or 'speech'
+    (noise modulated at a syllable rate, value = amplitude).
+    """
+
+    def __init__(
+        self,
+        pattern: list[tuple] | None = None,
+        sample_rate: int = 16000,
+        amplitude: float = 3000.0,
+        noise_level: float = 30.0,
+        seed: int = 0,
+        speed: float = 1.0,
+        at_end: str = "loop"
+    ) -> None:
+        """
+        Initialize the synthetic source.
+
+        Args:
+            pattern (list[tuple] | None): Signal script. Default: 1 s silence, 2 s speech, 1.5 s silence.
+            sample_rate (int): Generation sample rate in Hz.
+            amplitude (float): Default RMS amplitude of 'noise', 'tone' and 'speech' segments.
+            noise_level (float): RMS of the background noise added everywhere.
+            seed (int): Random seed, so a given script always produces the same signal.
+            speed (float): Replay speed relative to real time. 0 replays as fast as possible.
+            at_end (str): Behaviour after the last sample: 'silence', 'loop' or 'stop'.
+        """
+        pattern = pattern or [("silence", 1.0), ("speech", 2.0), ("silence", 1.5)]
+        rng = np.random.default_rng(seed)
+        segments = []
+        for segment in pattern:
+            kind, seconds = segment[0], segment[1]
+            value = segment[2] if len(segment) > 2 else None
+            n = int(seconds * sample_rate)
+            t = np.arange(n) / sample_rate
+            if kind == "silence":
+                signal = np.zeros(n)
+            elif kind == "noise":
+                signal = rng.normal(0.0, value or amplitude, n)
+            elif kind == "tone":
+                signal = amplitude * np.sqrt(2) * np.sin(2 * np.pi * (value or 440.0) * t)
+            elif kind == "speech":
+                envelope = 0.5 * (1 - np.cos(2 * np.pi * 4.0 * t))
+                signal = rng.normal(0.0, value or amplitude, n) * envelope * np.sqrt(2)
+            else:
+                raise ValueError(f"Unknown synthetic segment kind: {kind}")
+            segments.append(signal + rng.normal(0.0, noise_level, n))
+        samples = np.clip(np.concatenate(segments), -32768, 32767).astype(np.int16)
+        super().__init__(samples, sample_rate, speed=speed, at_end=at_end)
@@ -0,0 +1,342 @@
+"""
+Headless end-to-end benchmark of the voice assistant turn pipeline.
+
+Usage:
+    python main.py --bench --prompts prompts/ --turns 20
+    python main.py --bench --fake-stt --turns 50 --tokens-per-second 25 --ttft 0.4 --save-baseline bench_baseline.json
+    python main.py --bench --prompts prompts.jsonl --baseline bench_baseline.json
+
+Each turn replays a scripted WAV prompt through the real capture, recorder,
+endpointing and turn state machine, as if it had been spoken right after the wake
+word. The LLM is a deterministic fake streaming a fixed answer at a configurable
+rate (in process, or over HTTP with --stand-in-llm; --llm-url uses a real
+OpenAI-compatible server), and the TTS renders silence to a null output in real time. STT is the real
+Whisper model unless --fake-stt is given (required without --prompts, the
+prompts are then synthetic speech-like bursts).
+
+The report gives p50/p95/p99 per stage over the measured turns. With --baseline,
+stages slower than the baseline beyond the tolerance are flagged and the exit
+code is 1.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+import tts
+from audio_source import FileAudioSource, SyntheticAudioSource, load_wav
+from llm import LMStudioResponder
+from llm_backends import LLMBackend, OpenAICompatibleBackend, StandInLLMServer, StreamChunk
+from resampler import StreamingResampler
+from stt_batch import read_inputs
+from tracing import Tracer
+
+SAMPLE_RATE = 16000
+DEFAULT_ANSWER = (
+    "Sure, here is a short answer to your question. "
+    "The weather today should stay mild with a light breeze in the afternoon. "
+    "Let me know if you need anything else."
+)
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Deterministic stand-in for the model: streams a fixed answer with a fixed time to
+    first token and token rate, in process.
+    """
+
+    def __init__(self, answer: str = DEFAULT_ANSWER, tokens_per_second: float = 30.0, ttft: float = 0.3):
+        """
+        Args:
+            answer (str): Text streamed for every prompt.
+            tokens_per_second (float): Streaming rate after the first token.
+            ttft (float): Seconds before the first token.
+        """
+        self.answer = answer
+        self.tokens_per_second = tokens_per_second
+        self.ttft = ttft
+
+    def stream(self, messages: list[dict]):
+        tokens = re.findall(r"\S+\s*", self.answer)
+        start = time.monotonic() + self.ttft
+        for i, token in enumerate(tokens):
+            # Absolute schedule: the pacing does not drift with the consumer
+            delay = start + i / self.tokens_per_second - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            yield StreamChunk(token)
+
+
+class SilentSynthesizer:
+    """
+    Renders silence with the duration the text would take to speak.
+    """
+
+    def __init__(self, chars_per_second: float = 15.0, render_seconds_per_char: float = 0.001):
+        self.chars_per_second = chars_per_second
+        self.render_seconds_per_char = render_seconds_per_char
+
+    def render(self, text: str) -> tuple[np.ndarray, int]:
+        time.sleep(len(text) * self.render_seconds_per_char)
+        return np.zeros(int(len(text) / self.chars_per_second * SAMPLE_RATE), dtype=np.int16), SAMPLE_RATE
+
+    def close(self):
+        pass
+
+
+class NullPlayer:
+    """
+    Discards the audio, taking as long as the real playback would (interruptible like a real player).
+    """
+
+    BLOCK_SECONDS = 0.02
+
+    def play(self, samples: np.ndarray, sample_rate: int, is_stale=None):
+        end = time.monotonic() + len(samples) / sample_rate
+        while not (is_stale and is_stale()):
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(self.BLOCK_SECONDS, remaining))
+
+    def close(self):
+        pass
+
+
+class FakeSpeechToText:
+    """
+    Returns the scripted transcript of the current prompt after a fixed delay.
+    """
+
+    def __init__(self, seconds: float = 0.2):
+        self.seconds = seconds
+        self.transcript = ""
+
+    def transcribe_array(self, audio, sample_rate, energy_track=None, trim=True) -> str:
+        time.sleep(self.seconds)
+        return self.transcript
+
+    def start_stream(self, sample_rate, on_partial=None, **kwargs):
+        return _FakeStream(self)
+
+
+class _FakeStream:
+    def __init__(self, stt_app: FakeSpeechToText):
+        self._stt_app = stt_app
+
+    def feed(self, samples):
+        pass
+
+    def finish(self) -> str:
+        return self._stt_app.transcribe_array(None, SAMPLE_RATE)
+
+    def cancel(self, timeout=None) -> bool:
+        return True
+
+
+def load_prompts(source: Path | None) -> list[tuple[np.ndarray, str]]:
+    """
+    Load the scripted prompts as 16 kHz int16 audio with their reference text.
+
+    Args:
+        source (Path | None): Directory or manifest (see stt_batch.read_inputs). None: synthetic prompts.
+
+    Returns:
+        list[tuple[np.ndarray, str]]: (samples, transcript used by the fake STT).
+    """
+    if source is None:
+        return [
+            (SyntheticAudioSource([("speech", seconds)], at_end="silence")._samples, f"Synthetic prompt {i + 1}")
+            for i, seconds in enumerate((1.5, 2.5, 1.0))
+        ]
+    prompts = []
+    for entry in read_inputs(source):
+        samples, sample_rate = load_wav(entry["path"])
+        if sample_rate != SAMPLE_RATE:
+            resampler = StreamingResampler(sample_rate, SAMPLE_RATE)
+            samples = np.concatenate([resampler.process(samples), resampler.flush()])
+        prompts.append((samples, entry["reference"] or Path(entry["path"]).stem.replace("_", " ")))
+    return prompts
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_delta: float) -> list[str]:
+    """
+    Flag the stages slower than the baseline.
+
+    Args:
+        report (dict): Current report.
+        baseline (dict): Stored report.
+        tolerance (float): Allowed relative increase of p50 and p95.
+        min_delta (float): Increases below this many seconds are ignored (noise).
+
+    Returns:
+        list[str]: One message per regression.
+    """
+    regressions = []
+    for stage, reference in baseline.get("stages", {}).items():
+        current = report["stages"].get(stage, {})
+        for quantile in ("p50", "p95"):
+            if quantile not in reference or quantile not in current:
+                continue
+            before, after = reference[quantile], current[quantile]
+            if after > before * (1 + tolerance) and after - before > min_delta:
+                regressions.append(f"{stage} {quantile}: {before * 1000:.0f} ms -> {after * 1000:.0f} ms "
+                                   f"(+{(after / before - 1) * 100 if before else float('inf'):.0f}%)")
+    return regressions
+
+
+def run_bench(args) -> dict:
+    from main import VoiceAssistant
+
+    prompts = load_prompts(args.prompts)
+    if not prompts:
+        raise FileNotFoundError(f"No WAV prompts found in {args.prompts}")
+
+    source = FileAudioSource(np.zeros(SAMPLE_RATE // 10, dtype=np.int16), sample_rate=SAMPLE_RATE, at_end="silence")
+    tts_service = tts.TTSService(
+        synthesizer_factory=lambda: SilentSynthesizer(args.speech_chars_per_second, args.tts_render_ms_per_char / 1000),
+        player=NullPlayer()
+    )
+    server = None
+    if args.stand_in_llm:
+        # Same answer and pacing as the fake backend, through the HTTP client
+        server = StandInLLMServer(DEFAULT_ANSWER, ttft=args.ttft, tokens_per_second=args.tokens_per_second).start()
+    llm_url = server.base_url if server else args.llm_url
+    if llm_url:
+        backend = OpenAICompatibleBackend(llm_url, model=args.llm_model)
+    else:
+        backend = FakeLLMBackend(tokens_per_second=args.tokens_per_second, ttft=args.ttft)
+    responder = LMStudioResponder(system_prompt="You are a voice assistant, so you have to give a short but friendly answer",
+                                  tts_service=tts_service, backend=backend)
+    stt_app = FakeSpeechToText(args.stt_seconds) if args.fake_stt else None
+    if stt_app is None:
+        import stt
+        stt_app = stt.SpeechToTextApplication(backend=args.backend)
+
+    assistant = VoiceAssistant(
+        audio_source=source,
+        streaming_stt=not args.no_streaming_stt,
+        llm_responder=responder,
+        tts_service=tts_service,
+        stt_app=stt_app,
+        wakeword=False
+    )
+    orchestrator = assistant.orchestrator
+    finished = threading.Event()
+    outcomes = []
+
+    def on_turn_end(turn):
+        outcomes.append(turn.outcome)
+        finished.set()
+
+    orchestrator.add_turn_end_hook(on_turn_end)
+    tail = np.zeros(int(args.tail_seconds * SAMPLE_RATE), dtype=np.int16)
+
+    assistant.capture.start()
+    try:
+        for i in range(args.warmup + args.turns):
+            if i == args.warmup:
+                # Warm-up turns are not measured
+                orchestrator.tracer = Tracer(trace_path=args.trace)
+                outcomes.clear()
+            samples, transcript = prompts[i % len(prompts)]
+            if args.fake_stt:
+                stt_app.transcript = transcript
+            source.load(np.concatenate([samples, tail]), SAMPLE_RATE)
+            finished.clear()
+            if orchestrator.trigger() is None:
+                raise RuntimeError("the previous turn is still running")
+            if not finished.wait(args.turn_timeout):
+                orchestrator.cancel()
+                finished.wait(5.0)
+            print(f"🏁 Turn {i + 1}/{args.warmup + args.turns}: {outcomes[-1] if outcomes else 'timeout'}")
+            time.sleep(args.gap)
+    finally:
+        orchestrator.cancel()
+        assistant.recorder.cleanup()
+        assistant.capture.cleanup()
+        tts_service.shutdown()
+        responder.close()
+        if server:
+            server.stop()
+        orchestrator.tracer.close()
+
+    return {
+        "turns": args.turns,
+        "outcomes": {outcome: outcomes.count(outcome) for outcome in set(outcomes)},
+        "config": {
+            "prompts": str(args.prompts) if args.prompts else "synthetic",
+            "fake_stt": args.fake_stt,
+            "streaming_stt": not args.no_streaming_stt,
+            "llm": "stand-in" if server else args.llm_url or "fake",
+            "tokens_per_second": args.tokens_per_second,
+            "ttft": args.ttft,
+        },
+        "stages": orchestrator.tracer.summary(),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n📊 {report['turns']} turns: {report['outcomes']}")
+    print(f"   {'stage':<16}{'count':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, stats in report["stages"].items():
+        values = "".join(f"{stats[q] * 1000:>10.1f}" if q in stats else f"{'-':>10}" for q in ("p50", "p95", "p99"))
+        print(f"   {stage:<16}{stats['count']:>6}{values}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="main.py --bench", description="Headless end-to-end benchmark of the turn pipeline.")
+    parser.add_argument("--prompts", type=Path, default=None, help="WAV prompts: directory or .txt / .jsonl manifest.")
+    parser.add_argument("--turns", type=int, default=10, help="Measured turns.")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured turns run first.")
+    parser.add_argument("--fake-stt", action="store_true", help="Replace Whisper with the scripted transcripts.")
+    parser.add_argument("--stt-seconds", type=float, default=0.2, help="Fake STT duration.")
+    parser.add_argument("--backend", choices=("auto", "npu", "cpu"), default="auto", help="Whisper backend.")
+    parser.add_argument("--no-streaming-stt", action="store_true", help="Transcribe after the end of the recording.")
+    parser.add_argument("--llm-url", default=None, help="Real OpenAI-compatible server instead of the fake LLM.")
+    parser.add_argument("--llm-model", default=None, help="Model name for --llm-url. Default: first model listed.")
+    parser.add_argument("--stand-in-llm", action="store_true",
+                        help="Serve the fake LLM over local HTTP (includes the client and connection costs).")
+    parser.add_argument("--tokens-per-second", type=float, default=30.0, help="Fake LLM token rate.")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Fake LLM time to first token, in seconds.")
+    parser.add_argument("--tts-render-ms-per-char", type=float, default=1.0, help="Fake synthesis cost.")
+    parser.add_argument("--speech-chars-per-second", type=float, default=15.0, help="Fake speech rate of the TTS.")
+    parser.add_argument("--tail-seconds", type=float, default=2.0, help="Silence after each prompt.")
+    parser.add_argument("--gap", type=float, default=0.5, help="Pause between turns, in seconds.")
+    parser.add_argument("--turn-timeout", type=float, default=120.0, help="Maximum duration of a turn.")
+    parser.add_argument("--trace", type=Path, default=None, help="Optional JSONL file for the spans.")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Optional JSON file for the report.")
+    parser.add_argument("--baseline", type=Path, default=None, help="Report to compare against.")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Store this report as a baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown.")
+    parser.add_argument("--min-delta", type=float, default=0.02, help="Ignored slowdown, in seconds.")
+    args = parser.parse_args(argv)
+    if args.prompts is None and not args.fake_stt:
+        parser.error("--fake-stt is required without --prompts (synthetic prompts have no words)")
+
+    report = run_bench(args)
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_delta)
+        if regressions:
+            print("\n❌ Regressions against the baseline:")
+            for message in regressions:
+                print(f"   {message}")
+            return 1
+        print("\n✅ No regression against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
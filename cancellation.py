@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Callable
+
+
+class TurnCancelled(Exception):
+    """
+    Raised by CancellationToken.raise_if_cancelled() once the turn has been cancelled.
+    """
+
+
+class CancellationToken:
+    """
+    Cancellation signal shared by every stage of a conversation turn.
+
+    Stages either poll is_cancelled or register a callback that aborts their
+    blocking work (LLM stream, TTS playback) as soon as cancel() is called.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+        self.cancelled_at: float | None = None  # time.monotonic() of the cancel() call
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """
+        Cancel the turn and run the registered callbacks (once).
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.cancelled_at = time.monotonic()
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"❌ Error in cancellation callback: {e}")
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Register a function called on cancel(). Called immediately if already cancelled.
+
+        Args:
+            callback (Callable[[], None]): Function aborting some blocking work.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """
+        Unregister a callback once the work it aborts is over.
+
+        Args:
+            callback (Callable[[], None]): The callback to remove.
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Block until cancelled.
+
+        Args:
+            timeout (float | None): Maximum wait in seconds.
+
+        Returns:
+            bool: True if cancelled.
+        """
+        return self._event.wait(timeout)
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises:
+            TurnCancelled: If the turn has been cancelled.
+        """
+        if self._event.is_set():
+            raise TurnCancelled()
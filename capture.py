@@ -0,0 +1,240 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+from audio_source import AudioSource, PyAudioSource
+from resampler import StreamingResampler
+
+
+class AudioCaptureService:
+    """
+    Single always-on microphone stream shared by every audio consumer.
+
+    The wake word detector and the recorder subscribe to the same stream instead
+    of each opening the device. The most recent audio is kept in a pre-roll ring
+    buffer so that a new subscriber can start from audio captured before it
+    subscribed (e.g. the words spoken right after the wake word).
+
+    Devices that cannot be opened at the requested rate are opened at their
+    default rate and resampled once here, before the chunks are fanned out, so
+    every subscriber receives chunk_size frames at sample_rate.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        chunk_size: int = 1280,
+        channels: int = 1,
+        device_index: Optional[int] = None,
+        pre_roll: float = 1.0,
+        source: Optional[AudioSource] = None,
+        logger: Optional[logging.Logger] = None
+    ) -> None:
+        """
+        Initialize the capture service.
+
+        Args:
+            sample_rate (int): Sample rate delivered to subscribers, in Hz.
+            chunk_size (int): Number of frames delivered per chunk.
+            channels (int): Number of audio channels.
+            device_index (int | None): Input device index. Default: system default input.
+            pre_roll (float): Seconds of recent audio kept for late subscribers.
+            source (AudioSource | None): Capture backend. Default: PyAudioSource.
+            logger (logging.Logger | None): Optional custom logger.
+        """
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.channels = channels
+        self.device_index = device_index
+        self.pre_roll = pre_roll
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._owns_source = source is None
+        self.source = source or PyAudioSource()
+
+        self.device_rate = sample_rate  # Rate the device is actually opened at (negotiated in start())
+        self.is_running = False
+        self._stream = None
+        self._thread = None
+        self._resampler: Optional[StreamingResampler] = None
+        self._pending = np.zeros(0, dtype=np.int16)  # Resampled frames not yet delivered
+
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[np.ndarray, float], None]] = []
+        self._ring: deque[tuple[float, np.ndarray]] = deque(maxlen=self._ring_length(pre_roll))
+
+    def _ring_length(self, seconds: float) -> int:
+        return max(1, int(np.ceil(seconds * self.sample_rate / self.chunk_size)))
+
+    def set_device(self, device_index: Optional[int]) -> None:
+        """
+        Select the input device. Takes effect on the next start().
+
+        Args:
+            device_index (int | None): Input device index.
+        """
+        self.device_index = device_index
+
+    def subscribe(self, callback: Callable[[np.ndarray, float], None], pre_roll: float = 0.0) -> int:
+        """
+        Register a consumer called from the capture thread for every chunk.
+
+        The callback receives the int16 chunk and its monotonic capture timestamp.
+        It must return quickly (typically by pushing to a queue).
+
+        Args:
+            callback (Callable[[np.ndarray, float], None]): Chunk consumer.
+            pre_roll (float): Seconds of already captured audio replayed to the callback
+                before live chunks. Replay and registration are atomic, so no chunk is
+                lost or duplicated between the two.
+
+        Returns:
+            int: Number of pre-roll chunks replayed.
+        """
+        with self._lock:
+            chunks = list(self._ring)[-self._ring_length(pre_roll):] if pre_roll > 0 else []
+            for timestamp, chunk in chunks:
+                callback(chunk, timestamp)
+            self._subscribers.append(callback)
+        return len(chunks)
+
+    def unsubscribe(self, callback: Callable[[np.ndarray, float], None]) -> None:
+        """
+        Remove a consumer registered with subscribe().
+
+        Args:
+            callback (Callable[[np.ndarray, float], None]): The consumer to remove.
+        """
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def get_pre_roll(self, seconds: Optional[float] = None) -> np.ndarray:
+        """
+        Return a copy of the most recent captured audio.
+
+        Args:
+            seconds (float | None): Amount of audio to return. Default: the whole pre-roll buffer.
+
+        Returns:
+            np.ndarray: int16 samples, oldest first.
+        """
+        with self._lock:
+            chunks = list(self._ring)
+        if seconds is not None:
+            chunks = chunks[-self._ring_length(seconds):]
+        if not chunks:
+            return np.zeros(0, dtype=np.int16)
+        return np.concatenate([chunk for _, chunk in chunks])
+
+    def start(self) -> None:
+        """
+        Open the microphone and start delivering chunks to subscribers.
+        """
+        if self._stream is not None:
+            return
+
+        self.device_rate = self._negotiate_rate()
+        self._resampler = None
+        self._pending = np.zeros(0, dtype=np.int16)
+        if self.device_rate != self.sample_rate:
+            self._resampler = StreamingResampler(self.device_rate, self.sample_rate)
+            self.logger.info(f"Device opened at {self.device_rate} Hz, resampled to {self.sample_rate} Hz")
+
+        self._stream = self.source.open_stream(
+            self.device_rate,
+            self._device_chunk_size(),
+            channels=self.channels,
+            device_index=self.device_index
+        )
+        self.is_running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        self.logger.info(f"Audio capture started at {self.sample_rate} Hz")
+
+    def _negotiate_rate(self) -> int:
+        """
+        Returns:
+            int: sample_rate if the device supports it natively, its default rate otherwise.
+        """
+        if self.source.is_format_supported(self.sample_rate, self.device_index, self.channels):
+            return self.sample_rate
+        return int(self.source.default_sample_rate(self.device_index))
+
+    def _device_chunk_size(self) -> int:
+        return max(1, int(round(self.chunk_size * self.device_rate / self.sample_rate)))
+
+    def _rechunk(self, chunk: np.ndarray) -> list[np.ndarray]:
+        """
+        Resample a device chunk and cut the result into chunks of exactly chunk_size frames.
+        """
+        if self._resampler is None:
+            return [chunk]
+        self._pending = np.concatenate((self._pending, self._resampler.process(chunk)))
+        count = len(self._pending) // self.chunk_size
+        chunks = [self._pending[i * self.chunk_size:(i + 1) * self.chunk_size] for i in range(count)]
+        self._pending = self._pending[count * self.chunk_size:]
+        return chunks
+
+    def _capture_loop(self) -> None:
+        device_chunk_size = self._device_chunk_size()
+        while self.is_running:
+            try:
+                data = self._stream.read(device_chunk_size)
+            except EOFError:
+                self.logger.info("Audio source exhausted")
+                self.is_running = False
+                break
+            except Exception as e:
+                self.logger.error(f"Audio capture read failed: {e}")
+                time.sleep(0.01)
+                continue
+
+            timestamp = time.monotonic()
+            chunk = np.frombuffer(data, dtype=np.int16)
+            if self.channels > 1:
+                chunk = chunk[::self.channels]
+            for chunk in self._rechunk(chunk):
+                self._deliver(chunk, timestamp)
+
+    def _deliver(self, chunk: np.ndarray, timestamp: float) -> None:
+        with self._lock:
+            self._ring.append((timestamp, chunk))
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(chunk, timestamp)
+            except Exception as e:
+                self.logger.error(f"Error in capture subscriber: {e}")
+
+    def stop(self) -> None:
+        """
+        Stop capturing and close the microphone.
+        """
+        if self._stream is None:
+            return
+
+        self.is_running = False
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+        with self._lock:
+            self._ring.clear()
+        self.logger.info("Audio capture stopped")
+
+    def cleanup(self) -> None:
+        """
+        Release all resources.
+        """
+        self.stop()
+        with self._lock:
+            self._subscribers.clear()
+        if self._owns_source:
+            self.source.terminate()
@@ -0,0 +1,175 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token count estimate (about 4 characters per token for English).
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    return len(text) // 4 + 1
+
+
+class ConversationHistory:
+    """
+    Token-budgeted conversation history.
+
+    The system prompt is always kept. The oldest turns are evicted once the
+    history no longer fits in the token budget, and can optionally be folded
+    into a compact memory message by a background summarizer, so the prompt
+    size (and time to first token) stays flat over long sessions.
+    """
+
+    MESSAGE_OVERHEAD_TOKENS = 4  # Chat template tokens around each message
+
+    def __init__(
+        self,
+        system_prompt: str,
+        token_budget: int = 3000,
+        token_counter: Callable[[str], int] | None = None,
+        summarizer: Callable[[str, list[dict]], str] | None = None,
+    ) -> None:
+        """
+        Initialize the history.
+
+        Args:
+            system_prompt (str): Pinned system prompt.
+            token_budget (int): Maximum prompt size in tokens (system prompt, memory and turns).
+                Keep room below the model context for the answer.
+            token_counter (Callable[[str], int] | None): Exact tokenizer. Default: estimate_tokens.
+            summarizer (Callable[[str, list[dict]], str] | None): Called in the background with the
+                current memory and the evicted messages, returns the new memory. Default: evicted
+                turns are simply dropped.
+        """
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.token_counter = token_counter or estimate_tokens
+        self.summarizer = summarizer
+
+        self.memory = ""
+        self._memory_tokens = 0
+        self._messages: list[dict] = []
+        self._system_tokens = self._count(system_prompt)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary") if summarizer else None
+
+    def _count(self, text: str) -> int:
+        try:
+            tokens = self.token_counter(text)
+        except Exception:
+            tokens = estimate_tokens(text)
+        return tokens + self.MESSAGE_OVERHEAD_TOKENS
+
+    @property
+    def total_tokens(self) -> int:
+        """
+        int: Current prompt size in tokens.
+        """
+        with self._lock:
+            return self._total_tokens()
+
+    def _total_tokens(self) -> int:
+        return self._system_tokens + self._memory_tokens + sum(m["tokens"] for m in self._messages)
+
+    def add_user_message(self, text: str) -> None:
+        """
+        Append a user message, evicting old turns if the budget is exceeded.
+
+        A previous user message left without an answer is dropped first, so roles
+        always alternate (strict chat templates reject two user messages in a row).
+
+        Args:
+            text (str): The user message.
+        """
+        self.discard_unanswered()
+        self._append("user", text)
+
+    def discard_unanswered(self) -> None:
+        """
+        Drop the last message if it is a user message without an answer
+        (failed or interrupted turn that produced no text).
+        """
+        with self._lock:
+            if self._messages and self._messages[-1]["role"] == "user":
+                self._messages.pop()
+
+    def add_assistant_response(self, text: str) -> None:
+        """
+        Append an assistant answer, evicting old turns if the budget is exceeded.
+
+        Args:
+            text (str): The assistant answer.
+        """
+        self._append("assistant", text)
+
+    def _append(self, role: str, text: str) -> None:
+        message = {"role": role, "content": text, "tokens": self._count(text)}
+        with self._lock:
+            self._messages.append(message)
+            evicted = self._evict()
+        if evicted and self._executor:
+            self._executor.submit(self._summarize, evicted)
+
+    def _evict(self) -> list[dict]:
+        """
+        Drop whole turns from the front until the history fits. The last message is always kept.
+        """
+        evicted = []
+        while self._total_tokens() > self.token_budget and len(self._messages) > 1:
+            evicted.append(self._messages.pop(0))
+            # Never leave an assistant answer without its question
+            while self._messages and self._messages[0]["role"] == "assistant" and len(self._messages) > 1:
+                evicted.append(self._messages.pop(0))
+        return evicted
+
+    def _summarize(self, evicted: list[dict]) -> None:
+        while evicted:
+            with self._lock:
+                memory = self.memory
+            try:
+                summary = self.summarizer(memory, [{"role": m["role"], "content": m["content"]} for m in evicted]).strip()
+            except Exception as e:
+                print(f"❌ Conversation summarization failed: {e}")
+                return
+            with self._lock:
+                self.memory = summary
+                self._memory_tokens = self._count(summary) if summary else 0
+                # A longer memory can push more turns out: fold them in as well
+                evicted = self._evict()
+
+    def messages(self) -> list[dict]:
+        """
+        Build the prompt messages.
+
+        Returns:
+            list[dict]: {"role", "content"} dicts: the system prompt (with the memory, if any) followed by the kept turns.
+        """
+        with self._lock:
+            system = self.system_prompt
+            if self.memory:
+                system += f"\n\nSummary of the earlier conversation: {self.memory}"
+            return [{"role": "system", "content": system}] + [
+                {"role": m["role"], "content": m["content"]} for m in self._messages
+            ]
+
+    def clear(self) -> None:
+        """
+        Forget every turn and the memory. The system prompt is kept.
+        """
+        with self._lock:
+            self._messages.clear()
+            self.memory = ""
+            self._memory_tokens = 0
+
+    def close(self) -> None:
+        """
+        Stop the background summarizer.
+        """
+        if self._executor:
+            self._executor.shutdown(wait=False)
@@ -1,28 +1,80 @@
-import lmstudio as lms
 import tts
 import time
-import re
+from cancellation import CancellationToken
+from history import ConversationHistory
+from llm_backends import LLMBackend, LMStudioBackend
+from segmenter import SentenceSegmenter
 
 
 class LMStudioResponder:
     """
-    A wrapper around the LM Studio chat model to generate streaming responses.
+    A wrapper around a chat model backend to generate streaming responses.
     """
 
-    CHUNK_REGEX = re.compile(r".*?[\.!?…](?:\s|$)") # Sentence-ending punctuation
-
-    def __init__(self, model_name: str = None, system_prompt: str = None):
+    SUMMARY_PROMPT = (
+        "You maintain the memory of a conversation between a user and a voice assistant. "
+        "Merge the previous memory and the new messages into a few short factual sentences. "
+        "Keep names, preferences and open questions. Answer with the memory only."
+    )
+
+    def __init__(
+        self,
+        model_name: str = None,
+        system_prompt: str = None,
+        history_token_budget: int = 3000,
+        summarize_history: bool = False,
+        tts_service: tts.TTSService = None,
+        backend: LLMBackend = None,
+    ):
         """
         Initialize the LMStudioResponder.
 
         Args:
-            model_name (str | None): Optional name of the model to use. Default: first llm load on the server
+            model_name (str | None): Optional name of the LM Studio model to use (ignored with backend). Default: first llm load on the server
             system_prompt (str | None): Optional custom system prompt. Default: You are a friendly assistant. Answer concisely with 1 or 2 sentences. Never use emojis.
+            history_token_budget (int): Maximum prompt size in tokens. Older turns are evicted beyond it.
+                Leave room for the answer below the model context length.
+            summarize_history (bool): Summarize evicted turns in the background into a memory message kept in the prompt.
+            tts_service (tts.TTSService | None): Speech output. Default: the shared TTS service.
+            backend (LLMBackend | None): Chat model, closed by close(). Default: LMStudioBackend(model_name).
+        """
+        self.backend = backend or LMStudioBackend(model_name)
+        self.tts = tts_service or tts.get_service()
+        self.history = ConversationHistory(
+            system_prompt or "You are a vocal assistant. Answer concisely with 1 or 2 sentences. Never use emojis.",
+            token_budget=history_token_budget,
+            token_counter=self._count_tokens,
+            summarizer=self._summarize if summarize_history else None,
+        )
+
+    def _count_tokens(self, text: str) -> int:
+        """
+        Count tokens with the model tokenizer.
+
+        Args:
+            text (str): Text to measure.
+
+        Returns:
+            int: Number of tokens.
+        """
+        return self.backend.count_tokens(text)
+
+    def _summarize(self, memory: str, messages: list[dict]) -> str:
         """
-        self.model = lms.llm(model_name) if model_name else lms.llm()
-        self.chat = lms.Chat(
-            system_prompt or "You are a vocal assistant. Answer concisely with 1 or 2 sentences. Never use emojis."
-        ) 
+        Fold evicted messages into the conversation memory (runs in the background).
+
+        Args:
+            memory (str): Current memory, possibly empty.
+            messages (list[dict]): Evicted messages, oldest first.
+
+        Returns:
+            str: The new memory.
+        """
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        return self.backend.complete([
+            {"role": "system", "content": self.SUMMARY_PROMPT},
+            {"role": "user", "content": f"Previous memory: {memory or '(none)'}\n\nNew messages:\n{transcript}"},
+        ])
 
     def _get_response_stream(self, prompt: str):
         """
@@ -34,58 +86,119 @@ class LMStudioResponder:
         Returns:
             Iterator over streaming chunks from the model.
         """
-        self.chat.add_user_message(prompt)
-        return self.model.respond_stream(
-            self.chat,
-            on_message=self.chat.append,
-        )
+        self.history.add_user_message(prompt)
+        return self.backend.stream(self.history.messages())
     
-    def _speak_chunks_from_stream(self, stream) -> str:
+    def _speak_chunks_from_stream(self, stream, cancel_token: CancellationToken = None, timings: dict = None) -> str:
         """
         Process and speak response chunks as complete sentences.
 
+        Sentences are handed to the TTS pipeline without waiting for them to be
+        spoken, so tokens keep being consumed while earlier sentences are
+        synthesized and played.
+
         Args:
-            stream: A streaming response from LM Studio.
+            stream: A streaming response from the backend.
+            cancel_token (CancellationToken | None): Stops consuming the stream and speaking when cancelled.
+            timings (dict | None): Receives the time.monotonic() of the "first_token" and of the
+                "generation_end".
 
         Returns:
-            str: The complete spoken text.
+            str: The complete text, or the text generated before the cancellation.
         """
-        buffer = ""
-        full_text = ""
-
-        for chunk in stream:
-            content = chunk.content
-            if not content:
-                continue
-
-            buffer += content
-            full_text += content
-
-            while (match := self.CHUNK_REGEX.match(buffer)):
-                chunk_text = match.group(0).strip()
-                if chunk_text:
-                    tts.talk(chunk_text)
-                buffer = buffer[match.end():]
+        segmenter = SentenceSegmenter()
+        timings = {} if timings is None else timings
+
+        try:
+            for chunk in stream:
+                if cancel_token and cancel_token.is_cancelled:
+                    return segmenter.text
+                content = chunk.content
+                if not content:
+                    continue
+                if "first_token" not in timings:
+                    timings["first_token"] = time.monotonic()
+
+                for sentence in segmenter.feed(content):
+                    self.tts.enqueue(sentence, cancel_token)
+        except Exception:
+            # A cancelled prediction may end the stream with an error
+            if cancel_token and cancel_token.is_cancelled:
+                return segmenter.text
+            raise
+        if cancel_token and cancel_token.is_cancelled:
+            return segmenter.text
+
+        timings["generation_end"] = time.monotonic()
 
         # Speak any leftover buffer
-        remaining = buffer.strip()
+        remaining = segmenter.flush()
         if remaining:
-            tts.talk(remaining)
+            self.tts.enqueue(remaining, cancel_token)
 
-        return full_text
+        self.tts.wait_until_idle()
+        return segmenter.text
 
-    def respond_and_speak(self, prompt: str) -> str:
+    def respond_and_speak(self, prompt: str, cancel_token: CancellationToken = None, timings: dict = None) -> str:
         """
-        Get a response from LM Studio and speak it sentence by sentence.
+        Get a response from the model and speak it sentence by sentence.
+
+        Cancelling the token (barge-in) aborts the generation on the server, drops the
+        queued sentences and stops the playback right away.
 
         Args:
             prompt (str): User input prompt.
+            cancel_token (CancellationToken | None): Cancellation of the current turn.
+            timings (dict | None): Receives time.monotonic() instants: "start", "first_token",
+                "generation_end" and "end" (answer fully spoken).
 
         Returns:
-            str: Full response text.
+            str: Full response text, truncated if the turn was cancelled.
+        """
+        timings = {} if timings is None else timings
+        timings["start"] = time.monotonic()
+        try:
+            stream = self._get_response_stream(prompt)
+        except Exception:
+            self.history.discard_unanswered()
+            raise
+
+        def abort():
+            if hasattr(stream, "cancel"):
+                try:
+                    stream.cancel()
+                except Exception as e:
+                    print(f"❌ Could not cancel the LLM generation: {e}")
+            self.tts.stop()
+
+        if cancel_token:
+            cancel_token.add_callback(abort)
+        try:
+            full_text = self._speak_chunks_from_stream(stream, cancel_token, timings)
+        except Exception:
+            # No answer to keep: the question is dropped so the roles keep alternating
+            self.history.discard_unanswered()
+            raise
+        finally:
+            if cancel_token:
+                cancel_token.remove_callback(abort)
+
+        if cancel_token and cancel_token.is_cancelled:
+            print("\n✋ Response interrupted")
+            if full_text.strip():
+                self.history.add_assistant_response(full_text)
+            else:
+                self.history.discard_unanswered()
+            return full_text
+
+        self.history.add_assistant_response(full_text)
+        timings["end"] = time.monotonic()
+        print(f"\n\nResponse time: {timings['end'] - timings['start']:.3f} seconds")
+        return full_text
+
+    def close(self):
+        """
+        Stop the background history summarizer and release the backend connections.
         """
-        start_time = time.time()
-        stream = self._get_response_stream(prompt)
-        full_text = self._speak_chunks_from_stream(stream)
-        print(f"\n\nResponse time: {time.time() - start_time:.3f} seconds")
-        return full_text
\ No newline at end of file
+        self.history.close()
+        self.backend.close()
@@ -0,0 +1,356 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from history import estimate_tokens
+
+
+class StreamChunk:
+    """
+    A piece of streamed answer text.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+
+
+class LLMBackend:
+    """
+    Chat model used by the responder.
+
+    Messages are {"role", "content"} dicts with the system prompt first. stream()
+    returns an iterable of chunks exposing .content; it may also expose cancel()
+    to abort the generation on the server.
+    """
+
+    def stream(self, messages: list[dict]):
+        """
+        Args:
+            messages (list[dict]): Conversation, system prompt first.
+
+        Returns:
+            Iterable of chunks with a .content attribute.
+        """
+        raise NotImplementedError
+
+    def complete(self, messages: list[dict]) -> str:
+        """
+        Args:
+            messages (list[dict]): Conversation, system prompt first.
+
+        Returns:
+            str: The full answer.
+        """
+        return "".join(chunk.content or "" for chunk in self.stream(messages))
+
+    def count_tokens(self, text: str) -> int:
+        """
+        Args:
+            text (str): Text to measure.
+
+        Returns:
+            int: Number of tokens. Default: estimate_tokens().
+        """
+        return estimate_tokens(text)
+
+    def close(self) -> None:
+        """
+        Release the connections.
+        """
+
+
+class LMStudioBackend(LLMBackend):
+    """
+    Model served by LM Studio, through the lmstudio SDK.
+    """
+
+    def __init__(self, model_name: str = None):
+        """
+        Args:
+            model_name (str | None): Model to use. Default: first llm loaded on the server.
+        """
+        import lmstudio as lms
+
+        self._lms = lms
+        self.model = lms.llm(model_name) if model_name else lms.llm()
+
+    def _build_chat(self, messages: list[dict]):
+        """
+        Build an LM Studio chat from history messages.
+
+        Args:
+            messages (list[dict]): {"role", "content"} dicts, system prompt first.
+
+        Returns:
+            lms.Chat: The chat to send to the model.
+        """
+        chat = self._lms.Chat(messages[0]["content"])
+        for message in messages[1:]:
+            if message["role"] == "user":
+                chat.add_user_message(message["content"])
+            else:
+                chat.add_assistant_response(message["content"])
+        return chat
+
+    def stream(self, messages: list[dict]):
+        return self.model.respond_stream(self._build_chat(messages))
+
+    def complete(self, messages: list[dict]) -> str:
+        return self.model.respond(self._build_chat(messages)).content
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.model.tokenize(text))
+
+
+class ChatCompletionStream:
+    """
+    Server-sent events of a streamed /chat/completions response.
+    """
+
+    def __init__(self, response):
+        self._response = response
+        self._cancelled = False
+
+    def __iter__(self):
+        try:
+            for line in self._response.iter_lines():
+                if self._cancelled:
+                    return
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    # Read the end of the body so the connection goes back to the pool
+                    continue
+                choices = json.loads(data).get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield StreamChunk(content)
+        finally:
+            self._response.close()
+
+    def cancel(self) -> None:
+        """
+        Abort the generation: closing the connection makes the server stop generating.
+        """
+        self._cancelled = True
+        self._response.close()
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Any server implementing the OpenAI /v1/chat/completions API (llama.cpp server,
+    vLLM, LM Studio, Ollama...).
+
+    Requests go through one httpx client whose keep-alive connection pool is
+    reused from turn to turn, so no TCP connection is set up on the critical path
+    after the first request.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://127.0.0.1:8080/v1",
+        model: str = None,
+        api_key: str = None,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 60.0,
+        max_connections: int = 4,
+        keepalive_expiry: float = 300.0,
+        temperature: float = None,
+        max_tokens: int = None,
+    ):
+        """
+        Args:
+            base_url (str): API root, including the /v1 prefix.
+            model (str | None): Model name. Default: first model listed by the server.
+            api_key (str | None): Bearer token, if the server requires one.
+            connect_timeout (float): Maximum time to open a connection, in seconds.
+            read_timeout (float): Maximum silence between two received bytes (time to first token
+                included), in seconds.
+            max_connections (int): Size of the connection pool.
+            keepalive_expiry (float): Idle time after which a pooled connection is closed, in seconds.
+            temperature (float | None): Sampling temperature. Default: the server's.
+            max_tokens (int | None): Maximum answer length. Default: the server's.
+        """
+        import httpx
+
+        self.client = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else None,
+        )
+        self.options = {key: value for key, value in (("temperature", temperature), ("max_tokens", max_tokens))
+                        if value is not None}
+        # Listing the models also opens the first pooled connection, so the first turn does not pay for it
+        self.model = model or self._first_model()
+
+    def _first_model(self) -> str | None:
+        response = self.client.get("/models")
+        response.raise_for_status()
+        models = response.json().get("data") or []
+        return models[0]["id"] if models else None
+
+    def _payload(self, messages: list[dict], stream: bool) -> dict:
+        payload = {
+            "messages": [{"role": m["role"], "content": m["content"]} for m in messages],
+            "stream": stream,
+            **self.options,
+        }
+        if self.model:
+            payload["model"] = self.model
+        return payload
+
+    def stream(self, messages: list[dict]) -> ChatCompletionStream:
+        request = self.client.build_request(
+            "POST", "/chat/completions",
+            json=self._payload(messages, stream=True),
+            headers={"Accept": "text/event-stream"},
+        )
+        response = self.client.send(request, stream=True)
+        if response.is_error:
+            response.read()
+            response.close()
+            response.raise_for_status()
+        return ChatCompletionStream(response)
+
+    def complete(self, messages: list[dict]) -> str:
+        response = self.client.post("/chat/completions", json=self._payload(messages, stream=False))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class StandInLLMServer:
+    """
+    In-process OpenAI-compatible server streaming a fixed answer, for tests and
+    benchmarks without a model.
+
+    It serves GET /v1/models and POST /v1/chat/completions (streamed or not) over
+    HTTP/1.1 keep-alive, with a fixed time to first token and token rate.
+    """
+
+    def __init__(self, answer: str = "This is a test answer. It has two sentences.", ttft: float = 0.1,
+                 tokens_per_second: float = 50.0, model: str = "stand-in", host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            answer (str): Text returned for every request.
+            ttft (float): Seconds before the first token.
+            tokens_per_second (float): Streaming rate after the first token.
+            model (str): Model name listed by /v1/models.
+            host (str): Interface to bind.
+            port (int): TCP port. 0: any free port.
+        """
+        self.answer = answer
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.model = model
+        self.requests: list[dict] = []  # Received chat completion payloads
+        self.connections = 0  # TCP connections accepted (keep-alive reuse check)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StandInLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _tokens(self) -> list[str]:
+        return re.findall(r"\S+\s*", self.answer)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def _send_json(self, status: int, body: dict):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path.rstrip("/") != "/v1/models":
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+                self._send_json(200, {"object": "list", "data": [{"id": server.model, "object": "model"}]})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+                with server._lock:
+                    server.requests.append(payload)
+
+                if not payload.get("stream"):
+                    time.sleep(server.ttft)
+                    self._send_json(200, {
+                        "object": "chat.completion",
+                        "model": server.model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": server.answer},
+                                     "finish_reason": "stop"}],
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                start = time.monotonic() + server.ttft
+                try:
+                    for i, token in enumerate(server._tokens()):
+                        delay = start + i / server.tokens_per_second - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                        event = {"object": "chat.completion.chunk", "model": server.model,
+                                 "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                        self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self._write_chunk(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the generation
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -1,118 +1,129 @@
 import threading
 import llm
-from wakeword_detector import WakeWordDetector
-import time
-import stt
+import tts
 from recorder import AudioRecorder
-from old_version.hmi_glasses_event import GlassesHMI, ButtonEvent
+from capture import AudioCaptureService
+from audio_source import PyAudioSource
+from turn import TurnOrchestrator
+from tracing import Tracer
+
+# openwakeword, the Whisper models (stt) and the glasses HMI (pywinusb, Windows only) are
+# imported only when used, so injected or headless setups (python main.py --bench) load none of them
 
 
 class VoiceAssistant:
-    def __init__(self):
+    def __init__(self, audio_source=None, streaming_stt=True, wakeword_barge_in=True, trace_path=None, metrics_port=None,
+                 llm_responder=None, tts_service=None, stt_app=None, wakeword=True, llm_backend=None):
+        """
+        Args:
+            audio_source: AudioSource feeding the whole pipeline. Default: the live microphone (PyAudio).
+            streaming_stt: Transcribe while the user is speaking instead of after the end of the recording.
+            wakeword_barge_in: Keep the wake word detector running while the answer is spoken so it can
+                interrupt it. When False, wake word inference is paused for the whole turn.
+            trace_path: JSONL file receiving the stage spans of every turn.
+            metrics_port: Serve the stage latency percentiles on http://127.0.0.1:<port>/metrics (Prometheus).
+            llm_responder: Object with respond_and_speak(). Default: LMStudioResponder on phi-3-mini-4k-instruct.
+            tts_service: tts.TTSService. Default: the shared service.
+            stt_app: Speech-to-text application. Default: stt.SpeechToTextApplication().
+            wakeword: Create the wake word detector. Without it turns are only started by on_voice_trigger().
+            llm_backend: llm_backends.LLMBackend of the default responder. Default: LM Studio.
+        """
         self.glasses = None
-        self.is_processing = False
-        self.processing_lock = threading.Lock()
+        self.stop_event = threading.Event()
 
         # Configuration of the glasses
         self.VENDOR_ID = 0x17EF
         self.PRODUCT_ID = 0xB813
 
+        # Seconds of audio captured before the recording starts that are kept
+        # (covers the words spoken right after the wake word)
+        self.pre_roll = 0.3
+        self.streaming_stt = streaming_stt
+        self.wakeword_barge_in = wakeword_barge_in
+
         # Initialize all modules
-        self.recorder = AudioRecorder()
-        self.llm = llm.LMStudioResponder(
+        # One always-on microphone stream shared by the wake word detector and the recorder
+        self._owns_audio_source = audio_source is None
+        self.audio_source = audio_source or PyAudioSource()
+        self.capture = AudioCaptureService(sample_rate=16000, chunk_size=1280, pre_roll=1.0, source=self.audio_source)
+        self.recorder = AudioRecorder(capture=self.capture)
+        # Start the speech synthesis worker now so the engine is ready for the first answer
+        self.tts = tts_service or tts.get_service()
+        self._owns_llm = llm_responder is None
+        self.llm = llm_responder or llm.LMStudioResponder(
             model_name="phi-3-mini-4k-instruct",
-            system_prompt="You are a voice assistant, so you have to give a short but friendly answer"
+            system_prompt="You are a voice assistant, so you have to give a short but friendly answer",
+            tts_service=self.tts,
+            backend=llm_backend
+        )
+        if stt_app is None:
+            import stt
+            stt_app = stt.SpeechToTextApplication()
+        self.stt_app = stt_app
+
+        self.detector = None
+        if wakeword:
+            from wakeword_detector import WakeWordDetector
+
+            # Download wake word model once (if needed)
+            WakeWordDetector.download_models()
+
+            # Initialize wake word detector
+            self.detector = WakeWordDetector(['alexa'], capture=self.capture)
+            self.detector.register_callback('alexa', self.on_wake_word_detected)
+
+        # Per-stage latency tracing
+        self.tracer = Tracer(trace_path=trace_path)
+        if metrics_port:
+            self.tracer.serve_metrics(metrics_port)
+
+        # Turn state machine: listening -> transcribing -> thinking -> speaking
+        self.orchestrator = TurnOrchestrator(
+            self.recorder,
+            self.stt_app,
+            self.llm,
+            self.tts,
+            detector=self.detector,
+            pre_roll=self.pre_roll,
+            streaming_stt=self.streaming_stt,
+            wakeword_barge_in=self.wakeword_barge_in,
+            tracer=self.tracer
         )
-        self.stt_app = stt.SpeechToTextApplication("audio")
-
-        # Download wake word model once (if needed)
-        WakeWordDetector.download_models()
-
-        # Initialize wake word detector
-        self.detector = WakeWordDetector(['alexa'])
-        self.detector.register_callback('alexa', self.on_wake_word_detected)
 
         # Auto-select default microphone
         default_mic = self.recorder.mic_selector.get_default_microphone()
         if default_mic:
             self.recorder.set_microphone(default_mic["index"])
+            self.capture.set_device(default_mic["index"])
             print(f"🎚️ Default microphone selected: {default_mic['name']}")
         else:
             print("❌ No microphones available.")
 
     def on_voice_trigger(self, event=None):
-        """Callback for button or wake word"""
-        with self.processing_lock:
-            if self.is_processing:
-                print("🔄 Already processing. Please wait...")
-                return
-            self.is_processing = True
-
-        try:
-            print("🎤 Trigger detected — start listening...")
-            self.process_voice_command()
-        except Exception as e:
-            print(f"❌ Error during voice processing: {e}")
-        finally:
-            with self.processing_lock:
-                self.is_processing = False
-            print("✅ Ready for next command!\n")
-
-    def process_voice_command(self):
-        """Record, transcribe, and handle LLM response"""
-        try:
-            time.sleep(0.2)  # Small delay to stabilize
-
-            print("Starting recording...")
-            self.recorder.start_recording()
-            while self.recorder.is_recording:
-                time.sleep(0.1)
-            print("Recording finished!")
-            self.recorder.save_recording("audio/last_rec.wav")
-            self.recorder.cleanup()
-
-            tic = time.time()
-
-            print("Transcribing audio file...")
-            prompt = self.stt_app.transcribe()
-            print(f"Transcription: {prompt}")
-
-            if not prompt or not prompt.strip():
-                print("❌ No speech detected or empty transcription. Try again.")
-                return
-
-            if len(prompt.strip()) < 2:
-                print("❌ Transcription too short, probably noise. Try again.")
-                return
-
-            print("🤖 LLM responding, please wait...")
-            start = time.time()
-            self.llm.respond_and_speak(prompt)
-            stop = time.time()
-            print(f"✅ LLM done in {(stop - start):.2f} seconds")
-
-            tac = time.time()
-            print(f"Total time: {(tac - tic):.2f} seconds")
-
-        except Exception as e:
-            print(f"❌ Error in voice processing: {e}")
-            import traceback
-            traceback.print_exc()
+        """Callback for button or wake word (returns immediately, the turn runs on its own thread)"""
+        self.orchestrator.trigger()
 
     def on_wake_word_detected(self, wakeword, score):
         print(f"🔊 Wake word '{wakeword}' detected (score: {score:.2f})")
         self.on_voice_trigger()
 
+    def stop(self):
+        """Ask run() to return"""
+        self.stop_event.set()
+
     def run(self):
         """Start system with wake word only"""
         print("✅ Voice assistant initialized. Waiting for wake word ('alexa')...")
 
         try:
-            # Start wake word detector in a separate thread to avoid blocking
-            self.detector.start()
+            # Open the shared microphone stream, then start the wake word detector
+            self.capture.start()
+            if self.detector:
+                self.detector.start()
 
-            while True:
-                time.sleep(1)
+            # Idle until stop() (the timeout keeps Ctrl+C responsive on Windows)
+            while not self.stop_event.wait(timeout=1.0):
+                pass
 
         except KeyboardInterrupt:
             print("\n🛑 Exiting...")
@@ -122,14 +133,50 @@ class VoiceAssistant:
             traceback.print_exc()
         finally:
             print("Cleaning up...")
-            self.detector.stop()
-            self.detector.cleanup()
+            self.orchestrator.cancel()
+            if self.detector:
+                self.detector.stop()
+                self.detector.cleanup()
+            self.recorder.cleanup()
+            self.capture.cleanup()
+            if self._owns_audio_source:
+                # An injected source belongs to the caller
+                self.audio_source.terminate()
+            # The injected service or the shared one, whichever this assistant speaks through
+            self.tts.shutdown()
+            if self._owns_llm:
+                # Also closes the backend's pooled connections
+                self.llm.close()
+            print(f"📊 Stage latencies: {self.tracer.summary()}")
+            self.tracer.close()
             if self.glasses:
                 self.glasses.close()
 
 
 if __name__ == "__main__":
-    assistant = VoiceAssistant()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Voice assistant.", add_help=False)
+    parser.add_argument("--bench", action="store_true",
+                        help="Run the headless benchmark instead (see python main.py --bench --help).")
+    parser.add_argument("--llm-url", default=None,
+                        help="OpenAI-compatible API root (e.g. http://127.0.0.1:8080/v1 for llama.cpp) instead of LM Studio.")
+    parser.add_argument("--llm-model", default=None, help="Model name for --llm-url. Default: first model listed.")
+    parser.add_argument("--trace-path", default="turn_traces.jsonl",
+                        help="JSONL file receiving the stage spans of every turn ('' to disable).")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve the stage latency percentiles on http://127.0.0.1:<port>/metrics (Prometheus).")
+    args, remaining = parser.parse_known_args()
+    if args.bench:
+        import bench
+        raise SystemExit(bench.main(remaining))
+
+    llm_backend = None
+    if args.llm_url:
+        from llm_backends import OpenAICompatibleBackend
+        llm_backend = OpenAICompatibleBackend(args.llm_url, model=args.llm_model)
+
+    assistant = VoiceAssistant(trace_path=args.trace_path or None, metrics_port=args.metrics_port, llm_backend=llm_backend)
 
     try:
         assistant.run()
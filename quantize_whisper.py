@@ -0,0 +1,64 @@
+"""
+Produce dynamically quantized int8 Whisper encoder and decoder ONNX files for the CPU backend.
+
+Usage:
+    python -m quantize_whisper [--model-dir build/whisper_base_en] [--per-channel] [--force]
+"""
+import argparse
+from pathlib import Path
+
+from stt import MODEL_DIR, ENCODER_FILE, DECODER_FILE, quantized_path
+
+
+def quantize_model(model_path: Path, per_channel: bool = False, force: bool = False) -> Path:
+    """
+    Quantize the weights of one ONNX model to int8 (activations stay float, quantized at run time).
+
+    Args:
+        model_path (Path): Path to the float ONNX model.
+        per_channel (bool): Quantize weights per output channel (more accurate, slightly larger).
+        force (bool): Overwrite an existing quantized model.
+
+    Returns:
+        Path: Path to the quantized model.
+
+    Raises:
+        FileNotFoundError: If the float model does not exist.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    if not model_path.exists():
+        raise FileNotFoundError(f"{model_path} not found.")
+    output_path = quantized_path(model_path)
+    if output_path.exists() and not force:
+        print(f"⏭️ {output_path} already exists (use --force to regenerate).")
+        return output_path
+
+    print(f"⚙️ Quantizing {model_path.name}...")
+    quantize_dynamic(
+        str(model_path),
+        str(output_path),
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+        # Large exported models keep their weights in external data files
+        use_external_data_format=any(model_path.parent.glob(model_path.stem + "*.data")),
+    )
+    size_before = model_path.stat().st_size / 1e6
+    size_after = output_path.stat().st_size / 1e6
+    print(f"✅ {output_path.name}: {size_before:.1f} MB -> {size_after:.1f} MB")
+    return output_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Quantize the Whisper ONNX models to int8 for the CPU backend.")
+    parser.add_argument("--model-dir", type=Path, default=MODEL_DIR, help="Directory containing the Whisper ONNX files.")
+    parser.add_argument("--per-channel", action="store_true", help="Use per-channel weight quantization.")
+    parser.add_argument("--force", action="store_true", help="Overwrite existing quantized models.")
+    args = parser.parse_args()
+
+    for file_name in (ENCODER_FILE, DECODER_FILE):
+        quantize_model(args.model_dir / file_name, per_channel=args.per_channel, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,27 @@
-import pyaudio
 import wave
 import threading
+import time
+import queue
 import numpy as np
-from collections import deque
+from resampler import StreamingResampler
+from audio_source import PyAudioSource
 
 class MicrophoneSelector:
     """Classe pour détecter et gérer les microphones disponibles"""
     
-    def __init__(self):
-        self.audio = pyaudio.PyAudio()
+    def __init__(self, source=None):
+        """
+        Args:
+            source: AudioSource à interroger (par défaut : PyAudioSource)
+        """
+        self._owns_source = source is None
+        self.source = source or PyAudioSource()
         self.microphones = []
         self._detect_microphones()
     
     def _detect_microphones(self):
         """Détecte tous les microphones disponibles"""
-        self.microphones = []
-        info = self.audio.get_host_api_info_by_index(0)
-        num_devices = info.get('deviceCount')
-        
-        for i in range(num_devices):
-            device_info = self.audio.get_device_info_by_host_api_device_index(0, i)
-            if device_info.get('maxInputChannels') > 0:
-                self.microphones.append({
-                    'index': i,
-                    'name': device_info.get('name'),
-                    'channels': device_info.get('maxInputChannels'),
-                    'sample_rate': device_info.get('defaultSampleRate')
-                })
+        self.microphones = self.source.list_input_devices()
     
     def get_microphones(self):
         """Retourne la liste des microphones disponibles"""
@@ -39,112 +34,274 @@ class MicrophoneSelector:
         return None
     
     def cleanup(self):
-        """Nettoie les ressources PyAudio"""
-        self.audio.terminate()
+        """Nettoie les ressources audio (seulement si la source a été créée ici)"""
+        if self._owns_source:
+            self.source.terminate()
 
 
 class SilenceDetector:
-    """Classe pour détecter le silence dans l'audio"""
+    """
+    Classe pour détecter le silence dans l'audio.
+    Traitement en une seule passe par chunk : énergie en arithmétique entière,
+    compteur de chunks silencieux consécutifs (décision O(1)) et seuil adaptatif
+    suivant le bruit de fond de la pièce.
+    """
     
-    def __init__(self, silence_threshold=1000, silence_duration=2.0, sample_rate=44100):
+    def __init__(self, silence_threshold=1000, silence_duration=2.0, sample_rate=44100, chunk_size=1024,
+                 adaptive=True, noise_margin=3.0, min_threshold=150, noise_adapt_rate=0.05):
+        """
+        Args:
+            silence_threshold: Seuil RMS initial, utilisé tel quel si adaptive=False
+            silence_duration: Durée de silence avant arrêt (secondes)
+            sample_rate: Taux d'échantillonnage des chunks analysés
+            chunk_size: Nombre d'échantillons par chunk
+            adaptive: Active l'adaptation du seuil au bruit de fond
+            noise_margin: Rapport entre le seuil et le bruit de fond estimé
+            min_threshold: Seuil minimal en mode adaptatif
+            noise_adapt_rate: Vitesse de suivi du bruit de fond (0-1)
+        """
         self.silence_threshold = silence_threshold  # Seuil d'amplitude pour détecter le silence
         self.silence_duration = silence_duration    # Durée de silence avant arrêt (secondes)
         self.sample_rate = sample_rate
-        self.silence_frames = int(silence_duration * sample_rate / 1024)  # Nombre de frames de silence
-        self.recent_volumes = deque(maxlen=self.silence_frames)
+        self.chunk_size = chunk_size
+        self.silence_frames = int(silence_duration * sample_rate / chunk_size)  # Nombre de frames de silence
+        
+        self.adaptive = adaptive
+        self.noise_margin = noise_margin
+        self.min_threshold = min_threshold
+        self.noise_adapt_rate = noise_adapt_rate
+        self.noise_floor = None  # Conservé d'un enregistrement à l'autre (propriété de la pièce)
+        
+        self.silent_count = 0
+        self.last_volume = 0.0
+        self.last_is_speech = False
         self.is_recording_started = False
         self.speech_detected = False
     
+    @property
+    def threshold(self):
+        """Seuil effectivement appliqué au chunk suivant"""
+        if not self.adaptive or self.noise_floor is None:
+            return self.silence_threshold
+        return max(self.min_threshold, self.noise_floor * self.noise_margin)
+    
     def _calculate_volume(self, audio_data):
-        """Calcule le volume RMS de manière sécurisée"""
-        try:
-            # Convertir les données audio en numpy array
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
-            # Vérifier que le array n'est pas vide
-            if len(audio_array) == 0:
-                return 0.0
-            
-            # Calculer le volume (RMS) avec protection contre les valeurs invalides
-            mean_square = np.mean(audio_array.astype(np.float64) ** 2)
-            
-            # Vérifier que la valeur est valide
-            if np.isnan(mean_square) or np.isinf(mean_square) or mean_square < 0:
-                return 0.0
-            
-            volume = np.sqrt(mean_square)
-            
-            # Vérifier le résultat final
-            if np.isnan(volume) or np.isinf(volume):
-                return 0.0
-                
-            return float(volume)
-            
-        except Exception as e:
-            print(f"Erreur dans le calcul du volume: {e}")
+        """Calcule le volume RMS (somme des carrés accumulée en entiers 64 bits)"""
+        audio_array = audio_data if isinstance(audio_data, np.ndarray) else np.frombuffer(audio_data, dtype=np.int16)
+        if len(audio_array) == 0:
             return 0.0
+        energy = np.einsum('i,i->', audio_array, audio_array, dtype=np.int64)
+        return float(np.sqrt(energy / len(audio_array)))
+    
+    def _update_noise_floor(self, volume, is_speech):
+        """
+        Suivi asymétrique du bruit de fond : descente rapide, montée lente.
+        Un chunk de parole n'initialise ni ne remonte jamais le bruit de fond
+        (un enregistrement peut commencer en pleine phrase).
+        """
+        if is_speech:
+            return
+        if self.noise_floor is None:
+            self.noise_floor = volume
+        elif volume < self.noise_floor:
+            self.noise_floor += 0.5 * (volume - self.noise_floor)
+        else:
+            self.noise_floor += self.noise_adapt_rate * (volume - self.noise_floor)
     
     def process_audio_chunk(self, audio_data):
         """
         Analyse un chunk audio et détermine s'il y a du silence
-        Retourne True si l'enregistrement doit continuer, False pour arrêter
+        Retourne True si l'enregistrement doit continuer, False pour arrêter.
+        Le volume calculé est disponible dans last_volume.
         """
-        # Calculer le volume de manière sécurisée
         volume = self._calculate_volume(audio_data)
-        self.recent_volumes.append(volume)
+        self.last_volume = volume
         
-        # Détecter si on commence à parler
-        if volume > self.silence_threshold:
+        is_speech = volume > self.threshold
+        self.last_is_speech = is_speech
+        if self.adaptive:
+            self._update_noise_floor(volume, is_speech)
+        
+        if is_speech:
+            # Détecter si on commence à parler
             self.speech_detected = True
             self.is_recording_started = True
+            self.silent_count = 0
+        else:
+            self.silent_count += 1
         
         # Si on n'a pas encore commencé à parler, continuer l'enregistrement
         if not self.speech_detected:
             return True
         
-        # Vérifier si toutes les frames récentes sont en dessous du seuil
-        if len(self.recent_volumes) >= self.silence_frames:
-            if all(vol < self.silence_threshold for vol in self.recent_volumes):
-                return False  # Arrêter l'enregistrement
-        
-        return True  # Continuer l'enregistrement
+        # Arrêter après silence_frames chunks silencieux consécutifs
+        return self.silent_count < self.silence_frames
+    
+    def measure(self, audio_data):
+        """
+        Mesure un chunk sans modifier l'état du détecteur.
+        Retourne (volume, is_speech)
+        """
+        volume = self._calculate_volume(audio_data)
+        return volume, volume > self.threshold
+    
+    def observe(self, audio_data):
+        """
+        Mesure un chunk hors décision d'arrêt (pré-roll, audio entre deux enregistrements) :
+        seul le bruit de fond est mis à jour.
+        Retourne (volume, is_speech)
+        """
+        volume, is_speech = self.measure(audio_data)
+        if self.adaptive:
+            self._update_noise_floor(volume, is_speech)
+        return volume, is_speech
     
     def reset(self):
         """Remet à zéro le détecteur pour un nouvel enregistrement"""
-        self.recent_volumes.clear()
+        self.silent_count = 0
+        self.last_volume = 0.0
+        self.last_is_speech = False
         self.is_recording_started = False
         self.speech_detected = False
 
 
+class AudioBuffer:
+    """Tampon int16 préalloué dans lequel les chunks audio sont copiés sur place"""
+    
+    def __init__(self, sample_rate, max_duration=30.0, initial_duration=10.0):
+        """
+        Args:
+            sample_rate: Taux d'échantillonnage des données stockées
+            max_duration: Durée maximale conservée en secondes (None = illimitée)
+            initial_duration: Capacité allouée au départ en secondes
+        """
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_duration * sample_rate) if max_duration else None
+        
+        capacity = int(initial_duration * sample_rate)
+        if self.max_samples is not None:
+            capacity = min(capacity, self.max_samples)
+        self._data = np.empty(max(capacity, 1), dtype=np.int16)
+        self._length = 0
+    
+    def __len__(self):
+        return self._length
+    
+    @property
+    def is_full(self):
+        """Indique si la durée maximale est atteinte"""
+        return self.max_samples is not None and self._length >= self.max_samples
+    
+    @property
+    def duration(self):
+        """Durée stockée en secondes"""
+        return self._length / self.sample_rate
+    
+    def clear(self):
+        """Vide le tampon sans libérer la mémoire allouée"""
+        self._length = 0
+    
+    def write(self, samples):
+        """
+        Copie des échantillons à la suite du tampon.
+        Retourne le nombre d'échantillons écrits (tronqué si la durée maximale est atteinte)
+        """
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        
+        count = len(samples)
+        if self.max_samples is not None:
+            count = min(count, self.max_samples - self._length)
+        if count <= 0:
+            return 0
+        
+        end = self._length + count
+        if end > len(self._data):
+            self._grow(end)
+        self._data[self._length:end] = samples[:count]
+        self._length = end
+        return count
+    
+    def _grow(self, min_capacity):
+        """Agrandit la zone allouée (doublement, borné par la durée maximale)"""
+        capacity = max(min_capacity, 2 * len(self._data))
+        if self.max_samples is not None:
+            capacity = min(capacity, self.max_samples)
+        data = np.empty(capacity, dtype=np.int16)
+        data[:self._length] = self._data[:self._length]
+        self._data = data
+    
+    def view(self, start=0, stop=None):
+        """
+        Retourne une vue numpy (sans copie) sur les échantillons enregistrés.
+        La vue reste valide jusqu'au prochain clear() du tampon.
+        """
+        return self._data[:self._length][start:stop]
+
+
 class AudioRecorder:
     """Classe principale pour l'enregistrement audio"""
     
-    def __init__(self):
+    def __init__(self, max_duration=30.0, target_sample_rate=16000, capture=None, source=None):
+        """
+        Args:
+            max_duration: Durée maximale d'un enregistrement en secondes
+            target_sample_rate: Taux fourni au STT (16 kHz pour Whisper). Le micro est ouvert
+                nativement à ce taux s'il le supporte, sinon chaque chunk est rééchantillonné
+                à la volée. None = capture au taux par défaut (44100 Hz) sans conversion.
+            capture: AudioCaptureService partagé. Si fourni, l'enregistrement s'abonne au flux
+                déjà ouvert (avec pré-roll) au lieu d'ouvrir le micro à chaque tour.
+            source: AudioSource utilisée sans capture partagée (micro, fichier, générateur).
+                Par défaut : celle de la capture partagée, sinon PyAudioSource.
+        """
         self.chunk_size = 1024
-        self.sample_format = pyaudio.paInt16
+        self.sample_width = 2  # int16
         self.channels = 1
-        self.sample_rate = 44100
+        self.target_sample_rate = target_sample_rate
+        self.sample_rate = target_sample_rate or 44100  # Taux des données enregistrées
+        self.capture_rate = self.sample_rate            # Taux d'ouverture du micro (négocié)
+        self.capture_chunk_size = self.chunk_size
         self.microphone_index = None
+        self.capture = capture
+        self._capture_queue = None
+        self._pre_roll_chunks = 0
         
         self.is_recording = False
-        self.audio_data = []
+        self.audio_buffer = AudioBuffer(self.sample_rate, max_duration=max_duration)
         self.recording_thread = None
 
         self._recording_lock = threading.Lock()
         self._stop_requested = False
+        self._stopped = threading.Event()  # Levé à la fin de chaque enregistrement
+        self._stopped.set()
         
         # Composants
-        self.mic_selector = MicrophoneSelector()
+        self._owns_source = source is None and capture is None
+        self.source = source or (capture.source if capture else PyAudioSource())
+        self.mic_selector = MicrophoneSelector(self.source)
         self.silence_detector = SilenceDetector(
             silence_threshold=500, 
             silence_duration=1.0,
-            sample_rate=self.sample_rate
+            sample_rate=self.sample_rate,
+            chunk_size=self.chunk_size
         )
         
         # Callbacks
         self.on_recording_start = None
         self.on_recording_stop = None
         self.on_volume_update = None
+        self.on_audio_chunk = None  # Reçoit chaque chunk enregistré (int16, au taux sample_rate)
+        
+        # Piste d'énergie : (fin du chunk dans le tampon, volume RMS, parole détectée) par chunk
+        self.energy_track = []
+        
+        # Horodatages (time.monotonic) du dernier enregistrement, pour mesurer la fin de parole
+        self.last_speech_at = None  # Dernier chunk de parole (hors pré-roll)
+        self.stopped_at = None      # Audio complet dans le tampon
+        
+        # Le bruit de fond est suivi en continu sur le flux partagé, pas seulement pendant les tours
+        if self.capture:
+            self.capture.subscribe(self._on_idle_chunk)
     
     def set_microphone(self, mic_index):
         """Définit le microphone à utiliser"""
@@ -154,24 +311,61 @@ class AudioRecorder:
         """Configure les paramètres de détection de silence"""
         self.silence_detector.silence_threshold = threshold
         self.silence_detector.silence_duration = duration
-        self.silence_detector.silence_frames = int(duration * self.sample_rate / self.chunk_size)
-        self.silence_detector.recent_volumes = deque(maxlen=self.silence_detector.silence_frames)
+        self._update_silence_frames()
     
-    def start_recording(self):
+    def _update_silence_frames(self):
+        """Recalcule le nombre de chunks de silence pour le taux de capture courant"""
+        self.silence_detector.sample_rate = self.capture_rate
+        self.silence_detector.chunk_size = self.capture_chunk_size
+        self.silence_detector.silence_frames = int(
+            self.silence_detector.silence_duration * self.capture_rate / self.capture_chunk_size
+        )
+    
+    def _negotiate_capture_rate(self):
+        """
+        Choisit le taux d'ouverture du micro : le taux cible s'il est supporté nativement,
+        sinon le taux par défaut du périphérique (les chunks seront alors rééchantillonnés).
+        Uniquement sans capture partagée : AudioCaptureService négocie son propre taux.
+        """
+        if not self.target_sample_rate:
+            return self.sample_rate
+        
+        if self.source.is_format_supported(self.target_sample_rate, self.microphone_index, self.channels):
+            return self.target_sample_rate
+        
+        return self.source.default_sample_rate(self.microphone_index)
+    
+    def start_recording(self, pre_roll=0.0):
+        """
+        Démarre l'enregistrement dans un thread.
+        
+        Args:
+            pre_roll: Secondes d'audio déjà capturé à inclure au début de l'enregistrement
+                (uniquement avec un AudioCaptureService partagé)
+        """
         with self._recording_lock:
             if self.is_recording:
                 return False
             
-            if self.microphone_index is None:
+            if self.capture is None and self.microphone_index is None:
                 print("Erreur: Aucun microphone sélectionné")
                 return False
             
             self.is_recording = True
             self._stop_requested = False
-            self.audio_data = []
+            self._stopped.clear()
+            self.audio_buffer.clear()
+            self.energy_track = []
+            self.last_speech_at = None
+            self.stopped_at = None
             self.silence_detector.reset()
             
             try:  # 🔒 NOUVEAU : Gestion d'erreur
+                if self.capture:
+                    # Abonnement immédiat : le pré-roll est figé au moment du déclenchement
+                    self._capture_queue = queue.Queue()
+                    self._pre_roll_chunks = self.capture.subscribe(self._on_capture_chunk, pre_roll=pre_roll)
+                
                 self.recording_thread = threading.Thread(target=self._record_audio)
                 self.recording_thread.daemon = True
                 self.recording_thread.start()
@@ -181,7 +375,10 @@ class AudioRecorder:
                 return True
             except Exception as e:  # 🔒 NOUVEAU : Gestion d'erreur
                 print(f"Erreur lors du démarrage du thread d'enregistrement: {e}")
+                if self.capture:
+                    self.capture.unsubscribe(self._on_capture_chunk)
                 self.is_recording = False
+                self._stopped.set()
                 return False
     
     def stop_recording(self):
@@ -205,6 +402,19 @@ class AudioRecorder:
             else:
                 print("✅ Thread d'enregistrement arrêté proprement")
 
+    def wait_until_stopped(self, timeout=None):
+        """
+        Attend la fin de l'enregistrement en cours (silence, durée maximale ou arrêt manuel).
+        L'audio est complet dans le tampon dès le retour.
+        
+        Args:
+            timeout: Attente maximale en secondes (None = illimitée)
+        
+        Returns:
+            bool: True si l'enregistrement est terminé, False si le délai a expiré
+        """
+        return self._stopped.wait(timeout)
+
     def _safe_callback(self, callback, *args):
         """Appelle un callback de manière sécurisée"""
         if callback:
@@ -213,23 +423,62 @@ class AudioRecorder:
             except Exception as e:
                 print(f"Erreur dans le callback: {e}")
     
+    def _on_idle_chunk(self, chunk, timestamp):
+        """Met à jour le bruit de fond entre deux enregistrements (thread de capture)"""
+        if not self.is_recording:
+            self.silence_detector.observe(chunk)
+    
+    def _on_capture_chunk(self, chunk, timestamp):
+        """Reçoit les chunks du flux partagé (thread de capture)"""
+        self._capture_queue.put(chunk)
+    
+    def _read_chunk(self, stream):
+        """Lit le prochain chunk depuis le flux partagé ou le stream PyAudio propre"""
+        if self.capture:
+            try:
+                return self._capture_queue.get(timeout=0.1)
+            except queue.Empty:
+                return None
+        return stream.read(self.capture_chunk_size)
+    
+    def _store_chunk(self, samples):
+        """Ajoute un chunk au tampon et le transmet au callback on_audio_chunk"""
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        written = self.audio_buffer.write(samples)
+        if written and self.on_audio_chunk:
+            self._safe_callback(self.on_audio_chunk, samples[:written])
+    
     def _record_audio(self):
         """Fonction d'enregistrement exécutée dans un thread avec protection complète"""
-        audio = None
         stream = None
+        resampler = None
         
         try:
             print("🎤 Initialisation de l'enregistrement...")
-            audio = pyaudio.PyAudio()
+            if self.capture:
+                capture_rate = self.capture.sample_rate
+                capture_chunk_size = self.capture.chunk_size
+            else:
+                capture_rate = self._negotiate_capture_rate()
+                capture_chunk_size = self.chunk_size
+            
+            if (capture_rate, capture_chunk_size) != (self.capture_rate, self.capture_chunk_size):
+                self.capture_rate = capture_rate
+                self.capture_chunk_size = capture_chunk_size
+                self._update_silence_frames()
             
-            stream = audio.open(
-                format=self.sample_format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                frames_per_buffer=self.chunk_size,
-                input=True,
-                input_device_index=self.microphone_index
-            )
+            if self.capture_rate != self.sample_rate:
+                resampler = StreamingResampler(self.capture_rate, self.sample_rate)
+                print(f"🔁 Capture à {self.capture_rate} Hz, rééchantillonnage vers {self.sample_rate} Hz")
+            
+            if not self.capture:
+                stream = self.source.open_stream(
+                    self.capture_rate,
+                    self.chunk_size,
+                    channels=self.channels,
+                    device_index=self.microphone_index
+                )
             
             print("🔴 Enregistrement démarré")
             
@@ -242,21 +491,45 @@ class AudioRecorder:
                 
                 try:
                     # Lire les données audio
-                    data = stream.read(self.chunk_size, exception_on_overflow=False)
-                    self.audio_data.append(data)
+                    data = self._read_chunk(stream)
+                    if data is None:
+                        continue
+                    if resampler:
+                        self._store_chunk(resampler.process(data))
+                    else:
+                        self._store_chunk(data)
+                    
+                    if self.audio_buffer.is_full:
+                        print("⏱️ Durée maximale atteinte - arrêt automatique")
+                        with self._recording_lock:
+                            self.is_recording = False
+                        break
+                    
+                    # Le pré-roll (fin du mot de réveil) ne compte pas comme début de parole
+                    if self._pre_roll_chunks > 0:
+                        self._pre_roll_chunks -= 1
+                        volume, is_speech = self.silence_detector.observe(data)
+                        self.energy_track.append((len(self.audio_buffer), volume, is_speech))
+                        continue
                     
                     # Détecter le silence seulement si pas d'arrêt manuel demandé
                     with self._recording_lock:
                         if not self._stop_requested:
                             should_continue = self.silence_detector.process_audio_chunk(data)
+                            self.energy_track.append((
+                                len(self.audio_buffer),
+                                self.silence_detector.last_volume,
+                                self.silence_detector.last_is_speech
+                            ))
+                            if self.silence_detector.last_is_speech:
+                                self.last_speech_at = time.monotonic()
                             if not should_continue:
                                 print("🤫 Silence détecté - arrêt automatique")
                                 self.is_recording = False
                                 break
                     
                     # Notifier le volume pour l'interface (callback sécurisé)
-                    volume = self.silence_detector._calculate_volume(data)
-                    self._safe_callback(self.on_volume_update, volume)
+                    self._safe_callback(self.on_volume_update, self.silence_detector.last_volume)
                     
                 except Exception as e:
                     print(f"Erreur lors de la lecture audio: {e}")
@@ -268,24 +541,24 @@ class AudioRecorder:
             # Nettoyage sécurisé des ressources
             print("🧹 Nettoyage des ressources audio...")
             
+            if self.capture:
+                self.capture.unsubscribe(self._on_capture_chunk)
+            
+            if resampler:
+                self._store_chunk(resampler.flush())
+            
             if stream:
                 try:
-                    stream.stop_stream()
                     stream.close()
                     print("✅ Stream audio fermé")
                 except Exception as e:
                     print(f"Erreur lors de la fermeture du stream: {e}")
             
-            if audio:
-                try:
-                    audio.terminate()
-                    print("✅ PyAudio terminé")
-                except Exception as e:
-                    print(f"Erreur lors de la terminaison de PyAudio: {e}")
-            
             # Mettre à jour l'état final
             with self._recording_lock:
                 self.is_recording = False
+            self.stopped_at = time.monotonic()
+            self._stopped.set()
             
             print("🏁 Thread d'enregistrement terminé")
             
@@ -294,29 +567,41 @@ class AudioRecorder:
     
     def save_recording(self, filename):
         """Sauvegarde l'enregistrement dans un fichier WAV"""
-        if not self.audio_data:
+        if not len(self.audio_buffer):
             return False
         
         try:
             with wave.open(filename, 'wb') as wav_file:
                 wav_file.setnchannels(self.channels)
-                wav_file.setsampwidth(pyaudio.get_sample_size(self.sample_format))
+                wav_file.setsampwidth(self.sample_width)
                 wav_file.setframerate(self.sample_rate)
-                wav_file.writeframes(b''.join(self.audio_data))
+                wav_file.writeframes(self.audio_buffer.view())
                 print("File saved")
             return True
         except Exception as e:
             print(f"Erreur de sauvegarde: {e}")
             return False
     
+    def get_audio_array(self):
+        """Retourne une vue numpy int16 (sans copie) de l'enregistrement"""
+        return self.audio_buffer.view()
+    
+    def get_energy_track(self):
+        """
+        Retourne la piste d'énergie du dernier enregistrement :
+        liste de (fin du chunk en échantillons au taux sample_rate, volume RMS, parole détectée)
+        """
+        return list(self.energy_track)
+    
     def get_recording_duration(self):
         """Retourne la durée de l'enregistrement en secondes"""
-        if not self.audio_data:
-            return 0
-        total_frames = len(self.audio_data) * self.chunk_size
-        return total_frames / self.sample_rate
+        return self.audio_buffer.duration
     
     def cleanup(self):
         """Nettoie les ressources"""
         self.stop_recording()
-        self.mic_selector.cleanup()
\ No newline at end of file
+        if self.capture:
+            self.capture.unsubscribe(self._on_idle_chunk)
+        self.mic_selector.cleanup()
+        if self._owns_source:
+            self.source.terminate()
\ No newline at end of file
@@ -0,0 +1,103 @@
+import numpy as np
+from math import gcd
+
+
+class StreamingResampler:
+    """
+    Streaming polyphase resampler converting int16 PCM chunk by chunk.
+
+    The filter state is carried between calls, so chunks can be converted as
+    they are captured and the concatenated output is identical to resampling
+    the whole signal at once.
+    """
+
+    def __init__(
+        self,
+        input_rate: int,
+        output_rate: int,
+        zero_crossings: int = 16,
+        cutoff_ratio: float = 0.9,
+        kaiser_beta: float = 10.0,
+        taps_per_phase: int | None = None,
+    ) -> None:
+        """
+        Initialize the resampler.
+
+        Args:
+            input_rate (int): Sample rate of the incoming audio in Hz.
+            output_rate (int): Sample rate of the produced audio in Hz.
+            zero_crossings (int): Sinc lobes kept on each side of the anti-aliasing filter, counted
+                at the narrower of the two rates. Higher is sharper but slower.
+            cutoff_ratio (float): Cutoff of the anti-aliasing filter as a fraction of the narrower
+                Nyquist frequency. Below 1 so the transition band ends before the aliasing starts.
+            kaiser_beta (float): Kaiser window shape parameter of the anti-aliasing filter.
+            taps_per_phase (int | None): FIR length of each polyphase branch. Default: derived from zero_crossings.
+        """
+        divisor = gcd(int(input_rate), int(output_rate))
+        self.input_rate = int(input_rate)
+        self.output_rate = int(output_rate)
+        self.up = self.output_rate // divisor
+        self.down = self.input_rate // divisor
+        factor = max(self.up, self.down)
+        self.taps_per_phase = taps_per_phase or -(-2 * zero_crossings * factor // self.up)
+
+        # Windowed-sinc low-pass below the narrower of the two Nyquist frequencies,
+        # designed at the upsampled rate and scaled for a unit DC gain.
+        num_taps = self.taps_per_phase * self.up
+        cutoff = cutoff_ratio / factor
+        t = np.arange(num_taps) - (num_taps - 1) / 2.0
+        h = np.sinc(cutoff * t) * np.kaiser(num_taps, kaiser_beta)
+        h *= self.up / h.sum()
+
+        # bank[p, k] = h[p + k * up], reversed along k to match ascending input windows
+        self._bank = h.reshape(self.taps_per_phase, self.up).T[:, ::-1].astype(np.float32)
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clear the filter history, e.g. before a new recording.
+        """
+        self._history = np.zeros(self.taps_per_phase - 1, dtype=np.float32)
+        self._position = 0  # upsampled-time offset of the next output, relative to the next input
+
+    def process(self, samples: np.ndarray | bytes) -> np.ndarray:
+        """
+        Resample one chunk of audio.
+
+        Args:
+            samples (np.ndarray | bytes): Mono int16 samples (array or raw little-endian bytes).
+
+        Returns:
+            np.ndarray: Resampled int16 samples. May be empty for very small inputs.
+        """
+        if not isinstance(samples, np.ndarray):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        if self.up == self.down:
+            return samples.astype(np.int16, copy=False)
+
+        length = len(samples)
+        extended = np.concatenate((self._history, samples.astype(np.float32)))
+        span = length * self.up
+
+        count = max(0, -(-(span - self._position) // self.down))
+        if count:
+            positions = self._position + np.arange(count) * self.down
+            windows = np.lib.stride_tricks.sliding_window_view(extended, self.taps_per_phase)
+            output = np.einsum("ij,ij->i", windows[positions // self.up], self._bank[positions % self.up])
+        else:
+            output = np.zeros(0, dtype=np.float32)
+
+        self._position += count * self.down - span
+        self._history = extended[len(extended) - (self.taps_per_phase - 1):]
+        return np.clip(np.rint(output), -32768, 32767).astype(np.int16)
+
+    def flush(self) -> np.ndarray:
+        """
+        Push the samples still held in the filter delay line out of the resampler.
+
+        Returns:
+            np.ndarray: The trailing int16 samples.
+        """
+        tail = self.process(np.zeros(self.taps_per_phase // 2, dtype=np.int16))
+        self.reset()
+        return tail
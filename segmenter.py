@@ -0,0 +1,192 @@
+class SentenceSegmenter:
+    """
+    Incremental sentence segmenter for streamed LLM text.
+
+    Fragments are appended as they arrive and only the new characters are scanned.
+    Sentences end on '.', '!', '?' or '…' followed by whitespace, except after common
+    abbreviations ("Dr.", "e.g.") and inside numbers ("3.5"). To start speaking sooner,
+    the first segment of an answer may be flushed early on a comma or before a
+    conjunction once it is long enough.
+    """
+
+    SENTENCE_END = ".!?…"
+    CLAUSE_END = ",;:"
+    CLOSERS = "\"')]»”’"
+    ABBREVIATIONS = frozenset({
+        "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "etc", "approx",
+        "e.g", "i.e", "a.m", "p.m", "fig", "inc", "ltd", "co", "dept", "est", "u.s",
+    })
+    # Abbreviations only when a number follows: "No. 5" but "No. I don't think so."
+    NUMBER_ABBREVIATIONS = frozenset({"no"})
+    CONJUNCTIONS = frozenset({"and", "but", "or", "so", "because", "which", "while", "although", "though", "then"})
+    # Words that usually start a sentence: after "plan B." they are not part of a name
+    SENTENCE_STARTERS = frozenset({
+        "a", "an", "the", "i", "it", "he", "she", "we", "they", "you", "this", "that", "these", "those",
+        "there", "here", "then", "now", "so", "but", "and", "if", "when", "my", "your", "our", "its",
+        "his", "her", "their", "yes", "no", "also", "please", "let",
+    })
+
+    def __init__(self, first_min_chars: int = 30, first_max_chars: int = 120, early_first_flush: bool = True) -> None:
+        """
+        Initialize the segmenter.
+
+        Args:
+            first_min_chars (int): Minimum length of an early-flushed first segment.
+            first_max_chars (int): Length after which the first segment is flushed at the last space
+                even without punctuation.
+            early_first_flush (bool): Allow the first segment to end on a clause boundary.
+        """
+        self.first_min_chars = first_min_chars
+        self.first_max_chars = first_max_chars
+        self.early_first_flush = early_first_flush
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Forget all text, ready for a new answer.
+        """
+        self._parts: list[str] = []
+        self._pending = ""
+        self._unjoined: list[str] = []  # Fragments not appended to _pending yet
+        self._scan = 0  # Next index of _pending to examine
+        self._segments_emitted = 0
+
+    @property
+    def text(self) -> str:
+        """
+        str: Everything fed so far.
+        """
+        return "".join(self._parts)
+
+    def feed(self, fragment: str) -> list[str]:
+        """
+        Append a streamed fragment.
+
+        Args:
+            fragment (str): New text from the model.
+
+        Returns:
+            list[str]: Segments completed by this fragment, ready to be spoken.
+        """
+        if not fragment:
+            return []
+        self._parts.append(fragment)
+        self._unjoined.append(fragment)
+        # Past the first segment only sentence punctuation can end one: fragments are
+        # joined once per sentence instead of once per token
+        waiting = self._scan < len(self._pending)
+        if self._segments_emitted and not waiting and not any(c in self.SENTENCE_END for c in fragment):
+            return []
+        self._pending += "".join(self._unjoined)
+        self._unjoined.clear()
+
+        segments = []
+        while True:
+            end = self._find_boundary()
+            if end is None:
+                break
+            segment = self._pending[:end].strip()
+            self._pending = self._pending[end:].lstrip()
+            self._scan = 0
+            if segment:
+                segments.append(segment)
+                self._segments_emitted += 1
+        return segments
+
+    def flush(self) -> str:
+        """
+        Return the unterminated remainder at the end of the stream and reset the pending text.
+
+        Returns:
+            str: The remaining text, possibly empty.
+        """
+        remaining = (self._pending + "".join(self._unjoined)).strip()
+        self._pending = ""
+        self._unjoined.clear()
+        self._scan = 0
+        if remaining:
+            self._segments_emitted += 1
+        return remaining
+
+    def _find_boundary(self) -> int | None:
+        """
+        Scan _pending from where the previous call stopped.
+
+        Returns:
+            int | None: End index of the next segment, or None if more text is needed.
+        """
+        pending = self._pending
+        first = self._segments_emitted == 0
+        early = first and self.early_first_flush
+        i = self._scan
+        while i < len(pending):
+            char = pending[i]
+            if char in self.SENTENCE_END or (early and char in self.CLAUSE_END):
+                end = i + 1
+                while end < len(pending) and (pending[end] in self.SENTENCE_END or pending[end] in self.CLOSERS):
+                    end += 1
+                if end == len(pending):
+                    self._scan = i  # Wait for the next character to decide
+                    return None
+                if pending[end].isspace():
+                    boundary = self._is_boundary(pending, i, char)
+                    if boundary is None:
+                        self._scan = i  # Wait for the next word to decide
+                        return None
+                    if boundary:
+                        return end
+                i = end
+                continue
+
+            if early and char.isspace() and i >= self.first_min_chars:
+                # Break before a conjunction once the clause is long enough
+                word_end = i + 1
+                while word_end < len(pending) and pending[word_end].isalpha():
+                    word_end += 1
+                if word_end == len(pending):
+                    self._scan = i  # The next word is not complete yet
+                    return None
+                if pending[i + 1:word_end].lower() in self.CONJUNCTIONS:
+                    return i
+            i += 1
+
+        if first and len(pending) >= self.first_max_chars:
+            cut = pending.rfind(" ", 0, self.first_max_chars)
+            if cut > 0:
+                return cut
+        self._scan = len(pending)
+        return None
+
+    def _is_boundary(self, text: str, index: int, char: str) -> bool | None:
+        """
+        Tell whether the punctuation at index really ends a segment (None: the next
+        word is needed to decide).
+        """
+        if char in self.CLAUSE_END:
+            return len(text[:index].strip()) >= self.first_min_chars
+        if char != ".":
+            return True
+        start = index
+        while start > 0 and (text[start - 1].isalpha() or text[start - 1] == "."):
+            start -= 1
+        word = text[start:index].lower()
+        if word in self.ABBREVIATIONS:
+            return False
+        if word in self.NUMBER_ABBREVIATIONS:
+            following = text[index + 1:].lstrip()
+            if not following:
+                return None
+            return not following[0].isdigit()
+        if len(word) != 1 or not text[start].isupper():
+            return True
+        # Single initials ("J. R. R. Tolkien", "George W. Bush") but not "plan B. It works."
+        following = text[index + 1:].lstrip()
+        word_end = 0
+        while word_end < len(following) and following[word_end].isalpha():
+            word_end += 1
+        if word_end == len(following):
+            return None
+        next_word = following[:word_end]
+        if word_end == 1 and following[1] == ".":
+            return False  # Another initial
+        return not (next_word[:1].isupper() and next_word.lower() not in self.SENTENCE_STARTERS)
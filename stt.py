@@ -1,7 +1,359 @@
-from qai_hub_models.models.whisper_base_en.model import WhisperBaseEn
-from qai_hub_models.models._shared.whisper.app import WhisperApp
-from qai_hub_models.utils.onnx_torch_wrapper import OnnxModelTorchWrapper
 from pathlib import Path
+from typing import Callable
+import io
+import json
+import threading
+import numpy as np
+from recorder import AudioBuffer
+
+
+MODEL_DIR = Path("build/whisper_base_en")
+ENCODER_FILE = "whisper_base_en-whisperencoderinf.onnx"
+DECODER_FILE = "whisper_base_en-whisperdecoderinf.onnx"
+METADATA_FILE = "whisper_config.json"
+QUANTIZED_SUFFIX = ".int8.onnx"
+BACKENDS = ("auto", "npu", "cpu")
+TOKEN_EOT = 50256  # End-of-text token of the English-only Whisper vocabulary
+
+# Speech trimming and decode length bounds
+TRIM_PADDING_SECONDS = 0.25
+TRIM_FRAME_SECONDS = 0.02
+DECODE_BASE_TOKENS = 8         # Start-of-transcript prefix and slack
+DECODE_TOKENS_PER_SECOND = 6.0  # Generous upper bound of the English speech token rate
+METADATA_KEYS = ("num_decoder_blocks", "num_decoder_heads", "attention_dim", "mean_decode_len")
+
+
+def _read_varint(stream) -> int:
+    result, shift = 0, 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            raise ValueError("truncated protobuf varint")
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
+
+
+def _proto_fields(stream, end: int):
+    """
+    Iterate over the fields of a protobuf message stored in stream up to offset end.
+
+    Yields:
+        tuple[int, int, int | tuple[int, int]]: (field number, wire type, value). Varints are
+            decoded; length-delimited values are (offset, length) and skipped unless read by the caller.
+    """
+    while stream.tell() < end:
+        key = _read_varint(stream)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            yield number, wire_type, _read_varint(stream)
+        elif wire_type == 2:
+            length = _read_varint(stream)
+            offset = stream.tell()
+            yield number, wire_type, (offset, length)
+            stream.seek(offset + length)
+        elif wire_type == 1:
+            stream.seek(8, 1)
+        elif wire_type == 5:
+            stream.seek(4, 1)
+        else:
+            raise ValueError(f"unsupported protobuf wire type {wire_type}")
+
+
+def _message_fields(data: bytes) -> dict[int, list]:
+    """
+    Decode one level of a small protobuf message: {field number: [int or bytes values]}.
+    """
+    stream = io.BytesIO(data)
+    fields = {}
+    for number, wire_type, value in _proto_fields(stream, len(data)):
+        if wire_type == 2:
+            offset, length = value
+            value = data[offset:offset + length]
+        fields.setdefault(number, []).append(value)
+    return fields
+
+
+def _onnx_input_shapes(model_path: Path) -> dict[str, list[int]]:
+    """
+    Read the graph input shapes of an ONNX file without loading its weights.
+
+    The protobuf is walked with seeks: only ModelProto.graph (field 7) is entered and only
+    its GraphProto.input entries (field 11) are read, the nodes and initializers are skipped.
+
+    Args:
+        model_path (Path): Path to the ONNX file.
+
+    Returns:
+        dict[str, list[int]]: Input name to dimensions (0 for symbolic dimensions).
+    """
+    shapes = {}
+    with open(model_path, "rb") as f:
+        size = f.seek(0, io.SEEK_END)
+        f.seek(0)
+        for number, wire_type, value in _proto_fields(f, size):
+            if number != 7 or wire_type != 2:
+                continue
+            graph_offset, graph_length = value
+            f.seek(graph_offset)
+            for graph_number, graph_wire_type, graph_value in _proto_fields(f, graph_offset + graph_length):
+                if graph_number != 11 or graph_wire_type != 2:
+                    continue
+                offset, length = graph_value
+                f.seek(offset)
+                value_info = _message_fields(f.read(length))
+                name = value_info[1][0].decode("utf-8")
+                tensor_type = _message_fields(_message_fields(value_info[2][0])[1][0])
+                shape = _message_fields(tensor_type[2][0]) if 2 in tensor_type else {}
+                shapes[name] = [_message_fields(dim).get(1, [0])[0] for dim in shape.get(1, [])]
+    return shapes
+
+
+def _metadata_from_onnx(decoder_path: Path) -> dict | None:
+    """
+    Read the decoder hyperparameters from the shape of its self-attention KV cache input.
+
+    The exported decoder takes k_cache_self shaped
+    (num_decoder_blocks, num_decoder_heads, attention_dim // num_decoder_heads, mean_decode_len).
+
+    Args:
+        decoder_path (Path): Path to the decoder ONNX file.
+
+    Returns:
+        dict | None: The hyperparameters, or None if they cannot be read from the graph.
+    """
+    try:
+        shapes = _onnx_input_shapes(decoder_path)
+    except (OSError, ValueError, KeyError, IndexError, UnicodeDecodeError) as e:
+        print(f"⚠️ Could not read the input shapes of {decoder_path}: {e}")
+        return None
+
+    for name, dims in shapes.items():
+        if "k_cache_self" not in name:
+            continue
+        if len(dims) != 4 or not all(dims):
+            return None
+        blocks, heads, head_dim, decode_len = dims
+        return {
+            "num_decoder_blocks": blocks,
+            "num_decoder_heads": heads,
+            "attention_dim": heads * head_dim,
+            "mean_decode_len": decode_len,
+        }
+    return None
+
+
+def load_whisper_metadata(model_dir: Path | str = MODEL_DIR) -> dict:
+    """
+    Load the Whisper hyperparameters needed by WhisperApp without loading the PyTorch model.
+
+    Looked up in order: the whisper_config.json file next to the ONNX files, then the
+    decoder ONNX graph itself, then (legacy) the PyTorch model.
+
+    Args:
+        model_dir (Path | str): Directory containing the ONNX artifacts.
+
+    Returns:
+        dict: num_decoder_blocks, num_decoder_heads, attention_dim and mean_decode_len.
+    """
+    model_dir = Path(model_dir)
+    metadata_path = model_dir / METADATA_FILE
+    if metadata_path.exists():
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        return {key: int(metadata[key]) for key in METADATA_KEYS}
+
+    decoder_path = model_dir / DECODER_FILE
+    if decoder_path.exists():
+        metadata = _metadata_from_onnx(decoder_path)
+        if metadata is not None:
+            return metadata
+
+    print(f"⚠️ No {METADATA_FILE} in {model_dir}, loading the PyTorch model to read its hyperparameters.")
+    return _metadata_from_torch()
+
+
+def _metadata_from_torch() -> dict:
+    """
+    Read the hyperparameters from the PyTorch model (slow, loads the weights).
+    """
+    from qai_hub_models.models.whisper_base_en.model import WhisperBaseEn
+
+    model = WhisperBaseEn.from_pretrained()
+    return {key: int(getattr(model, key)) for key in METADATA_KEYS}
+
+
+def export_whisper_metadata(model_dir: Path | str = MODEL_DIR) -> Path:
+    """
+    Write whisper_config.json next to the ONNX artifacts. Run once after exporting the model.
+
+    Args:
+        model_dir (Path | str): Directory containing the ONNX artifacts.
+
+    Returns:
+        Path: Path to the written file.
+    """
+    metadata_path = Path(model_dir) / METADATA_FILE
+    metadata_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(_metadata_from_torch(), f, indent=2)
+    return metadata_path
+
+
+def speech_bounds(
+    audio: np.ndarray,
+    sample_rate: int,
+    energy_track: list[tuple] | None = None,
+    padding: float = TRIM_PADDING_SECONDS,
+) -> tuple[int, int] | None:
+    """
+    Locate the speech inside a recording.
+
+    Args:
+        audio (np.ndarray): Mono samples, int16 or float in [-1, 1].
+        sample_rate (int): Sample rate in Hz.
+        energy_track (list[tuple] | None): The recorder's (chunk end sample, volume, is_speech) track.
+            When missing, speech is detected on 20 ms frames against an estimated noise floor.
+        padding (float): Seconds of context kept around the speech.
+
+    Returns:
+        tuple[int, int] | None: (start, end) sample indices, or None if no speech was found.
+    """
+    if energy_track:
+        ends = np.array([entry[0] for entry in energy_track])
+        speech = np.array([entry[2] for entry in energy_track], dtype=bool)
+        starts = np.concatenate(([0], ends[:-1]))
+    else:
+        frame = max(1, int(TRIM_FRAME_SECONDS * sample_rate))
+        count = len(audio) // frame
+        if count == 0:
+            return None
+        scale = 32768.0 if audio.dtype != np.int16 else 1.0
+        framed = audio[:count * frame].reshape(count, frame).astype(np.float32) * scale
+        rms = np.sqrt(np.einsum("ij,ij->i", framed, framed) / frame)
+        # Same rule as the recorder's SilenceDetector: 3x the noise floor, at least 150
+        speech = rms > max(150.0, 3.0 * float(np.percentile(rms, 10)))
+        starts = np.arange(count) * frame
+        ends = starts + frame
+
+    indices = np.flatnonzero(speech)
+    if len(indices) == 0:
+        return None
+    pad = int(padding * sample_rate)
+    start = max(0, int(starts[indices[0]]) - pad)
+    end = min(len(audio), int(ends[indices[-1]]) + pad)
+    return (start, end) if end > start else None
+
+
+class _DecodeBudget:
+    """
+    Wraps the Whisper decoder to cap the number of decoding steps of a transcription.
+
+    WhisperApp always allows mean_decode_len steps (the size of the exported KV cache).
+    Once the budget is spent, the logits are overwritten so that end-of-text is the only
+    choice, which ends the decoding loop early without touching the cache shapes.
+
+    This relies on how WhisperApp calls the decoder: the position index of the decoded
+    token as second input (0 at the start of each 30 s chunk) and mutable logits as first
+    output. If either cannot be used, the budget is disabled with a warning and the
+    decoding runs to its full length, rather than carrying a step count across chunks.
+    """
+
+    def __init__(self, decoder, max_tokens: int) -> None:
+        self.decoder = decoder
+        self.max_tokens = max_tokens
+        self.budget = max_tokens
+        self.steps = 0
+        self.enabled = True
+
+    def set_budget(self, tokens: int) -> None:
+        self.budget = max(1, min(tokens, self.max_tokens))
+        self.steps = 0
+
+    def __call__(self, *args, **kwargs):
+        outputs = self.decoder(*args, **kwargs)
+        if not self.enabled:
+            return outputs
+        index = self._step_index(args, kwargs)
+        if index is None:
+            self._disable("the decoder position index cannot be read")
+            return outputs
+        if index == 0:
+            self.steps = 0  # WhisperApp starts a new 30 s chunk
+        self.steps += 1
+        if self.steps >= self.budget:
+            try:
+                logits = outputs[0]
+                logits[...] = float("-inf")
+                logits[..., TOKEN_EOT] = 0.0
+            except (TypeError, ValueError, IndexError, RuntimeError) as e:
+                self._disable(f"the decoder logits cannot be overwritten ({e})")
+        return outputs
+
+    @staticmethod
+    def _step_index(args, kwargs) -> int | None:
+        """
+        Return the position index of the token being decoded (second decoder input), or None.
+        """
+        index = kwargs.get("index", args[1] if len(args) > 1 else None)
+        if index is None:
+            return None
+        try:
+            return int(np.asarray(index).reshape(-1)[0])
+        except (TypeError, ValueError, IndexError):
+            return None
+
+    def _disable(self, reason: str) -> None:
+        self.enabled = False
+        print(f"⚠️ Decode length budget disabled: {reason}.")
+
+    def __getattr__(self, name):
+        return getattr(self.decoder, name)
+
+
+def quantized_path(model_path: Path) -> Path:
+    """
+    Return the path of the dynamically quantized int8 variant of an ONNX file.
+
+    Args:
+        model_path (Path): Path to the float ONNX file.
+
+    Returns:
+        Path: e.g. whisper_base_en-whisperencoderinf.int8.onnx
+    """
+    return model_path.with_name(model_path.stem + QUANTIZED_SUFFIX)
+
+
+def npu_available() -> bool:
+    """
+    Tell whether ONNX Runtime exposes the Qualcomm NPU (QNN execution provider).
+
+    Returns:
+        bool: True if the QNN execution provider is available.
+    """
+    try:
+        import onnxruntime
+    except ImportError:
+        return False
+    return "QNNExecutionProvider" in onnxruntime.get_available_providers()
+
+
+def _cpu_session_options(intra_op_threads: int | None, inter_op_threads: int | None):
+    """
+    Build ONNX Runtime session options for the CPU execution provider.
+    """
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if intra_op_threads:
+        options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads:
+        options.inter_op_num_threads = inter_op_threads
+        if inter_op_threads > 1:
+            options.execution_mode = onnxruntime.ExecutionMode.ORT_PARALLEL
+    return options
 
 
 class SpeechToTextApplication:
@@ -9,27 +361,89 @@ class SpeechToTextApplication:
     Application for transcribing speech from audio files using WhisperBaseEn.
     """
 
-    def __init__(self, audio_records_path: Path | str | None = None) -> None:
+    def __init__(
+        self,
+        audio_records_path: Path | str | None = None,
+        model_dir: Path | str = MODEL_DIR,
+        backend: str = "auto",
+        quantized: bool = False,
+        intra_op_threads: int | None = None,
+        inter_op_threads: int | None = None,
+    ) -> None:
         """
         Initialize the SpeechToTextApplication.
 
         Args:
             audio_records_path (Path | str | None): Path to the directory containing audio files.
+            model_dir (Path | str): Directory containing the Whisper ONNX artifacts.
+            backend (str): "npu" (Snapdragon NPU), "cpu" (ONNX Runtime CPU execution provider)
+                or "auto" (NPU when available, CPU otherwise).
+            quantized (bool): On the CPU backend, use the int8 models produced by quantize_whisper.py.
+            intra_op_threads (int | None): CPU backend threads used inside an operator. Default: ONNX Runtime default.
+            inter_op_threads (int | None): CPU backend threads used across operators. Default: ONNX Runtime default.
+
+        Raises:
+            ValueError: If the backend is unknown.
         """
-        self.model = WhisperBaseEn.from_pretrained()
-        self.app = WhisperApp(
-            OnnxModelTorchWrapper.OnNPU("build/whisper_base_en/whisper_base_en-whisperencoderinf.onnx"), #self.model.encoder,
-            OnnxModelTorchWrapper.OnNPU("build/whisper_base_en/whisper_base_en-whisperdecoderinf.onnx"), #self.model.decoder,
-            num_decoder_blocks=self.model.num_decoder_blocks,
-            num_decoder_heads=self.model.num_decoder_heads,
-            attention_dim=self.model.attention_dim,
-            mean_decode_len=self.model.mean_decode_len,
-        )
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown STT backend '{backend}', expected one of {BACKENDS}.")
+        from qai_hub_models.models._shared.whisper.app import WhisperApp
+        from qai_hub_models.utils.onnx_torch_wrapper import OnnxModelTorchWrapper
+
+        self.model_dir = Path(model_dir)
+        self.metadata = load_whisper_metadata(self.model_dir)
+        self.quantized = quantized
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+        encoder, decoder = None, None
+        if backend == "npu" or (backend == "auto" and npu_available()):
+            try:
+                encoder = OnnxModelTorchWrapper.OnNPU(str(self.model_dir / ENCODER_FILE))
+                decoder = OnnxModelTorchWrapper.OnNPU(str(self.model_dir / DECODER_FILE))
+                self.backend = "npu"
+            except Exception as e:
+                if backend == "npu":
+                    raise
+                print(f"⚠️ NPU initialization failed ({e}), falling back to CPU.")
+        if encoder is None:
+            encoder = self._load_cpu_model(ENCODER_FILE)
+            decoder = self._load_cpu_model(DECODER_FILE)
+            self.backend = "cpu"
+        print(f"🗣️ Speech-to-text backend: {self.backend}{' (int8)' if self.backend == 'cpu' and quantized else ''}")
+
+        self.decoder = _DecodeBudget(decoder, self.metadata["mean_decode_len"])
+        self.app = WhisperApp(encoder, self.decoder, **self.metadata)
         if isinstance(audio_records_path, str):
             self.audio_records_path: Path | None = Path(audio_records_path)
         else:
             self.audio_records_path: Path | None = audio_records_path
         self.last_audio_file: Path | None = None
+        # The decoder budget and the ONNX sessions are shared by every caller
+        self._lock = threading.Lock()
+
+    def _load_cpu_model(self, file_name: str):
+        """
+        Load one Whisper ONNX file on the ONNX Runtime CPU execution provider.
+
+        Args:
+            file_name (str): Float model file name inside model_dir.
+
+        Returns:
+            OnnxModelTorchWrapper: The model, callable like the torch module it replaces.
+
+        Raises:
+            FileNotFoundError: If the int8 model is requested but has not been generated.
+        """
+        model_path = self.model_dir / file_name
+        if self.quantized:
+            model_path = quantized_path(model_path)
+            if not model_path.exists():
+                raise FileNotFoundError(f"{model_path} not found. Generate it with: python -m quantize_whisper")
+        from qai_hub_models.utils.onnx_torch_wrapper import OnnxModelTorchWrapper
+
+        options = _cpu_session_options(self.intra_op_threads, self.inter_op_threads)
+        return OnnxModelTorchWrapper.OnCPU(str(model_path), session_options=options)
 
     def _get_audio_file(self) -> Path:
         """
@@ -72,7 +486,224 @@ class SpeechToTextApplication:
             FileNotFoundError: If no audio files are found.
         """
         audio_file = self._get_audio_file()
-        transcription = self.app.transcribe(str(audio_file), audio_sample_rate=None)
+        with self._lock:
+            self.decoder.set_budget(self.decoder.max_tokens)
+            transcription = self.app.transcribe(str(audio_file), audio_sample_rate=None)
         print(f"Transcription result: {transcription}")
         self._delete_audio_file()
-        return transcription
\ No newline at end of file
+        return transcription
+
+    def transcribe_array(
+        self,
+        audio: np.ndarray,
+        sample_rate: int,
+        energy_track: list[tuple] | None = None,
+        trim: bool = True,
+    ) -> str:
+        """
+        Transcribe audio samples held in memory, without going through a WAV file.
+
+        Leading and trailing non-speech is trimmed first, and the number of decoded
+        tokens is capped in proportion to the remaining speech duration.
+
+        Args:
+            audio (np.ndarray): Mono PCM samples, either int16 or float in [-1, 1].
+            sample_rate (int): Sample rate of the audio in Hz.
+            energy_track (list[tuple] | None): Recorder energy track (see AudioRecorder.get_energy_track()),
+                used to locate the speech. Default: speech is detected from the samples.
+            trim (bool): Trim non-speech and bound the decode length.
+
+        Returns:
+            str: The transcription result ("" if no speech was found).
+
+        Raises:
+            ValueError: If the audio buffer is empty.
+        """
+        if audio.size == 0:
+            raise ValueError("Audio buffer is empty.")
+        budget = self.decoder.max_tokens
+        if trim:
+            bounds = speech_bounds(audio, sample_rate, energy_track)
+            if bounds is None:
+                print("Transcription result: (no speech)")
+                return ""
+            audio = audio[bounds[0]:bounds[1]]
+            speech_seconds = len(audio) / sample_rate
+            budget = int(DECODE_BASE_TOKENS + DECODE_TOKENS_PER_SECOND * speech_seconds)
+        if audio.dtype == np.int16:
+            audio = audio.astype(np.float32) / 32768.0
+        else:
+            audio = audio.astype(np.float32, copy=False)
+        with self._lock:
+            self.decoder.set_budget(budget)
+            transcription = self.app.transcribe(audio, audio_sample_rate=sample_rate)
+        print(f"Transcription result: {transcription}")
+        return transcription
+
+    def start_stream(
+        self,
+        sample_rate: int,
+        on_partial: Callable[[str], None] | None = None,
+        window_seconds: float = 4.0,
+        search_seconds: float = 1.5,
+    ) -> "StreamingTranscription":
+        """
+        Start an incremental transcription fed with audio chunks while the user is speaking.
+
+        Args:
+            sample_rate (int): Sample rate of the chunks that will be fed, in Hz.
+            on_partial (Callable[[str], None] | None): Called with the text transcribed so far each time a window is committed.
+            window_seconds (float): Amount of audio accumulated before a window is transcribed in the background.
+            search_seconds (float): The window is cut at the quietest point of its last search_seconds, to avoid splitting words.
+
+        Returns:
+            StreamingTranscription: The session. Feed it with feed() and call finish() at end of speech.
+        """
+        return StreamingTranscription(self, sample_rate, on_partial, window_seconds, search_seconds)
+
+
+class StreamingTranscription:
+    """
+    Incremental transcription session.
+
+    Audio is transcribed in rolling windows on a background thread while it is
+    being recorded, so that at end of speech only the last, partial window is
+    left to transcribe.
+    """
+
+    FRAME_SECONDS = 0.02  # Energy frame used to pick the cut point between two windows
+    MIN_TAIL_SECONDS = 0.1
+
+    def __init__(
+        self,
+        stt_app: SpeechToTextApplication,
+        sample_rate: int,
+        on_partial: Callable[[str], None] | None = None,
+        window_seconds: float = 4.0,
+        search_seconds: float = 1.5,
+    ) -> None:
+        """
+        Initialize the session and start its worker thread.
+
+        Args:
+            stt_app (SpeechToTextApplication): Application used to transcribe each window.
+            sample_rate (int): Sample rate of the fed chunks in Hz.
+            on_partial (Callable[[str], None] | None): Partial hypothesis callback.
+            window_seconds (float): Window length in seconds.
+            search_seconds (float): Length of the cut point search area at the end of each window.
+        """
+        self.stt_app = stt_app
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+        self.window_samples = int(window_seconds * sample_rate)
+        self.search_samples = min(int(search_seconds * sample_rate), self.window_samples)
+        self.frame_samples = max(1, int(self.FRAME_SECONDS * sample_rate))
+
+        self._buffer = AudioBuffer(sample_rate, max_duration=None)
+        self._committed = 0  # Samples already transcribed
+        self._texts: list[str] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def partial(self) -> str:
+        """
+        str: Text transcribed so far.
+        """
+        with self._condition:
+            return " ".join(self._texts)
+
+    def feed(self, chunk: np.ndarray) -> None:
+        """
+        Append an int16 audio chunk. Never blocks on transcription.
+
+        Args:
+            chunk (np.ndarray): Mono int16 samples at the session sample rate.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._buffer.write(chunk)
+            if len(self._buffer) - self._committed >= self.window_samples:
+                self._condition.notify()
+
+    def _cut_point(self, start: int) -> int:
+        """
+        Return the end of the window starting at start, placed on its quietest frame.
+        """
+        end = start + self.window_samples
+        search = self._buffer.view(end - self.search_samples, end)
+        frames = len(search) // self.frame_samples
+        if frames == 0:
+            return end
+        framed = search[:frames * self.frame_samples].reshape(frames, self.frame_samples)
+        energy = np.einsum("ij,ij->i", framed, framed, dtype=np.int64)
+        return end - self.search_samples + int(np.argmin(energy) + 1) * self.frame_samples
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and len(self._buffer) - self._committed < self.window_samples:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                start = self._committed
+                end = self._cut_point(start)
+                window = self._buffer.view(start, end).copy()
+
+            text = self.stt_app.transcribe_array(window, self.sample_rate).strip()
+
+            with self._condition:
+                if text:
+                    self._texts.append(text)
+                self._committed = end
+                partial = " ".join(self._texts)
+            if self.on_partial and text:
+                try:
+                    self.on_partial(partial)
+                except Exception as e:
+                    print(f"Error in partial transcription callback: {e}")
+
+    def finish(self) -> str:
+        """
+        Close the session and transcribe the audio not covered by a committed window.
+
+        Returns:
+            str: The full transcription.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+        if self._cancelled:
+            return ""
+        tail = self._buffer.view(self._committed)
+        if len(tail) >= self.MIN_TAIL_SECONDS * self.sample_rate:
+            text = self.stt_app.transcribe_array(tail, self.sample_rate).strip()
+            if text:
+                self._texts.append(text)
+        return " ".join(self._texts)
+
+    def cancel(self, timeout: float | None = None) -> bool:
+        """
+        Abandon the session without transcribing the remaining audio.
+
+        A window already being transcribed is not interrupted: the worker is
+        joined so that it does not run into the next session.
+
+        Args:
+            timeout (float | None): Maximum time to wait for the worker, in seconds. Default: no limit.
+
+        Returns:
+            bool: True if the worker has stopped.
+        """
+        self._cancelled = True
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
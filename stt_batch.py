@@ -0,0 +1,198 @@
+"""
+Batch transcription of WAV corpora with a pool of warm SpeechToTextApplication workers.
+
+Usage:
+    python -m stt_batch recordings/ -o results.jsonl --workers 4 --backend cpu
+    python -m stt_batch manifest.jsonl -o results.jsonl --summary summary.json
+
+The input is a directory (searched recursively for *.wav), a text manifest with one
+path per line, or a JSONL manifest whose objects have a "path" (or "audio_filepath")
+key and an optional reference "text". Source files are never modified.
+
+Files are transcribed whole by default, so that model or quantization comparisons
+are not skewed by the energy trimming. With --trim, files where no speech is found
+are reported ("no_speech") instead of being silently scored as empty transcripts.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from audio_source import load_wav
+
+_stt_app = None
+_trim = False
+
+
+def read_inputs(source: Path) -> list[dict]:
+    """
+    List the files to transcribe.
+
+    Args:
+        source (Path): Directory, text manifest or JSONL manifest.
+
+    Returns:
+        list[dict]: One {"path": str, "reference": str | None} entry per file.
+
+    Raises:
+        FileNotFoundError: If the source does not exist.
+    """
+    if source.is_dir():
+        return [{"path": str(path), "reference": None} for path in sorted(source.rglob("*.wav"))]
+    if not source.exists():
+        raise FileNotFoundError(f"{source} not found.")
+
+    entries = []
+    with open(source, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if source.suffix == ".jsonl":
+                record = json.loads(line)
+                path = record.get("path") or record.get("audio_filepath")
+                entries.append({"path": path, "reference": record.get("text")})
+            else:
+                entries.append({"path": line, "reference": None})
+    # Relative manifest paths are relative to the manifest itself
+    for entry in entries:
+        if not os.path.isabs(entry["path"]):
+            entry["path"] = str(source.parent / entry["path"])
+    return entries
+
+
+def _init_worker(stt_kwargs: dict, trim: bool) -> None:
+    """
+    Load one model per worker process, kept warm for every file of its shard.
+    """
+    global _stt_app, _trim
+    from stt import SpeechToTextApplication
+
+    _stt_app = SpeechToTextApplication(**stt_kwargs)
+    _trim = trim
+
+
+def _transcribe_entry(entry: dict) -> dict:
+    result = {"file": entry["path"], "reference": entry["reference"]}
+    try:
+        samples, sample_rate = load_wav(entry["path"])
+        audio_seconds = len(samples) / sample_rate
+        start = time.perf_counter()
+        text = _stt_app.transcribe_array(samples, sample_rate, trim=_trim) if len(samples) else ""
+        elapsed = time.perf_counter() - start
+        if _trim:
+            from stt import speech_bounds
+
+            # Trimmed to nothing: the empty transcript says nothing about the model
+            result["no_speech"] = len(samples) == 0 or speech_bounds(samples, sample_rate) is None
+        result.update({
+            "text": text.strip(),
+            "audio_seconds": round(audio_seconds, 3),
+            "transcribe_seconds": round(elapsed, 4),
+            "rtf": round(elapsed / audio_seconds, 4) if audio_seconds else None,
+            "worker": os.getpid(),
+        })
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def summarize(results: list[dict], wall_seconds: float, workers: int) -> dict:
+    """
+    Aggregate per-file results.
+
+    Args:
+        results (list[dict]): Per-file results.
+        wall_seconds (float): Elapsed time of the whole batch.
+        workers (int): Number of worker processes.
+
+    Returns:
+        dict: Totals, aggregate real-time factors, latency percentiles and, with trimming,
+            the number of files where no speech was found.
+    """
+    done = [r for r in results if "error" not in r]
+    audio_seconds = sum(r["audio_seconds"] for r in done)
+    compute_seconds = sum(r["transcribe_seconds"] for r in done)
+    latencies = np.array([r["transcribe_seconds"] for r in done]) if done else np.zeros(1)
+    return {
+        "files": len(results),
+        "failed": len(results) - len(done),
+        "workers": workers,
+        "audio_seconds": round(audio_seconds, 2),
+        "compute_seconds": round(compute_seconds, 2),
+        "wall_seconds": round(wall_seconds, 2),
+        # Compute time per second of audio, for one model instance
+        "rtf": round(compute_seconds / audio_seconds, 4) if audio_seconds else None,
+        # Wall time per second of audio, for the whole pool
+        "wall_rtf": round(wall_seconds / audio_seconds, 4) if audio_seconds else None,
+        "latency_p50": round(float(np.percentile(latencies, 50)), 4),
+        "latency_p95": round(float(np.percentile(latencies, 95)), 4),
+        "no_speech": sum(1 for r in done if r.get("no_speech")),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Transcribe a corpus of WAV files with a pool of Whisper workers.")
+    parser.add_argument("source", type=Path, help="Directory of WAV files, or a .txt / .jsonl manifest.")
+    parser.add_argument("-o", "--output", type=Path, default=Path("transcriptions.jsonl"), help="JSONL results file.")
+    parser.add_argument("--summary", type=Path, default=None, help="Optional JSON file for the aggregate summary.")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="Worker processes.")
+    parser.add_argument("--backend", choices=("auto", "npu", "cpu"), default="auto", help="STT backend.")
+    parser.add_argument("--model-dir", type=Path, default=None, help="Directory containing the Whisper ONNX files.")
+    parser.add_argument("--quantized", action="store_true", help="Use the int8 models (CPU backend).")
+    parser.add_argument("--intra-op-threads", type=int, default=None,
+                        help="ONNX Runtime intra-op threads per worker. Default: CPU cores / workers.")
+    parser.add_argument("--trim", action="store_true",
+                        help="Trim leading and trailing non-speech and bound the decode length, as the assistant does. "
+                             "Files where no speech is found are flagged no_speech.")
+    args = parser.parse_args()
+
+    entries = read_inputs(args.source)
+    if not entries:
+        print(f"❌ No WAV files found in {args.source}")
+        return
+
+    stt_kwargs = {
+        "backend": args.backend,
+        "quantized": args.quantized,
+        "intra_op_threads": args.intra_op_threads or max(1, (os.cpu_count() or 1) // args.workers),
+        "inter_op_threads": 1,
+    }
+    if args.model_dir:
+        stt_kwargs["model_dir"] = args.model_dir
+
+    workers = min(args.workers, len(entries))
+    print(f"🗂️ {len(entries)} files, {workers} workers")
+
+    results = []
+    start = time.perf_counter()
+    with open(args.output, "w", encoding="utf-8") as out, multiprocessing.Pool(
+        processes=workers,
+        initializer=_init_worker,
+        initargs=(stt_kwargs, args.trim),
+    ) as pool:
+        for i, result in enumerate(pool.imap_unordered(_transcribe_entry, entries, chunksize=4), start=1):
+            results.append(result)
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            if "error" in result:
+                print(f"❌ [{i}/{len(entries)}] {result['file']}: {result['error']}")
+            elif i % 50 == 0 or i == len(entries):
+                print(f"✅ [{i}/{len(entries)}] transcribed")
+    summary = summarize(results, time.perf_counter() - start, workers)
+
+    print(json.dumps(summary, indent=2))
+    if summary["no_speech"]:
+        print(f"⚠️ {summary['no_speech']} files trimmed to nothing (\"no_speech\" in {args.output}): "
+              f"their empty transcripts come from the trimming, not the model.")
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
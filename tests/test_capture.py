@@ -0,0 +1,39 @@
+import threading
+
+import numpy as np
+
+from audio_source import SyntheticAudioSource
+from capture import AudioCaptureService
+
+
+class Fixed48kSource(SyntheticAudioSource):
+    """Device that only opens at its native 48 kHz."""
+
+    def is_format_supported(self, sample_rate, device_index=None, channels=1):
+        return sample_rate == self.sample_rate
+
+
+def test_unsupported_rate_is_resampled_before_fan_out():
+    source = Fixed48kSource([("tone", 2.0, 440.0)], sample_rate=48000, speed=0, at_end="stop")
+    capture = AudioCaptureService(sample_rate=16000, chunk_size=1280, source=source)
+    chunks = []
+    done = threading.Event()
+
+    def on_chunk(chunk, timestamp):
+        chunks.append(chunk)
+        if len(chunks) == 20:
+            done.set()
+
+    capture.subscribe(on_chunk)
+    try:
+        capture.start()
+        assert done.wait(5.0)
+    finally:
+        capture.cleanup()
+
+    assert capture.device_rate == 48000
+    assert all(len(chunk) == 1280 for chunk in chunks)
+    # 440 Hz tone at 16 kHz: about 35 zero crossings per 80 ms chunk
+    signal = np.concatenate(chunks[2:20]).astype(np.float64)
+    crossings = np.count_nonzero(np.diff(np.signbit(signal))) / (len(signal) / 16000)
+    assert abs(crossings / 2 - 440) < 20
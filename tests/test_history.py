@@ -0,0 +1,49 @@
+import time
+
+from history import ConversationHistory
+
+
+def roles(history):
+    return [m["role"] for m in history.messages()]
+
+
+def test_unanswered_user_message_is_discarded():
+    history = ConversationHistory("system")
+    history.add_user_message("first")
+    history.discard_unanswered()
+    assert roles(history) == ["system"]
+
+
+def test_roles_alternate_after_a_failed_turn():
+    history = ConversationHistory("system")
+    history.add_user_message("lost question")
+    history.add_user_message("question")
+    history.add_assistant_response("answer")
+    assert roles(history) == ["system", "user", "assistant"]
+    assert history.messages()[1]["content"] == "question"
+
+
+def test_turns_evicted_by_a_longer_memory_are_summarized():
+    summarized = []
+
+    def summarizer(memory, messages):
+        summarized.extend(m["content"] for m in messages)
+        # Each summary grows, pushing more turns out of the budget
+        return memory + " " + "m" * 200
+
+    history = ConversationHistory("system", token_budget=250, summarizer=summarizer)
+    contents = []
+    for i in range(12):
+        contents += [f"question {i} " * 4, f"answer {i} " * 4]
+        history.add_user_message(contents[-2])
+        history.add_assistant_response(contents[-1])
+
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        kept = {m["content"] for m in history.messages()[1:]}
+        if all(c in kept or c in summarized for c in contents):
+            break
+        time.sleep(0.01)
+    history.close()
+    kept = {m["content"] for m in history.messages()[1:]}
+    assert [c for c in contents if c not in kept and c not in summarized] == []
@@ -0,0 +1,42 @@
+import time
+
+from llm_backends import OpenAICompatibleBackend, StandInLLMServer
+
+ANSWER = "This is a test answer. It has two sentences."
+MESSAGES = [{"role": "system", "content": "system"}, {"role": "user", "content": "hello"}]
+
+
+def test_streams_over_one_pooled_connection():
+    with StandInLLMServer(ANSWER, ttft=0.0, tokens_per_second=1000.0) as server:
+        backend = OpenAICompatibleBackend(server.base_url)
+        try:
+            assert backend.model == server.model
+            for _ in range(3):
+                assert "".join(chunk.content for chunk in backend.stream(MESSAGES)) == ANSWER
+            assert backend.complete(MESSAGES) == ANSWER
+        finally:
+            backend.close()
+        assert len(server.requests) == 4
+        assert server.requests[0]["stream"] is True
+        assert server.requests[0]["messages"] == MESSAGES
+        # The models listing and every completion reused the same keep-alive connection
+        assert server.connections == 1
+
+
+def test_cancel_stops_the_stream_mid_answer():
+    with StandInLLMServer(ANSWER, ttft=0.0, tokens_per_second=20.0) as server:
+        backend = OpenAICompatibleBackend(server.base_url)
+        try:
+            stream = backend.stream(MESSAGES)
+            received = []
+            started = time.monotonic()
+            for chunk in stream:
+                received.append(chunk.content)
+                if len(received) == 2:
+                    stream.cancel()
+            assert len(received) == 2
+            assert time.monotonic() - started < 1.0
+            # The pool still serves the next request
+            assert backend.complete(MESSAGES) == ANSWER
+        finally:
+            backend.close()
@@ -0,0 +1,26 @@
+import numpy as np
+
+import tts
+from audio_source import FileAudioSource
+from bench import FakeLLMBackend, FakeSpeechToText, NullPlayer, SilentSynthesizer
+from llm import LMStudioResponder
+from main import VoiceAssistant
+
+
+class TrackedSource(FileAudioSource):
+    terminated = False
+
+    def terminate(self):
+        self.terminated = True
+        super().terminate()
+
+
+def test_injected_audio_source_is_left_open():
+    source = TrackedSource(np.zeros(1600, dtype=np.int16), sample_rate=16000, at_end="silence")
+    tts_service = tts.TTSService(synthesizer_factory=SilentSynthesizer, player=NullPlayer())
+    responder = LMStudioResponder(tts_service=tts_service, backend=FakeLLMBackend())
+    assistant = VoiceAssistant(audio_source=source, llm_responder=responder, tts_service=tts_service,
+                               stt_app=FakeSpeechToText(), wakeword=False)
+    assistant.stop()
+    assistant.run()
+    assert not source.terminated
@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+
+from audio_source import SyntheticAudioSource
+from capture import AudioCaptureService
+from recorder import AudioRecorder, SilenceDetector
+
+
+def test_noise_floor_not_seeded_from_speech():
+    """Un détecteur qui démarre en pleine parole garde son seuil initial."""
+    detector = SilenceDetector(silence_threshold=500, silence_duration=1.0, sample_rate=16000, chunk_size=1280)
+    speech = SyntheticAudioSource([("tone", 1.0)], amplitude=3000.0)._samples
+    for chunk in np.split(speech[:1280 * 10], 10):
+        assert detector.process_audio_chunk(chunk)
+        assert detector.last_is_speech
+    assert detector.noise_floor is None
+    assert detector.threshold == 500
+
+
+def test_idle_audio_feeds_noise_floor():
+    """Le bruit de fond est suivi sur le flux partagé entre deux enregistrements."""
+    source = SyntheticAudioSource([("noise", 1.0, 200.0)], noise_level=0.0, speed=0, at_end="loop")
+    capture = AudioCaptureService(sample_rate=16000, chunk_size=1280, source=source)
+    recorder = AudioRecorder(capture=capture)
+    try:
+        capture.start()
+        time.sleep(0.2)
+        capture.stop()
+        assert 150 < recorder.silence_detector.noise_floor < 250
+    finally:
+        recorder.cleanup()
+        capture.cleanup()
+
+
+def test_recording_starting_mid_speech_is_not_cut():
+    """Premier tour : l'enregistrement commence pendant que l'utilisateur parle déjà."""
+    source = SyntheticAudioSource([("speech", 3.0), ("silence", 3.0)], speed=0, at_end="silence")
+    capture = AudioCaptureService(sample_rate=16000, chunk_size=1280, pre_roll=1.0, source=source)
+    recorder = AudioRecorder(capture=capture)
+    try:
+        assert recorder.start_recording()
+        capture.start()
+        assert recorder.wait_until_stopped(timeout=20)
+        # 3 s de parole suivies d'une seconde de silence avant l'arrêt automatique
+        assert recorder.get_recording_duration() >= 3.5
+        speech_chunks = [is_speech for end, _, is_speech in recorder.get_energy_track() if end <= 3.0 * 16000]
+        assert sum(speech_chunks) > len(speech_chunks) // 2
+    finally:
+        recorder.cleanup()
+        capture.cleanup()
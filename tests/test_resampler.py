@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from resampler import StreamingResampler
+
+
+def tone(frequency, sample_rate, seconds=1.0, amplitude=10000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (np.sin(2 * np.pi * frequency * t) * amplitude).astype(np.int16)
+
+
+def gain_db(input_rate, output_rate, frequency):
+    output = StreamingResampler(input_rate, output_rate).process(tone(frequency, input_rate)).astype(np.float64)
+    steady = output[len(output) // 4:]
+    return 20 * np.log10(np.sqrt(np.mean(steady ** 2)) / (10000 / np.sqrt(2)) + 1e-12)
+
+
+@pytest.mark.parametrize("input_rate", [44100, 48000])
+def test_stopband_tones_do_not_fold_back(input_rate):
+    # Above the 8 kHz output Nyquist: would alias to 6 kHz
+    assert gain_db(input_rate, 16000, 10000) < -60
+
+
+@pytest.mark.parametrize("input_rate", [44100, 48000])
+def test_speech_band_is_kept(input_rate):
+    assert abs(gain_db(input_rate, 16000, 1000)) < 0.1
+    assert gain_db(input_rate, 16000, 6000) > -1
+
+
+@pytest.mark.parametrize("input_rate, output_rate", [(44100, 16000), (48000, 16000), (16000, 48000)])
+def test_chunked_output_matches_whole_signal(input_rate, output_rate):
+    signal = np.random.default_rng(0).integers(-8000, 8000, input_rate, dtype=np.int16)
+    whole = StreamingResampler(input_rate, output_rate)
+    expected = np.concatenate([whole.process(signal), whole.flush()])
+
+    chunked = StreamingResampler(input_rate, output_rate)
+    sizes = np.random.default_rng(1).integers(1, 3000, 100)
+    bounds = np.minimum(np.cumsum(np.concatenate(([0], sizes))), len(signal))
+    parts = [chunked.process(signal[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+    parts.append(chunked.process(signal[bounds[-1]:]))
+    parts.append(chunked.flush())
+    assert np.array_equal(np.concatenate(parts), expected)
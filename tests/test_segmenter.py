@@ -0,0 +1,64 @@
+from segmenter import SentenceSegmenter
+
+
+def segment(fragments):
+    segmenter = SentenceSegmenter(early_first_flush=False)
+    segments = []
+    for fragment in fragments:
+        segments += segmenter.feed(fragment)
+    remaining = segmenter.flush()
+    return segments + ([remaining] if remaining else [])
+
+
+def test_no_ends_a_sentence():
+    assert segment(["No. I don't think so."]) == ["No.", "I don't think so."]
+
+
+def test_no_before_a_number_is_an_abbreviation():
+    assert segment(["Take exit No. 5 on the left. ", "Then go straight."]) == [
+        "Take exit No. 5 on the left.", "Then go straight."]
+
+
+def test_no_waits_for_the_next_word_when_streamed():
+    assert segment(["No", ".", " ", "5 is ", "closed. Sorry."]) == ["No. 5 is closed.", "Sorry."]
+    assert segment(["No", ".", " ", "I can't."]) == ["No.", "I can't."]
+
+
+def test_single_letter_before_a_new_sentence_ends_it():
+    assert segment(["We need a plan B. It works."]) == ["We need a plan B.", "It works."]
+    assert segment(["Take vitamin ", "C. Then", " rest."]) == ["Take vitamin C.", "Then rest."]
+
+
+def test_initials_do_not_end_a_sentence():
+    assert segment(["The book is by J. R. R. Tolkien. ", "Read it."]) == [
+        "The book is by J. R. R. Tolkien.", "Read it."]
+    assert segment(["George W", ". ", "Bush was there."]) == ["George W. Bush was there."]
+
+
+def test_abbreviations_and_decimals_do_not_end_a_sentence():
+    assert segment(["Dr. Smith is in. ", "It costs 3", ".5 dollars. Okay."]) == [
+        "Dr. Smith is in.", "It costs 3.5 dollars.", "Okay."]
+    assert segment(["See e.g. the manual. Bye."]) == ["See e.g. the manual.", "Bye."]
+
+
+def test_sentence_split_across_many_tokens():
+    text = "The weather is mild today. Expect a light breeze! Any other question?"
+    assert segment(list(text)) == ["The weather is mild today.", "Expect a light breeze!", "Any other question?"]
+
+
+def test_first_segment_is_flushed_early():
+    segmenter = SentenceSegmenter(first_min_chars=30)
+    # Too short for a clause boundary
+    assert segmenter.feed("Sure, here it is. ") == ["Sure, here it is."]
+    segmenter.reset()
+    assert segmenter.feed("The weather today should stay mild, ") == ["The weather today should stay mild,"]
+    # Only the first segment of an answer is flushed early
+    assert segmenter.feed("with a light breeze, and some sun. ") == ["with a light breeze, and some sun."]
+    segmenter.reset()
+    assert segmenter.feed("The weather today should stay mild and ") == ["The weather today should stay mild"]
+
+
+def test_first_segment_is_cut_at_first_max_chars():
+    segmenter = SentenceSegmenter(first_max_chars=40)
+    assert segmenter.feed("word " * 12 + "3.5") == ["word word word word word word word word"]
+    assert segmenter.flush() == "word word word word 3.5"
@@ -0,0 +1,92 @@
+import numpy as np
+
+from stt import TOKEN_EOT, _DecodeBudget, _metadata_from_onnx, _onnx_input_shapes
+
+VOCABULARY = TOKEN_EOT + 1
+
+
+class FakeDecoder:
+    """Always prefers token 1: only the budget can end the decoding."""
+
+    def __call__(self, tokens, index, *caches):
+        logits = np.zeros((1, 1, VOCABULARY), dtype=np.float32)
+        logits[..., 1] = 1.0
+        return logits, caches
+
+
+def decode(decoder, steps):
+    """Greedy decoding loop of one 30 s chunk, like WhisperApp's."""
+    tokens = []
+    for index in range(steps):
+        logits, _ = decoder(np.array([[0]]), np.array([[index]]))
+        tokens.append(int(np.argmax(logits[0, -1])))
+        if tokens[-1] == TOKEN_EOT:
+            break
+    return tokens
+
+
+def test_end_of_text_is_forced_at_the_budget():
+    decoder = _DecodeBudget(FakeDecoder(), max_tokens=200)
+    decoder.set_budget(5)
+    assert decode(decoder, 200) == [1, 1, 1, 1, TOKEN_EOT]
+
+
+def test_step_count_restarts_at_each_chunk():
+    decoder = _DecodeBudget(FakeDecoder(), max_tokens=200)
+    decoder.set_budget(5)
+    decode(decoder, 3)
+    # A new chunk starts at position 0 and gets the whole budget again
+    assert decode(decoder, 200) == [1, 1, 1, 1, TOKEN_EOT]
+
+
+def test_unreadable_index_disables_the_budget():
+    decoder = _DecodeBudget(FakeDecoder(), max_tokens=200)
+    decoder.set_budget(2)
+    for _ in range(3):
+        logits, _ = decoder(np.array([[0]]), object())
+    assert not decoder.enabled
+    assert int(np.argmax(logits[0, -1])) == 1
+
+
+def varint(value):
+    out = bytearray()
+    while True:
+        out.append(value & 0x7F | (0x80 if value > 0x7F else 0))
+        value >>= 7
+        if not value:
+            return bytes(out)
+
+
+def field(number, payload):
+    """Length-delimited protobuf field (int payloads are varints)."""
+    if isinstance(payload, int):
+        return varint(number << 3) + varint(payload)
+    return varint(number << 3 | 2) + varint(len(payload)) + payload
+
+
+def value_info(name, dims):
+    shape = b"".join(field(1, field(1, dim) if isinstance(dim, int) else field(2, dim.encode())) for dim in dims)
+    tensor_type = field(1, 1) + field(2, shape)
+    return field(1, name.encode()) + field(2, field(1, tensor_type))
+
+
+def write_onnx(path, inputs, weights_bytes):
+    initializer = field(1, 1) + field(8, b"w") + field(9, b"\0" * weights_bytes)  # raw_data
+    graph = field(1, field(1, b"x") + field(2, b"y") + field(4, b"Identity"))  # node
+    graph += field(5, initializer) + field(2, b"g")
+    graph += b"".join(field(11, value_info(name, dims)) for name, dims in inputs)
+    path.write_bytes(field(1, 8) + field(2, b"test") + field(7, graph))
+
+
+def test_decoder_metadata_is_read_from_the_graph_inputs(tmp_path):
+    path = tmp_path / "decoder.onnx"
+    write_onnx(path, [("x", [1, 1]), ("k_cache_self", [6, 8, 64, 224]), ("dyn", ["batch", 3])], 1 << 20)
+    assert _onnx_input_shapes(path) == {"x": [1, 1], "k_cache_self": [6, 8, 64, 224], "dyn": [0, 3]}
+    assert _metadata_from_onnx(path) == {
+        "num_decoder_blocks": 6, "num_decoder_heads": 8, "attention_dim": 512, "mean_decode_len": 224}
+
+
+def test_symbolic_cache_shape_gives_no_metadata(tmp_path):
+    path = tmp_path / "decoder.onnx"
+    write_onnx(path, [("k_cache_self", [6, 8, 64, "len"])], 16)
+    assert _metadata_from_onnx(path) is None
@@ -0,0 +1,43 @@
+import wave
+
+import numpy as np
+
+import stt_batch
+
+
+class FakeSpeechToText:
+    def transcribe_array(self, audio, sample_rate, energy_track=None, trim=True):
+        return "" if trim and not np.abs(audio).max() else "hello"
+
+
+def write_wav(path, samples, sample_rate=16000):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.astype(np.int16).tobytes())
+    return {"path": str(path), "reference": None}
+
+
+def transcribe(monkeypatch, entries, trim):
+    monkeypatch.setattr(stt_batch, "_stt_app", FakeSpeechToText())
+    monkeypatch.setattr(stt_batch, "_trim", trim)
+    results = [stt_batch._transcribe_entry(entry) for entry in entries]
+    return results, stt_batch.summarize(results, 1.0, 1)
+
+
+def corpus(tmp_path):
+    speech = np.concatenate([np.zeros(8000), np.sin(np.arange(8000) / 5) * 8000])
+    return [write_wav(tmp_path / "silence.wav", np.zeros(16000)), write_wav(tmp_path / "speech.wav", speech)]
+
+
+def test_files_are_transcribed_whole_by_default(monkeypatch, tmp_path):
+    results, summary = transcribe(monkeypatch, corpus(tmp_path), stt_batch._trim)
+    assert [r["text"] for r in results] == ["hello", "hello"]
+    assert summary["no_speech"] == 0
+
+
+def test_files_trimmed_to_nothing_are_reported(monkeypatch, tmp_path):
+    results, summary = transcribe(monkeypatch, corpus(tmp_path), True)
+    assert [(r["text"], r["no_speech"]) for r in results] == [("", True), ("hello", False)]
+    assert summary["no_speech"] == 1
@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+
+from tts import TTSService
+
+SAMPLE_RATE = 16000
+
+
+class ToneSynthesizer:
+    def render(self, text):
+        return np.ones(SAMPLE_RATE, dtype=np.int16), SAMPLE_RATE
+
+    def close(self):
+        pass
+
+
+class RecordingPlayer:
+    """Plays nothing, records how many blocks each play() call would have written."""
+
+    BLOCK_SIZE = 1600
+
+    def __init__(self):
+        self.plays = []
+
+    def play(self, samples, sample_rate, is_stale=None):
+        self.plays.append(0)
+        for _ in range(0, len(samples), self.BLOCK_SIZE):
+            if is_stale and is_stale():
+                break
+            self.plays[-1] += 1
+            threading.Event().wait(0.01)
+
+    def close(self):
+        pass
+
+
+def test_stop_before_playback_starts_drops_the_rendered_sentence():
+    player = RecordingPlayer()
+    service = TTSService(synthesizer_factory=ToneSynthesizer, player=player)
+    # stop() lands after the stale check of the playback loop, right before play()
+    service.on_playback_start = lambda text: service.stop()
+    try:
+        service.enqueue("First sentence.")
+        assert service.wait_until_idle(5.0)
+        assert player.plays == [0]
+    finally:
+        service.shutdown()
+
+
+def test_stop_drops_the_playing_and_the_rendered_sentences():
+    player = RecordingPlayer()
+    service = TTSService(synthesizer_factory=ToneSynthesizer, player=player)
+    started = threading.Event()
+    service.on_playback_start = lambda text: started.set()
+    try:
+        service.enqueue("First sentence.")
+        service.enqueue("Second sentence.")
+        assert started.wait(5.0)
+        service.stop()
+        assert service.wait_until_idle(5.0)
+        # The first sentence is cut, the second one was already rendered but never plays
+        assert len(player.plays) == 1
+        assert player.plays[0] < SAMPLE_RATE // player.BLOCK_SIZE
+    finally:
+        service.shutdown()
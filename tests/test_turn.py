@@ -0,0 +1,58 @@
+import threading
+import time
+
+import numpy as np
+
+from turn import TurnOrchestrator, TurnState
+
+
+class InstantRecorder:
+    sample_rate = 16000
+    last_speech_at = None
+    stopped_at = None
+    on_audio_chunk = None
+
+    def start_recording(self, pre_roll=0.0):
+        return True
+
+    def stop_recording(self):
+        pass
+
+    def wait_until_stopped(self):
+        pass
+
+    def get_audio_array(self):
+        return np.ones(self.sample_rate, dtype=np.int16)
+
+    def get_energy_track(self):
+        return []
+
+
+class HangingSpeechToText:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def transcribe_array(self, audio, sample_rate, energy_track=None, trim=True):
+        self.release.wait(10.0)
+        return "too late"
+
+
+class Silent:
+    on_playback_start = None
+
+
+def test_transcribing_timeout_returns_to_idle_without_waiting_for_the_model():
+    stt_app = HangingSpeechToText()
+    manager = TurnOrchestrator(InstantRecorder(), stt_app, llm=None, tts_service=Silent(), streaming_stt=False,
+                          timeouts={TurnState.TRANSCRIBING: 0.2})
+    ended = threading.Event()
+    manager.add_turn_end_hook(lambda turn: ended.set())
+    try:
+        started = time.monotonic()
+        turn = manager.trigger()
+        assert ended.wait(5.0)
+        assert time.monotonic() - started < 2.0
+        assert turn.outcome == "timeout"
+        assert manager.state is TurnState.IDLE
+    finally:
+        stt_app.release.set()
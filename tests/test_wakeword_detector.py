@@ -0,0 +1,148 @@
+import sys
+import types
+from collections import deque
+
+import numpy as np
+import pytest
+
+from audio_source import SyntheticAudioSource
+from wakeword_detector import EnergyGate, WakeWordDetector, WakeWordTrigger
+
+CHUNK = 1280
+N_FRAMES = 4
+
+
+class FakePreprocessor:
+    """One feature row per 80 ms chunk, holding the chunk's mean amplitude."""
+
+    def __init__(self):
+        self.features = np.zeros((N_FRAMES, 96), dtype=np.float32)
+
+    def __call__(self, audio):
+        rows = [np.full(96, np.abs(chunk).mean() / 1000, dtype=np.float32) for chunk in audio.reshape(-1, CHUNK)]
+        self.features = np.vstack([self.features] + rows)
+
+    def get_features(self, n_feature_frames=N_FRAMES, start_ndx=-1):
+        if start_ndx != -1:
+            end_ndx = start_ndx + n_feature_frames if start_ndx + n_feature_frames != 0 else len(self.features)
+            return self.features[start_ndx:end_ndx][None]
+        return self.features[-n_feature_frames:][None]
+
+
+class FakeModel:
+    """Mimics openwakeword.model.Model for a single one-output model."""
+
+    def __init__(self, wakeword_models=None, inference_framework="onnx", batch=True):
+        self.models = {"alexa": None}
+        self.model_inputs = {"alexa": N_FRAMES}
+        self.model_outputs = {"alexa": 1}
+        self.preprocessor = FakePreprocessor()
+        self.prediction_buffer = {"alexa": deque(maxlen=30)}
+        self.prediction_calls = 0
+        self.batch = batch
+        self.model_prediction_function = {"alexa": self._predict}
+
+    def _predict(self, windows):
+        if not self.batch and len(windows) > 1:
+            raise ValueError("fixed batch size")
+        self.prediction_calls += 1
+        return [windows.mean(axis=(1, 2)).reshape(-1, 1)]
+
+    def predict(self, audio):
+        self.preprocessor(audio)
+        score = self.model_prediction_function["alexa"](self.preprocessor.get_features(N_FRAMES))[0].item()
+        if len(self.prediction_buffer["alexa"]) < 5:
+            score = 0.0
+        self.prediction_buffer["alexa"].append(score)
+        return {"alexa": score}
+
+    def reset(self):
+        self.preprocessor = FakePreprocessor()
+        self.prediction_buffer["alexa"].clear()
+
+
+@pytest.fixture
+def fake_openwakeword(monkeypatch):
+    module = types.ModuleType("openwakeword.model")
+    module.Model = FakeModel
+    monkeypatch.setitem(sys.modules, "openwakeword", types.ModuleType("openwakeword"))
+    monkeypatch.setitem(sys.modules, "openwakeword.model", module)
+
+
+def make_detector():
+    detector = WakeWordDetector(["alexa"], source=SyntheticAudioSource([]), energy_gate=False)
+    scores = []
+    detector._check_predictions = lambda predictions, timestamp: scores.append((timestamp, predictions["alexa"]))
+    return detector, scores
+
+
+def chunks(count):
+    rng = np.random.default_rng(0)
+    return [(i * 0.08, (rng.standard_normal(CHUNK) * 100 * (i % 7 + 1)).astype(np.int16), True) for i in range(count)]
+
+
+def test_batch_scoring_matches_frame_by_frame(fake_openwakeword):
+    frames = chunks(12)
+    sequential, expected = make_detector()
+    sequential._batch_capable = False
+    sequential._score_segment(frames)
+
+    batched, scores = make_detector()
+    assert batched._batch_capable
+    batched._score_segment(frames)
+    assert [ts for ts, _ in scores] == [ts for ts, _ in expected]
+    assert np.allclose([s for _, s in scores], [s for _, s in expected])
+    # One prediction call for the whole catch-up batch
+    assert batched.model.prediction_calls == 1
+
+
+def test_batch_prediction_falls_back_to_one_window_at_a_time(fake_openwakeword):
+    frames = chunks(8)
+    detector, scores = make_detector()
+    detector.model.batch = False
+    detector._score_segment(frames)
+    detector._score_segment(frames)
+    assert len(scores) == 16
+    assert detector._batch_predict["alexa"] is False
+
+
+def test_replayed_frames_are_not_scored(fake_openwakeword):
+    frames = [(ts, audio, i >= 5) for i, (ts, audio, _) in enumerate(chunks(8))]
+    detector, scores = make_detector()
+    detector._score_segment(frames)
+    assert [ts for ts, _ in scores] == [ts for ts, _, scored in frames if scored]
+
+
+def test_reset_marker_applies_in_frame_order(fake_openwakeword):
+    detector, scores = make_detector()
+    frames = chunks(10)
+    detector._score(frames[:6] + [None] + frames[6:])
+    # The 4 frames after the reset fill the model's warm-up buffer again: their scores are 0
+    assert [s for _, s in scores[6:]] == [0.0] * 4
+    assert any(s for _, s in scores[:6])
+
+
+def test_trigger_patience_smoothing_and_refractory():
+    trigger = WakeWordTrigger(threshold=0.5, patience=2, smoothing=2, refractory=1.0)
+    assert trigger.update(0.9, 0.0) is None  # Smoothed 0.9, first frame above
+    assert trigger.update(0.9, 0.08) == pytest.approx(0.9)
+    assert trigger.update(0.9, 0.16) is None  # Refractory period
+    assert trigger.update(0.9, 0.24) is None
+    trigger.update(0.0, 1.2)
+    assert trigger.update(0.8, 1.28) is None  # Smoothed 0.4
+    assert trigger.update(0.8, 1.36) is None  # Smoothed 0.8, first frame above
+    assert trigger.update(0.8, 1.44) == pytest.approx(0.8)
+
+
+def test_gate_replays_skipped_audio_when_it_opens():
+    gate = EnergyGate(min_threshold=100, hangover=0.16, replay=0.24)
+    silence = np.zeros(CHUNK, dtype=np.int16)
+    speech = (np.sin(np.arange(CHUNK) / 3) * 8000).astype(np.int16)
+    for i in range(5):
+        assert gate.filter(i, silence) == []
+    opened = gate.filter(5, speech)
+    assert [(ts, scored) for ts, _, scored in opened] == [(2, False), (3, False), (4, False), (5, True)]
+    # Hangover: silent chunks are still scored for 2 chunks
+    assert [scored for _, _, scored in gate.filter(6, silence)] == [True]
+    assert [scored for _, _, scored in gate.filter(7, silence)] == [True]
+    assert gate.filter(8, silence) == []
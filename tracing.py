@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+class Span:
+    """
+    A timed stage of a turn, on the time.monotonic() clock.
+    """
+
+    def __init__(self, name: str, start: float, end: float, turn_id: int = None, attributes: dict = None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.turn_id = turn_id
+        self.attributes = attributes or {}
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "turn_id": self.turn_id,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            **({"attributes": self.attributes} if self.attributes else {}),
+        }
+
+
+class Tracer:
+    """
+    Lightweight latency tracer.
+
+    Spans are kept in a rolling window per name for p50/p95/p99, appended to an
+    optional JSONL trace file and exposed in the Prometheus text format, either
+    through prometheus_text() or a local /metrics HTTP endpoint.
+    """
+
+    METRIC_NAME = "voice_assistant_stage_seconds"
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, window: int = 500, trace_path: str = None, trace_max_bytes: int = 10_000_000):
+        """
+        Args:
+            window (int): Number of recent spans per name used for the percentiles.
+            trace_path (str | None): JSONL file receiving every span (appended).
+            trace_max_bytes (int): Size at which the trace file is rotated to <trace_path>.1
+                (the previous rotation is overwritten), so it does not grow without bound.
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._durations: dict[str, deque] = {}
+        self._totals: dict[str, list] = {}  # name -> [count, sum] since start
+        self.trace_path = trace_path
+        self.trace_max_bytes = trace_max_bytes
+        self._trace_file = open(trace_path, "a", encoding="utf-8") if trace_path else None
+        self._server = None
+
+    def record(self, name: str, start: float, end: float, turn_id: int = None, **attributes) -> Span | None:
+        """
+        Record a span from known timestamps. Spans with a missing bound are ignored.
+
+        Args:
+            name (str): Stage name.
+            start (float): time.monotonic() at the start.
+            end (float): time.monotonic() at the end.
+            turn_id (int | None): Turn the stage belongs to.
+            **attributes: Extra JSON-serializable values written to the trace file.
+
+        Returns:
+            Span | None: The recorded span.
+        """
+        if start is None or end is None:
+            return None
+        span = Span(name, start, end, turn_id, attributes)
+        with self._lock:
+            if name not in self._durations:
+                self._durations[name] = deque(maxlen=self.window)
+                self._totals[name] = [0, 0.0]
+            self._durations[name].append(span.duration)
+            self._totals[name][0] += 1
+            self._totals[name][1] += span.duration
+            if self._trace_file:
+                self._trace_file.write(json.dumps(span.to_dict()) + "\n")
+                self._trace_file.flush()
+                if self._trace_file.tell() >= self.trace_max_bytes:
+                    self._rotate_trace()
+        return span
+
+    def _rotate_trace(self) -> None:
+        self._trace_file.close()
+        os.replace(self.trace_path, self.trace_path + ".1")
+        self._trace_file = open(self.trace_path, "a", encoding="utf-8")
+
+    @contextmanager
+    def span(self, name: str, turn_id: int = None, **attributes):
+        """
+        Time a block of code.
+
+        Args:
+            name (str): Stage name.
+            turn_id (int | None): Turn the stage belongs to.
+            **attributes: Extra values written to the trace file.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.monotonic(), turn_id, **attributes)
+
+    def percentiles(self, name: str) -> dict:
+        """
+        Args:
+            name (str): Stage name.
+
+        Returns:
+            dict: count (since start) and p50/p95/p99 in seconds over the rolling window.
+        """
+        with self._lock:
+            durations = np.array(self._durations.get(name, ()))
+            count = self._totals.get(name, [0])[0]
+        if not len(durations):
+            return {"count": count}
+        values = np.percentile(durations, [q * 100 for q in self.QUANTILES])
+        return {"count": count, **{f"p{round(q * 100)}": round(float(v), 4) for q, v in zip(self.QUANTILES, values)}}
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            dict: percentiles() of every stage.
+        """
+        with self._lock:
+            names = list(self._durations)
+        return {name: self.percentiles(name) for name in names}
+
+    def prometheus_text(self) -> str:
+        """
+        Returns:
+            str: Every stage as a Prometheus summary (rolling quantiles, total sum and count).
+        """
+        lines = [
+            f"# HELP {self.METRIC_NAME} Duration of the voice assistant turn stages.",
+            f"# TYPE {self.METRIC_NAME} summary",
+        ]
+        with self._lock:
+            stages = {name: (np.array(d), *self._totals[name]) for name, d in self._durations.items()}
+        for name, (durations, count, total) in stages.items():
+            values = np.percentile(durations, [q * 100 for q in self.QUANTILES]) if len(durations) else ()
+            for q, value in zip(self.QUANTILES, values):
+                lines.append(f'{self.METRIC_NAME}{{stage="{name}",quantile="{q}"}} {float(value):.6f}')
+            lines.append(f'{self.METRIC_NAME}_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{self.METRIC_NAME}_count{{stage="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def serve_metrics(self, port: int = 9464, host: str = "127.0.0.1") -> bool:
+        """
+        Expose prometheus_text() on http://host:port/metrics from a background thread.
+
+        Args:
+            port (int): TCP port.
+            host (str): Interface to bind (local only by default).
+
+        Returns:
+            bool: False if the port could not be bound (the assistant runs without the endpoint).
+        """
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            print(f"❌ Metrics endpoint disabled, cannot bind {host}:{port}: {e}")
+            return False
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"📈 Metrics available at http://{host}:{self._server.server_port}/metrics")
+        return True
+
+    def close(self) -> None:
+        """
+        Stop the metrics endpoint and close the trace file.
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._lock:
+            if self._trace_file:
+                self._trace_file.close()
+                self._trace_file = None
@@ -1,19 +1,283 @@
-import pyttsx3
+import os
+import queue
+import shutil
+import tempfile
+import threading
 
-class _TTS:
+import numpy as np
+
+from audio_source import load_wav
+
+
+class Pyttsx3Synthesizer:
     '''
-    A wrapper around pyttsx3 to speaking response.
+    Renders text to PCM with pyttsx3. Must be created and used on a single thread.
     '''
 
-    def __init__(self):
+    def __init__(self, rate: int = 200):
+        import pyttsx3
+
         self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 200) 
+        self.engine.setProperty('rate', rate)
+        self._tmp_dir = tempfile.mkdtemp(prefix="tts_")
+
+    def render(self, text: str) -> tuple[np.ndarray, int]:
+        """
+        Synthesize a text without playing it.
 
-    def start(self,text_):
-        self.engine.say(text_)
+        Args:
+            text (str): Text to synthesize.
+
+        Returns:
+            tuple[np.ndarray, int]: Mono int16 samples and their sample rate.
+        """
+        path = os.path.join(self._tmp_dir, "render.wav")
+        self.engine.save_to_file(text, path)
         self.engine.runAndWait()
+        try:
+            return load_wav(path)
+        finally:
+            os.remove(path)
+
+    def close(self):
+        """
+        Remove the render directory.
+        """
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+class SoundDevicePlayer:
+    '''
+    Plays PCM on the default output device. The output stream is kept open between utterances.
+    '''
+
+    BLOCK_SIZE = 1024
+
+    def __init__(self):
+        import sounddevice
+
+        self._sd = sounddevice
+        self._stream = None
+
+    def play(self, samples: np.ndarray, sample_rate: int, is_stale=None):
+        """
+        Play samples, blocking until done or until is_stale() returns True.
+
+        Args:
+            samples (np.ndarray): Mono int16 samples.
+            sample_rate (int): Sample rate in Hz.
+            is_stale (Callable[[], bool] | None): Checked before every block.
+        """
+        if self._stream is None or self._stream.samplerate != sample_rate:
+            self.close()
+            self._stream = self._sd.OutputStream(samplerate=sample_rate, channels=1, dtype='int16')
+            self._stream.start()
+        for start in range(0, len(samples), self.BLOCK_SIZE):
+            if is_stale and is_stale():
+                break
+            self._stream.write(samples[start:start + self.BLOCK_SIZE].reshape(-1, 1))
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class TTSService:
+    """
+    Long-lived, pipelined text-to-speech service.
+
+    Texts go through two stages connected by bounded queues: a synthesis thread
+    renders sentence N+1 to PCM while a playback thread plays sentence N. The
+    pyttsx3 engine is created once and owned by the synthesis thread (required by
+    the SAPI/COM driver).
+    """
+
+    def __init__(self, rate: int = 200, max_queued_texts: int = 16, max_rendered: int = 2,
+                 synthesizer_factory=None, player=None):
+        """
+        Args:
+            rate (int): Speech rate in words per minute.
+            max_queued_texts (int): Texts waiting for synthesis. enqueue() blocks beyond it.
+            max_rendered (int): Rendered sentences waiting for playback. Synthesis blocks beyond it.
+            synthesizer_factory: Builds the synthesizer (render()/close()) on the synthesis thread.
+                Default: Pyttsx3Synthesizer.
+            player: Audio output with play(samples, sample_rate, is_stale)/close(). Default: SoundDevicePlayer.
+        """
+        self._texts = queue.Queue(maxsize=max_queued_texts)
+        self._rendered = queue.Queue(maxsize=max_rendered)
+        self._synthesizer_factory = synthesizer_factory or (lambda: Pyttsx3Synthesizer(rate))
+        self._player = player or SoundDevicePlayer()
+
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._pending = 0
+        self._generation = 0  # Incremented by stop(): older texts are dropped
+        self.on_playback_start = None  # Called with each text right before its audio starts playing
+        self.is_shut_down = False
+
+        self._ready = threading.Event()
+        self._synthesis_thread = threading.Thread(target=self._synthesis_loop, name="tts-synthesis", daemon=True)
+        self._playback_thread = threading.Thread(target=self._playback_loop, name="tts-playback", daemon=True)
+        self._synthesis_thread.start()
+        self._playback_thread.start()
+        self._ready.wait()
+
+    def _synthesis_loop(self):
+        synthesizer = None
+        try:
+            synthesizer = self._synthesizer_factory()
+        except Exception as e:
+            print(f"❌ TTS initialization error: {e}")
+        finally:
+            self._ready.set()
+
+        while True:
+            item = self._texts.get()
+            if item is None:
+                self._rendered.put(None)
+                break
+            generation, cancel_token, text = item
+            if self._is_stale(generation, cancel_token) or synthesizer is None:
+                self._task_done()
+                continue
+            try:
+                samples, sample_rate = synthesizer.render(text)
+            except Exception as e:
+                print(f"❌ TTS error: {e}")
+                self._task_done()
+                continue
+            self._rendered.put((generation, cancel_token, text, samples, sample_rate))
+        if synthesizer is not None:
+            synthesizer.close()
+
+    def _playback_loop(self):
+        while True:
+            item = self._rendered.get()
+            if item is None:
+                break
+            generation, cancel_token, text, samples, sample_rate = item
+            try:
+                if not self._is_stale(generation, cancel_token):
+                    print(f"🎤 Vocal synthesis: {text}")
+                    if self.on_playback_start:
+                        try:
+                            self.on_playback_start(text)
+                        except Exception as e:
+                            print(f"❌ Error in playback hook: {e}")
+                    # Checked on every block: a stop() landing at any point cuts the sentence
+                    self._player.play(samples, sample_rate, lambda: self._is_stale(generation, cancel_token))
+            except Exception as e:
+                print(f"❌ Audio playback error: {e}")
+            finally:
+                self._task_done()
+        self._player.close()
+
+    def _is_stale(self, generation, cancel_token) -> bool:
+        return generation != self._generation or (cancel_token is not None and cancel_token.is_cancelled)
+
+    def _task_done(self):
+        with self._lock:
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.set()
+
+    def enqueue(self, text: str, cancel_token=None):
+        """
+        Queue a text to be spoken after the ones already queued.
+        Returns as soon as it is queued (blocks only if max_queued_texts is reached).
+
+        Args:
+            text (str): Text to speak.
+            cancel_token (CancellationToken | None): The text is dropped, even if already
+                rendered, once this token is cancelled.
+        """
+        with self._lock:
+            self._pending += 1
+            self._idle.clear()
+            generation = self._generation
+        self._texts.put((generation, cancel_token, text))
+
+    def flush(self):
+        """
+        Drop the texts and rendered audio that have not started playing yet.
+        """
+        for pending_queue in (self._texts, self._rendered):
+            while True:
+                try:
+                    item = pending_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    pending_queue.put(None)  # Keep a pending shutdown request
+                    break
+                self._task_done()
+
+    def stop(self):
+        """
+        Interrupt the current playback and drop everything queued.
+        """
+        with self._lock:
+            self._generation += 1
+        self.flush()
+
+    def wait_until_idle(self, timeout: float = None) -> bool:
+        """
+        Block until every queued text has been spoken.
+
+        Args:
+            timeout (float | None): Maximum wait in seconds.
+
+        Returns:
+            bool: True if idle, False on timeout.
+        """
+        return self._idle.wait(timeout)
+
+    @property
+    def is_idle(self) -> bool:
+        return self._idle.is_set()
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        Stop speaking and terminate the worker threads.
+
+        Args:
+            timeout (float): Maximum wait for each thread in seconds.
+        """
+        with self._lock:
+            if self.is_shut_down:
+                return
+            self.is_shut_down = True
+        self.stop()
+        self._texts.put(None)
+        self._synthesis_thread.join(timeout)
+        self._playback_thread.join(timeout)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> TTSService:
+    """Return the shared TTS service, started on first use."""
+    global _service
+    with _service_lock:
+        if _service is None or _service.is_shut_down:
+            _service = TTSService()
+        return _service
+
 
 def talk(text: str):
-    tts = _TTS() # Initialize the tts engine
-    print(f"🎤 Vocal synthesis: {text}")
-    tts.start(text)  
\ No newline at end of file
+    service = get_service()
+    service.enqueue(text)
+    service.wait_until_idle()
+
+
+def shutdown():
+    """Terminate the shared TTS service, if it was started."""
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.shutdown()
+            _service = None
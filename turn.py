@@ -0,0 +1,392 @@
+import threading
+import time
+import traceback
+from enum import Enum
+from typing import Callable
+
+from cancellation import CancellationToken, TurnCancelled
+
+
+class TurnState(Enum):
+    IDLE = "idle"
+    LISTENING = "listening"
+    TRANSCRIBING = "transcribing"
+    THINKING = "thinking"  # Waiting for the first spoken sentence of the answer
+    SPEAKING = "speaking"
+
+
+# Maximum time spent in each state, in seconds
+DEFAULT_TIMEOUTS = {
+    TurnState.LISTENING: 35.0,
+    TurnState.TRANSCRIBING: 20.0,
+    TurnState.THINKING: 30.0,
+    TurnState.SPEAKING: 120.0,
+}
+
+# Maximum wait for the background transcription of an abandoned turn, in seconds
+STREAM_CANCEL_TIMEOUT = 5.0
+
+
+class Turn:
+    """
+    One conversation turn, from the trigger to the end of the answer.
+    """
+
+    def __init__(self, turn_id: int, interrupted: CancellationToken = None):
+        """
+        Args:
+            turn_id (int): Sequence number of the turn.
+            interrupted (CancellationToken | None): Token of the answer this turn barged in on.
+        """
+        self.id = turn_id
+        self.token = CancellationToken()
+        self.interrupted = interrupted
+        self.state = TurnState.IDLE
+        self.state_times: dict[TurnState, float] = {}  # time.monotonic() of each state entry
+        self.started_at = time.monotonic()
+        self.ended_at = None
+        self.prompt = None
+        self.response = None
+        self.outcome = None  # completed, empty, cancelled, timeout or error
+        self.timed_out = None  # State whose timeout expired
+        self.error = None
+        # time.monotonic() of the stage milestones: speech_end, recording_end, transcript,
+        # and the LLM "start", "first_token", "generation_end" and "end" (answer spoken)
+        self.timestamps: dict[str, float] = {}
+        self._timer = None
+
+    def durations(self) -> dict[str, float]:
+        """
+        Returns:
+            dict[str, float]: Seconds spent in each state the turn went through.
+        """
+        entries = sorted(self.state_times.items(), key=lambda item: item[1])
+        end = self.ended_at or time.monotonic()
+        return {
+            state.value: (entries[i + 1][1] if i + 1 < len(entries) else end) - entered
+            for i, (state, entered) in enumerate(entries)
+        }
+
+
+class TurnOrchestrator:
+    """
+    Event-driven turn state machine: IDLE -> LISTENING -> TRANSCRIBING -> THINKING -> SPEAKING -> IDLE.
+
+    Each transition is triggered by the completion of the previous component (end of
+    recording, transcript, first sentence played, answer spoken), never by polling.
+    Every state has a timeout, and a new trigger while the answer is generated or
+    spoken (barge-in) cancels the turn and starts a new one immediately.
+    """
+
+    BARGE_IN_STATES = (TurnState.THINKING, TurnState.SPEAKING)
+
+    def __init__(
+        self,
+        recorder,
+        stt_app,
+        llm,
+        tts_service,
+        detector=None,
+        pre_roll: float = 0.3,
+        streaming_stt: bool = True,
+        wakeword_barge_in: bool = True,
+        timeouts: dict = None,
+        tracer=None,
+    ):
+        """
+        Args:
+            recorder (AudioRecorder): Records the user request.
+            stt_app (stt.SpeechToTextApplication): Transcribes it.
+            llm (llm.LMStudioResponder): Answers and speaks.
+            tts_service (tts.TTSService): Speech output, used to detect the start of the answer playback.
+            detector (WakeWordDetector | None): Paused while the user speaks to the assistant.
+            pre_roll (float): Seconds of audio captured before the trigger kept in the recording.
+            streaming_stt (bool): Transcribe while the user is speaking.
+            wakeword_barge_in (bool): Resume the wake word detector during the answer so it can interrupt it.
+            timeouts (dict | None): Overrides of DEFAULT_TIMEOUTS, {TurnState: seconds}.
+                A listening timeout ends the recording, any other one cancels the turn.
+            tracer (tracing.Tracer | None): Receives the stage spans of every finished turn.
+        """
+        self.recorder = recorder
+        self.stt_app = stt_app
+        self.llm = llm
+        self.tts = tts_service
+        self.detector = detector
+        self.pre_roll = pre_roll
+        self.streaming_stt = streaming_stt
+        self.wakeword_barge_in = wakeword_barge_in
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.tracer = tracer
+
+        self._lock = threading.Lock()
+        self._turn = None
+        self._next_id = 1
+        self._hooks: list[Callable[[Turn, TurnState, TurnState], None]] = []
+        self._turn_end_hooks: list[Callable[[Turn], None]] = []
+        self.cancel_to_listen_latencies = []
+
+        self.tts.on_playback_start = self._on_playback_start
+
+    @property
+    def current_turn(self) -> Turn | None:
+        with self._lock:
+            return self._turn
+
+    @property
+    def state(self) -> TurnState:
+        with self._lock:
+            return self._turn.state if self._turn else TurnState.IDLE
+
+    def add_hook(self, callback: Callable[[Turn, TurnState, TurnState], None]) -> None:
+        """
+        Register a function called on every transition with (turn, previous state, new state).
+        Hooks run on the thread that completed the previous stage: keep them short.
+
+        Args:
+            callback (Callable[[Turn, TurnState, TurnState], None]): The hook.
+        """
+        self._hooks.append(callback)
+
+    def add_turn_end_hook(self, callback: Callable[[Turn], None]) -> None:
+        """
+        Register a function called with each finished turn (completed, cancelled or failed).
+
+        Args:
+            callback (Callable[[Turn], None]): The hook.
+        """
+        self._turn_end_hooks.append(callback)
+
+    def _call_hooks(self, hooks, *args) -> None:
+        for hook in hooks:
+            try:
+                hook(*args)
+            except Exception as e:
+                print(f"❌ Error in turn hook: {e}")
+
+    def trigger(self) -> Turn | None:
+        """
+        Start a turn (wake word or button). Returns immediately.
+
+        Returns:
+            Turn | None: The new turn, or None if a turn is already listening or transcribing.
+        """
+        with self._lock:
+            current = self._turn
+            interrupted = None
+            if current is not None:
+                if current.state not in self.BARGE_IN_STATES:
+                    print("🔄 Already processing. Please wait...")
+                    return None
+                print("✋ Barge-in: interrupting the answer...")
+                interrupted = current.token
+            turn = Turn(self._next_id, interrupted)
+            self._next_id += 1
+            self._turn = turn
+        if interrupted:
+            interrupted.cancel()
+        threading.Thread(target=self._run, args=(turn,), name=f"turn-{turn.id}", daemon=True).start()
+        return turn
+
+    def cancel(self) -> None:
+        """
+        Cancel the current turn, if any.
+        """
+        turn = self.current_turn
+        if turn:
+            turn.token.cancel()
+
+    def _set_state(self, turn: Turn, state: TurnState) -> bool:
+        """
+        Move a turn to a new state and arm the state timeout.
+
+        Returns:
+            bool: False if the turn is no longer the current one (it was interrupted).
+        """
+        with self._lock:
+            if self._turn is not turn or (turn.token.is_cancelled and state is not TurnState.IDLE):
+                return False
+            previous = turn.state
+            turn.state = state
+            turn.state_times[state] = time.monotonic()
+            if turn._timer:
+                turn._timer.cancel()
+                turn._timer = None
+            timeout = self.timeouts.get(state)
+            if timeout:
+                turn._timer = threading.Timer(timeout, self._on_timeout, args=(turn, state))
+                turn._timer.daemon = True
+                turn._timer.start()
+        self._call_hooks(self._hooks, turn, previous, state)
+        return True
+
+    def _on_timeout(self, turn: Turn, state: TurnState) -> None:
+        with self._lock:
+            if self._turn is not turn or turn.state is not state:
+                return
+        print(f"⏱️ Turn {turn.id}: {state.value} timed out after {self.timeouts[state]:.0f} s")
+        if state is TurnState.LISTENING:
+            # Keep what was said so far
+            self.recorder.stop_recording()
+        else:
+            turn.timed_out = state
+            turn.token.cancel()
+
+    def _on_playback_start(self, text: str) -> None:
+        """
+        TTS hook: the first sentence of the answer starts playing.
+        """
+        turn = self.current_turn
+        if turn and turn.state is TurnState.THINKING:
+            self._set_state(turn, TurnState.SPEAKING)
+
+    def _run(self, turn: Turn) -> None:
+        stream = None
+        try:
+            print("🎤 Trigger detected — start listening...")
+            self._set_state(turn, TurnState.LISTENING)
+            if self.detector:
+                # No wake word inference while the user speaks to the assistant
+                self.detector.pause()
+
+            if self.streaming_stt:
+                stream = self.stt_app.start_stream(
+                    self.recorder.sample_rate,
+                    on_partial=lambda text: print(f"📝 Partial transcription: {text}")
+                )
+                self.recorder.on_audio_chunk = stream.feed
+
+            if not self.recorder.start_recording(pre_roll=self.pre_roll):
+                raise RuntimeError("the recording could not start")
+            if turn.interrupted is not None and turn.interrupted.cancelled_at is not None:
+                latency = time.monotonic() - turn.interrupted.cancelled_at
+                self.cancel_to_listen_latencies.append(latency)
+                print(f"⏱️ Cancel-to-listen latency: {latency * 1000:.1f} ms")
+
+            turn.token.add_callback(self.recorder.stop_recording)
+            self.recorder.wait_until_stopped()
+            turn.token.remove_callback(self.recorder.stop_recording)
+            turn.timestamps["speech_end"] = self.recorder.last_speech_at
+            turn.timestamps["recording_end"] = self.recorder.stopped_at
+            turn.token.raise_if_cancelled()
+            print("Recording finished!")
+
+            audio = self.recorder.get_audio_array()
+            if audio.size == 0:
+                print("❌ Nothing was recorded. Try again.")
+                turn.outcome = "empty"
+                return
+
+            self._set_state(turn, TurnState.TRANSCRIBING)
+            if stream:
+                prompt = self._transcribe(turn, stream.finish)
+                stream = None
+            else:
+                energy_track = self.recorder.get_energy_track()
+                prompt = self._transcribe(
+                    turn,
+                    lambda: self.stt_app.transcribe_array(audio, self.recorder.sample_rate, energy_track=energy_track)
+                )
+            turn.timestamps["transcript"] = time.monotonic()
+            turn.token.raise_if_cancelled()
+            print(f"Transcription: {prompt}")
+
+            if not prompt or len(prompt.strip()) < 2:
+                print("❌ No speech detected or transcription too short. Try again.")
+                turn.outcome = "empty"
+                return
+            turn.prompt = prompt
+
+            print("🤖 LLM responding, please wait...")
+            self._set_state(turn, TurnState.THINKING)
+            if self.detector and self.wakeword_barge_in:
+                self.detector.resume()
+            turn.response = self.llm.respond_and_speak(prompt, cancel_token=turn.token, timings=turn.timestamps)
+            turn.token.raise_if_cancelled()
+            turn.outcome = "completed"
+
+        except TurnCancelled:
+            turn.outcome = "timeout" if turn.timed_out else "cancelled"
+        except Exception as e:
+            turn.outcome = "error"
+            turn.error = e
+            print(f"❌ Error in voice processing: {e}")
+            traceback.print_exc()
+        finally:
+            # A timed-out turn goes back to idle at once (the STT application serialises the
+            # transcriptions, so an abandoned one cannot overlap the next turn's)
+            timeout = 0 if turn.timed_out else STREAM_CANCEL_TIMEOUT
+            if stream and not stream.cancel(timeout=timeout) and timeout:
+                print("⚠️ Background transcription still running after cancel.")
+            self._finish(turn)
+
+    def _transcribe(self, turn: Turn, transcribe: Callable[[], str]) -> str:
+        """
+        Run a transcription on a helper thread and wait for it or for the turn's cancellation,
+        so that the TRANSCRIBING timeout bounds the stage instead of the model's run time.
+
+        Raises:
+            TurnCancelled: If the turn is cancelled first. The transcription is abandoned.
+        """
+        result = {}
+        done = threading.Event()
+
+        def work():
+            try:
+                result["text"] = transcribe()
+            except Exception as e:
+                result["error"] = e
+            finally:
+                done.set()
+
+        threading.Thread(target=work, name=f"turn-{turn.id}-stt", daemon=True).start()
+        turn.token.add_callback(done.set)
+        try:
+            done.wait()
+        finally:
+            turn.token.remove_callback(done.set)
+        turn.token.raise_if_cancelled()
+        if "error" in result:
+            raise result["error"]
+        return result["text"]
+
+    def _trace(self, turn: Turn) -> None:
+        """
+        Record the stage spans of a finished turn.
+        """
+        t = turn.timestamps
+        spoken_at = turn.state_times.get(TurnState.SPEAKING)
+        record = self.tracer.record
+        record("listening", turn.state_times.get(TurnState.LISTENING), t.get("recording_end"), turn.id)
+        # Delay between the end of the user's speech and the end of the recording
+        record("vad_endpoint", t.get("speech_end"), t.get("recording_end"), turn.id)
+        record("stt", t.get("recording_end"), t.get("transcript"), turn.id)
+        record("llm_ttft", t.get("start"), t.get("first_token"), turn.id)
+        record("llm_generation", t.get("start"), t.get("generation_end"), turn.id)
+        # Perceived response latency: end of the user's speech to the first spoken audio
+        record("first_audio", t.get("speech_end") or t.get("recording_end"), spoken_at, turn.id)
+        # Audio still playing after the last token
+        record("tts_tail", t.get("generation_end"), t.get("end"), turn.id)
+        record("turn", turn.started_at, turn.ended_at, turn.id, outcome=turn.outcome)
+
+    def _finish(self, turn: Turn) -> None:
+        self._set_state(turn, TurnState.IDLE)
+        turn.ended_at = time.monotonic()
+        if turn._timer:
+            turn._timer.cancel()
+        with self._lock:
+            current = self._turn is turn
+            if current:
+                self._turn = None
+        if current:
+            # After a barge-in these belong to the next turn
+            self.recorder.on_audio_chunk = None
+            if self.detector:
+                self.detector.resume()
+
+        if self.tracer:
+            self._trace(turn)
+        stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in turn.durations().items() if name != "idle")
+        print(f"⏱️ Turn {turn.id} {turn.outcome}: {stages}")
+        self._call_hooks(self._turn_end_hooks, turn)
+        if current:
+            print("✅ Ready for next command!\n")
@@ -1,15 +1,152 @@
 import numpy as np
-import pyaudio
-from openwakeword.model import Model
-from openwakeword.utils import download_models
 import threading
 import queue
+import time
 import os
+from collections import deque
 from typing import Callable, Optional, Dict, Any
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from audio_source import PyAudioSource
+from recorder import SilenceDetector
+
+class WakeWordTrigger:
+    """
+    Logique de déclenchement d'un modèle de mot de réveil : lissage du score,
+    patience et période réfractaire, indépendants des autres modèles.
+    """
+
+    def __init__(self, threshold: float = 0.25, patience: int = 1, smoothing: int = 1, refractory: float = 2.0):
+        """
+        Args:
+            threshold: Seuil de détection (0-1), appliqué au score lissé
+            patience: Nombre de frames consécutives (80 ms) au-dessus du seuil avant détection
+            smoothing: Nombre de frames de la moyenne glissante du score (1 = pas de lissage)
+            refractory: Durée (secondes) pendant laquelle une nouvelle détection est ignorée
+        """
+        self.threshold = threshold
+        self.patience = max(1, patience)
+        self.refractory = refractory
+        self._scores = deque(maxlen=max(1, smoothing))
+        self._above = 0
+        self._last_detection = None
+
+    def update(self, score: float, timestamp: float) -> Optional[float]:
+        """
+        Ajoute le score d'une frame.
+
+        Args:
+            score: Score brut du modèle
+            timestamp: Horodatage de la frame (time.monotonic)
+
+        Returns:
+            Optional[float]: Le score lissé si le mot est détecté sur cette frame, sinon None
+        """
+        self._scores.append(float(score))
+        smoothed = sum(self._scores) / len(self._scores)
+        if self._last_detection is not None and timestamp - self._last_detection < self.refractory:
+            return None
+        if smoothed <= self.threshold:
+            self._above = 0
+            return None
+        self._above += 1
+        if self._above < self.patience:
+            return None
+        self._above = 0
+        self._last_detection = timestamp
+        return smoothed
+
+    def reset(self):
+        """Oublie les scores récents (la période réfractaire en cours est conservée)."""
+        self._scores.clear()
+        self._above = 0
+
+
+class EnergyGate:
+    """
+    Pré-filtre énergétique devant le modèle : les chunks silencieux ne sont pas inférés.
+
+    À l'ouverture, les derniers chunks sautés sont rejoués dans le préprocesseur
+    (sans être scorés) au lieu de réinitialiser le modèle : ses buffers de
+    features (~0,76 s de mel + 16 embeddings de 80 ms) contiennent alors l'audio
+    réel qui précède le mot, et non le bruit aléatoire de Model.reset().
+    """
+
+    FEATURE_CONTEXT = 2.0  # Secondes d'audio couvrant tout le contexte de features du modèle
+
+    def __init__(self, min_threshold: float = 100, hangover: float = 1.0, replay: float = FEATURE_CONTEXT,
+                 sample_rate: int = 16000, chunk_size: int = 1280):
+        """
+        Args:
+            min_threshold: Seuil RMS minimal d'ouverture (seuil adaptatif au bruit de fond au-delà)
+            hangover: Durée (secondes) pendant laquelle le gate reste ouvert après le dernier chunk sonore
+            replay: Durée (secondes) d'audio sauté rejouée à l'ouverture. En dessous de
+                FEATURE_CONTEXT, le début du mot est scoré avec des features périmées.
+            sample_rate: Taux d'échantillonnage des chunks
+            chunk_size: Nombre d'échantillons par chunk
+        """
+        chunk_seconds = chunk_size / sample_rate
+        self.detector = SilenceDetector(
+            silence_threshold=min_threshold * 3,
+            sample_rate=sample_rate,
+            chunk_size=chunk_size,
+            min_threshold=min_threshold
+        )
+        self._hangover_chunks = max(1, int(round(hangover / chunk_seconds)))
+        self._history = deque(maxlen=max(0, int(round(replay / chunk_seconds))))
+        self.is_open = False
+        self._remaining = 0
+
+    def filter(self, timestamp, audio_array):
+        """
+        Retourne les chunks à passer au modèle, sous forme de (timestamp, audio, scored) :
+        aucun si le chunk est silencieux ; à l'ouverture, les chunks sautés à rejouer
+        (scored=False, features uniquement) suivis du chunk courant.
+        """
+        self.detector.process_audio_chunk(audio_array)
+        if self.detector.last_is_speech:
+            self._remaining = self._hangover_chunks
+            if not self.is_open:
+                self.is_open = True
+                replay = [(ts, audio, False) for ts, audio in self._history]
+                self._history.clear()
+                return replay + [(timestamp, audio_array, True)]
+            return [(timestamp, audio_array, True)]
+        if self.is_open:
+            self._remaining -= 1
+            if self._remaining <= 0:
+                self.is_open = False
+            return [(timestamp, audio_array, True)]
+        self._history.append((timestamp, audio_array))
+        return []
+
+    def reset(self):
+        """Ferme le gate et oublie l'audio sauté (discontinuité du flux)."""
+        self.is_open = False
+        self._remaining = 0
+        self._history.clear()
+
+
+def prime_features(model, audio_array):
+    """
+    Alimente les buffers de features d'un Model openWakeWord sans scorer.
+    """
+    preprocessor = getattr(model, 'preprocessor', None)
+    if callable(preprocessor):
+        preprocessor(audio_array)
+    else:
+        model.predict(audio_array)
+
 
 class WakeWordDetector:
-    """Détecteur modulaire de mot de réveil utilisant openWakeWord."""
+    """Détecteur modulaire de mot de réveil utilisant openWakeWord.
+
+    L'inférence tourne sur son propre thread, alimenté par une queue bornée, et les
+    callbacks sont exécutés par un pool de threads : un callback lent ne bloque
+    jamais la détection.
+    """
+
+    DROP_POLICIES = ('drop_oldest', 'pause')
     
     def __init__(
         self,
@@ -19,7 +156,18 @@ class WakeWordDetector:
         chunk_size: int = 1280,
         sample_rate: int = 16000,
         channels: int = 1,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        capture=None,
+        source=None,
+        max_queue_chunks: int = 50,
+        drop_policy: str = 'drop_oldest',
+        callback_workers: int = 1,
+        max_pending_events: int = 4,
+        energy_gate: bool = True,
+        gate_min_threshold: float = 100,
+        gate_hangover: float = 1.0,
+        gate_replay: float = EnergyGate.FEATURE_CONTEXT,
+        wakeword_config: Optional[Dict[str, Dict[str, Any]]] = None
     ):
         """
         Initialise le détecteur de mot de réveil.
@@ -27,34 +175,129 @@ class WakeWordDetector:
         Args:
             wakeword_models: Liste des modèles à charger (par défaut: ['hey_jarvis'])
             inference_framework: Framework d'inférence ('onnx' ou 'tflite')
-            threshold: Seuil de détection (0-1)
+            threshold: Seuil de détection (0-1) des modèles sans configuration dédiée
             chunk_size: Taille des chunks audio
             sample_rate: Taux d'échantillonnage
             channels: Nombre de canaux audio
             logger: Logger personnalisé
+            capture: AudioCaptureService partagé (évite d'ouvrir un stream dédié)
+            source: AudioSource du stream dédié (par défaut : PyAudioSource)
+            max_queue_chunks: Nombre maximal de chunks en attente d'inférence (50 chunks de 80 ms = 4 s)
+            drop_policy: Comportement quand la queue est pleine :
+                'drop_oldest' jette les chunks les plus anciens (l'audio récent est toujours analysé),
+                'pause' ignore l'audio entrant jusqu'à ce que la queue soit à moitié vidée,
+                puis réinitialise le modèle (discontinuité)
+            callback_workers: Nombre de threads exécutant les callbacks
+            max_pending_events: Détections en attente de callback au-delà desquelles les nouvelles sont ignorées
+            energy_gate: Saute l'inférence sur les chunks silencieux (seuil adaptatif au bruit de fond)
+            gate_min_threshold: Seuil RMS minimal d'ouverture du gate
+            gate_hangover: Durée (secondes) pendant laquelle le gate reste ouvert après le dernier chunk sonore
+            gate_replay: Durée (secondes) d'audio sauté rejouée dans le préprocesseur à l'ouverture
+                du gate, pour que ses buffers de features contiennent l'audio réel avant le mot
+                (au moins EnergyGate.FEATURE_CONTEXT)
+            wakeword_config: Réglages par modèle, paramètres de WakeWordTrigger
+                (ex : {'alexa': {'threshold': 0.5, 'patience': 2, 'smoothing': 3, 'refractory': 2.0}})
         """
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f"drop_policy doit être parmi {self.DROP_POLICIES}")
         self.wakeword_models = wakeword_models or ['hey_jarvis']
         self.threshold = threshold
+        self.wakeword_config = {name: dict(settings) for name, settings in (wakeword_config or {}).items()}
+        self._triggers: Dict[str, WakeWordTrigger] = {}
         self.chunk_size = chunk_size
         self.sample_rate = sample_rate
         self.channels = channels
         self.logger = logger or logging.getLogger(__name__)
         
         # Initialisation du modèle
+        from openwakeword.model import Model
+
         self.model = Model(
             wakeword_models=self.wakeword_models,
             inference_framework=inference_framework
         )
         
         # Configuration audio
-        self.audio_format = pyaudio.paInt16
-        self.audio = pyaudio.PyAudio()
+        self.capture = capture
+        self._owns_source = source is None and capture is None
+        self.source = source or (None if capture else PyAudioSource())
         self.stream = None
+        self.reading_thread = None
         
         # Threading et état
         self.is_listening = False
-        self.audio_queue = queue.Queue()
+        self.max_queue_chunks = max_queue_chunks
+        self.drop_policy = drop_policy
+        # (timestamp, chunk) ; chunk None = discontinuité, le modèle est réinitialisé à cette position
+        self.audio_queue = queue.Queue(maxsize=max_queue_chunks)
+        self._queue_lock = threading.Lock()
+        self._input_paused = False
+        self._reset_pending = False  # Marqueur de discontinuité jeté en tête de queue par drop_oldest
+        self.is_paused = False
         self.callbacks: Dict[str, Callable] = {}
+        self.callback_workers = callback_workers
+        self.max_pending_events = max_pending_events
+        self._executor = None
+        self._pending_events = 0
+        self._stats_lock = threading.Lock()
+        self._reset_stats()
+
+        # Pré-filtre énergétique
+        self.gate = EnergyGate(
+            min_threshold=gate_min_threshold,
+            hangover=gate_hangover,
+            replay=gate_replay,
+            sample_rate=sample_rate,
+            chunk_size=chunk_size
+        ) if energy_gate else None
+
+        # Scoring par lot quand le détecteur a du retard, détections horodatées
+        self._batch_capable = self._supports_batch()
+        # Modèles acceptant un lot de fenêtres de features en une prédiction (tflite : non)
+        self._batch_predict = {name: True for name in getattr(self.model, 'models', {})}
+        self.detections = deque(maxlen=100)  # {'wakeword', 'score', 'timestamp' (time.monotonic)}
+
+    def _reset_stats(self):
+        with self._stats_lock:
+            self._stats = {
+                'chunks_processed': 0,
+                'chunks_inferred': 0,
+                'chunks_gated': 0,
+                'chunks_replayed': 0,
+                'chunks_paused': 0,
+                'chunks_dropped': 0,
+                'max_queue_depth': 0,
+                'lag_seconds': 0.0,
+                'max_lag_seconds': 0.0,
+                'catchup_batches': 0,
+                'max_batch_chunks': 0,
+                'events_dispatched': 0,
+                'events_dropped': 0,
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Métriques de la file d'inférence et de la distribution des événements.
+
+        Returns:
+            Dict[str, Any]: queue_depth / max_queue_depth / queue_capacity (chunks),
+                chunks_processed, chunks_inferred, chunks_gated (jamais passés au modèle),
+                chunks_replayed (sautés puis rejoués dans le préprocesseur à l'ouverture du gate),
+                chunks_paused (ignorés pendant pause()), chunks_dropped,
+                duty_cycle (part des chunks reçus passés au préprocesseur, inférés ou rejoués),
+                catchup_batches / max_batch_chunks (rattrapages par lot),
+                lag_seconds (âge du dernier chunk analysé), max_lag_seconds,
+                events_dispatched, events_dropped, pending_events
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats['pending_events'] = self._pending_events
+        received = stats['chunks_processed'] + stats['chunks_paused'] + stats['chunks_dropped']
+        computed = stats['chunks_inferred'] + stats['chunks_replayed']
+        stats['duty_cycle'] = computed / received if received else 0.0
+        stats['queue_depth'] = self.audio_queue.qsize()
+        stats['queue_capacity'] = self.max_queue_chunks
+        return stats
         
     def register_callback(self, wakeword: str, callback: Callable[[str, float], Any]):
         """
@@ -66,41 +309,331 @@ class WakeWordDetector:
         """
         self.callbacks[wakeword] = callback
         self.logger.info(f"Callback enregistré pour '{wakeword}'")
+
+    def configure_wakeword(self, wakeword: str, **settings):
+        """
+        Modifie les réglages de déclenchement d'un modèle.
+
+        Args:
+            wakeword: Nom du mot de réveil
+            **settings: threshold, patience, smoothing et/ou refractory (voir WakeWordTrigger)
+        """
+        self.wakeword_config.setdefault(wakeword, {}).update(settings)
+        self._triggers.pop(wakeword, None)
+
+    def _get_trigger(self, wakeword):
+        trigger = self._triggers.get(wakeword)
+        if trigger is None:
+            settings = {'threshold': self.threshold, **self.wakeword_config.get(wakeword, {})}
+            trigger = self._triggers[wakeword] = WakeWordTrigger(**settings)
+        return trigger
+
+    def _reset_triggers(self):
+        for trigger in self._triggers.values():
+            trigger.reset()
         
-    def _audio_callback(self, in_data, frame_count, time_info, status):
-        """Callback pour le stream audio."""
+    def _read_audio(self):
+        """Thread de lecture du stream dédié."""
+        while self.is_listening:
+            try:
+                data = self.stream.read(self.chunk_size)
+            except EOFError:
+                self.logger.info("Fin de la source audio")
+                break
+            except Exception as e:
+                self.logger.error(f"Erreur de lecture audio: {e}")
+                time.sleep(0.01)
+                continue
+            self._enqueue(data, time.monotonic())
+    
+    def _on_capture_chunk(self, chunk, timestamp):
+        """Callback d'abonnement au flux de capture partagé."""
         if self.is_listening:
-            self.audio_queue.put(in_data)
-        return (in_data, pyaudio.paContinue)
+            self._enqueue(chunk, timestamp)
+
+    def _enqueue(self, data, timestamp):
+        """Ajoute un chunk à la queue bornée sans jamais bloquer le producteur."""
+        if self.is_paused:
+            with self._stats_lock:
+                self._stats['chunks_paused'] += 1
+            return
+        with self._queue_lock:
+            if self.drop_policy == 'pause':
+                if self._input_paused:
+                    if self.audio_queue.qsize() > self.max_queue_chunks // 2:
+                        self._count_dropped(1)
+                        return
+                    self._input_paused = False
+                    # L'audio n'est plus continu (la queue est à moitié vide : le marqueur a sa place)
+                    self.audio_queue.put_nowait((timestamp, None))
+                    self.logger.info("Reprise de l'analyse audio après saturation")
+                try:
+                    self.audio_queue.put_nowait((timestamp, data))
+                except queue.Full:
+                    self._input_paused = True
+                    self._count_dropped(1)
+                    self.logger.warning("Queue audio saturée : analyse suspendue")
+            else:
+                while True:
+                    try:
+                        self.audio_queue.put_nowait((timestamp, data))
+                        break
+                    except queue.Full:
+                        try:
+                            _, dropped = self.audio_queue.get_nowait()
+                            if dropped is None:
+                                # Tout ce qui reste est postérieur à la discontinuité
+                                self._reset_pending = True
+                            else:
+                                self._count_dropped(1)
+                        except queue.Empty:
+                            pass
+            depth = self.audio_queue.qsize()
+        with self._stats_lock:
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+
+    def _count_dropped(self, count):
+        with self._stats_lock:
+            self._stats['chunks_dropped'] += count
+
+    def _dispatch(self, wakeword, score):
+        """Confie le callback au pool de threads, sans attendre son exécution."""
+        callback = self.callbacks.get(wakeword)
+        if callback is None or self._executor is None:
+            return
+        with self._stats_lock:
+            if self._pending_events >= self.max_pending_events:
+                self._stats['events_dropped'] += 1
+                self.logger.warning(f"Trop de détections en attente, '{wakeword}' ignoré")
+                return
+            self._pending_events += 1
+            self._stats['events_dispatched'] += 1
+        try:
+            future = self._executor.submit(self._run_callback, callback, wakeword, score)
+        except RuntimeError:
+            # Pool arrêté pendant stop()
+            self._event_done(None)
+            return
+        # Appelé aussi pour les callbacks annulés par stop()
+        future.add_done_callback(self._event_done)
+
+    def _event_done(self, future):
+        with self._stats_lock:
+            self._pending_events -= 1
+
+    def _run_callback(self, callback, wakeword, score):
+        try:
+            callback(wakeword, score)
+        except Exception as e:
+            self.logger.error(f"Erreur dans le callback: {e}")
     
+    def pause(self):
+        """
+        Suspend l'inférence (pendant un enregistrement ou la synthèse vocale).
+        L'audio reçu pendant la pause est ignoré.
+        """
+        if self.is_paused:
+            return
+        self.is_paused = True
+        with self._queue_lock:
+            while not self.audio_queue.empty():
+                self.audio_queue.get_nowait()
+        self.logger.info("Détection en pause")
+
+    def resume(self):
+        """Reprend l'inférence, avec un modèle réinitialisé (l'audio n'est plus continu)."""
+        if not self.is_paused:
+            return
+        with self._queue_lock:
+            # La queue a été vidée par pause() : le marqueur précède tout l'audio repris
+            self.audio_queue.put_nowait((time.monotonic(), None))
+        self.is_paused = False
+        self.logger.info("Reprise de la détection")
+
+    def _reset_gate(self):
+        if self.gate is not None:
+            self.gate.reset()
+
+    def _supports_batch(self):
+        """
+        Le scoring par lot lit directement les buffers du préprocesseur d'openWakeWord :
+        possible uniquement pour des chunks de 80 ms et des modèles à une sortie,
+        sans suppression de bruit ni VAD intégrés.
+        """
+        model = self.model
+        try:
+            return (
+                self.chunk_size == 1280
+                and getattr(model, 'speex_ns', None) is None
+                and not getattr(model, 'vad_threshold', 0)
+                and hasattr(model.preprocessor, 'get_features')
+                and all(model.model_outputs[name] == 1 for name in model.models)
+            )
+        except AttributeError:
+            return False
+
+    def _score(self, frames):
+        """
+        Score les chunks d'un lot dans l'ordre. Un élément None marque une discontinuité :
+        le modèle est réinitialisé à cette position, après le scoring des chunks qui la précèdent.
+        """
+        segment = []
+        for frame in frames:
+            if frame is not None:
+                segment.append(frame)
+                continue
+            if segment:
+                self._score_segment(segment)
+                segment = []
+            self.model.reset()
+            self._reset_triggers()
+        if segment:
+            self._score_segment(segment)
+
+    def _score_segment(self, frames):
+        """
+        Score une suite de chunks consécutifs (timestamp, audio, scored) : un par un en
+        régime normal, par lot (extraction de features en un seul appel) quand le
+        détecteur a du retard. Les chunks rejoués (scored=False) alimentent seulement
+        les buffers de features.
+        """
+        if len(frames) > 1 and self._batch_capable:
+            self._score_batch(frames)
+        else:
+            for timestamp, audio_array, scored in frames:
+                if scored:
+                    self._infer(timestamp, audio_array)
+                else:
+                    prime_features(self.model, audio_array)
+
+    def _infer(self, timestamp, audio_array):
+        """Prédiction sur un chunk."""
+        predictions = self.model.predict(audio_array)
+        with self._stats_lock:
+            self._stats['chunks_inferred'] += 1
+        self._check_predictions(predictions, timestamp)
+
+    def _score_batch(self, frames):
+        """
+        Rattrapage : les features de tous les chunks sont calculées en un appel au
+        préprocesseur (le modèle d'embedding y tourne toujours une fois par chunk),
+        puis chaque modèle prédit toutes les fenêtres de 80 ms en un appel. Les
+        détections sont ensuite évaluées chunk par chunk, avec leur horodatage.
+        """
+        model = self.model
+        model.preprocessor(np.concatenate([audio_array for _, audio_array, _ in frames]))
+        with self._stats_lock:
+            self._stats['catchup_batches'] += 1
+            self._stats['max_batch_chunks'] = max(self._stats['max_batch_chunks'], len(frames))
+
+        scored = [(i, timestamp) for i, (timestamp, _, is_scored) in enumerate(frames) if is_scored]
+        if not scored:
+            return
+        scores = {}
+        for name in model.models:
+            n_frames = model.model_inputs[name]
+            windows = [
+                model.preprocessor.get_features(n_frames, start_ndx=-n_frames - (len(frames) - 1 - i))
+                for i, _ in scored
+            ]
+            scores[name] = self._predict_windows(name, windows)
+
+        for k, (_, timestamp) in enumerate(scored):
+            predictions = {}
+            for name in model.models:
+                score = scores[name][k]
+                # Comme Model.predict : scores nuls pendant l'initialisation du modèle
+                if len(model.prediction_buffer[name]) < 5:
+                    score = 0.0
+                model.prediction_buffer[name].append(score)
+                predictions[name] = score
+            with self._stats_lock:
+                self._stats['chunks_inferred'] += 1
+
+            self._check_predictions(predictions, timestamp)
+
+    def _predict_windows(self, name, windows):
+        """
+        Scores d'un modèle sur des fenêtres de features (1, n_frames, 96) : en un seul
+        appel si le modèle accepte un lot, sinon (ou après un premier échec) une par une.
+        """
+        predict = self.model.model_prediction_function[name]
+        if len(windows) > 1 and self._batch_predict.get(name):
+            try:
+                scores = np.asarray(predict(np.concatenate(windows))[0], dtype=np.float32).reshape(-1)
+                if len(scores) == len(windows):
+                    return [score.item() for score in scores]
+                raise ValueError(f"{len(scores)} scores pour {len(windows)} fenêtres")
+            except Exception as e:
+                self._batch_predict[name] = False
+                self.logger.info(f"Prédiction par lot indisponible pour {name}, fenêtre par fenêtre : {e}")
+        return [np.asarray(predict(window)[0]).item() for window in windows]
+
+    def _check_predictions(self, predictions, timestamp):
+        """
+        Distribue les détections. Chaque modèle a son propre déclencheur : pas de
+        réinitialisation globale, les autres mots de réveil ne sont pas affectés.
+        """
+        for wakeword, score in predictions.items():
+            detected_score = self._get_trigger(wakeword).update(score, timestamp)
+            if detected_score is None:
+                continue
+            self.logger.info(f"Mot de réveil détecté: {wakeword} (score: {detected_score:.2f})")
+            self.detections.append({'wakeword': wakeword, 'score': detected_score, 'timestamp': timestamp})
+            # Appel du callback (asynchrone) si disponible
+            self._dispatch(wakeword, detected_score)
+
     def _process_audio(self):
         """Thread de traitement audio."""
         self.logger.info("Démarrage du traitement audio")
         
         while self.is_listening:
             try:
-                # Récupération des données audio
-                audio_data = self.audio_queue.get(timeout=0.1)
-                
-                # Conversion en numpy array
-                audio_array = np.frombuffer(audio_data, dtype=np.int16)
-                
-                # Prédiction
-                predictions = self.model.predict(audio_array)
-                
-                # Vérification des détections
-                for wakeword, score in predictions.items():
-                    if score > self.threshold:
-                        self.logger.info(f"Mot de réveil détecté: {wakeword} (score: {score:.2f})")
-                        # Appel du callback si disponible
-                        if wakeword in self.callbacks:
-                            try:
-                                self.callbacks[wakeword](wakeword, score)
-                            except Exception as e:
-                                self.logger.error(f"Erreur dans le callback: {e}")
-                        
-                        # Réinitialisation pour éviter les détections multiples
-                        self.model.reset()
+                # Récupération des données audio, et de tout le retard accumulé
+                items = [self.audio_queue.get(timeout=0.1)]
+                while True:
+                    try:
+                        items.append(self.audio_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if len(items) > 1:
+                    self.logger.debug(f"Rattrapage de {len(items)} chunks")
+
+                # Prédiction (sautée sur les chunks silencieux)
+                frames = []
+                if self._reset_pending:
+                    self._reset_pending = False
+                    items.insert(0, (items[0][0], None))
+                for timestamp, audio_data in items:
+                    if audio_data is None:
+                        # Discontinuité : le gate filtre déjà dans l'ordre, le modèle sera
+                        # réinitialisé au scoring, après les chunks qui précèdent
+                        self._reset_gate()
+                        frames.append(None)
+                        continue
+                    audio_array = np.frombuffer(audio_data, dtype=np.int16)
+                    if self.gate is None:
+                        frames.append((timestamp, audio_array, True))
+                        continue
+                    selected = self.gate.filter(timestamp, audio_array)
+                    with self._stats_lock:
+                        if selected:
+                            # Les chunks rejoués avaient été comptés comme sautés
+                            replayed = len(selected) - 1
+                            self._stats['chunks_gated'] -= replayed
+                            self._stats['chunks_replayed'] += replayed
+                        else:
+                            self._stats['chunks_gated'] += 1
+                    frames.extend(selected)
+                if frames:
+                    self._score(frames)
+
+                now = time.monotonic()
+                with self._stats_lock:
+                    self._stats['chunks_processed'] += sum(audio_data is not None for _, audio_data in items)
+                    self._stats['lag_seconds'] = now - items[-1][0]
+                    self._stats['max_lag_seconds'] = max(self._stats['max_lag_seconds'], now - items[0][0])
                         
             except queue.Empty:
                 continue
@@ -109,6 +642,8 @@ class WakeWordDetector:
 
     @classmethod
     def download_models(self):
+        from openwakeword.utils import download_models
+
         if not os.path.exists("resources/models"):
             print("Download et installation de openWakeWord")
             # One-time download of all pre-trained models (or only select models)
@@ -122,17 +657,26 @@ class WakeWordDetector:
             return
         
         self.logger.info("Démarrage du détecteur de mot de réveil")
+        self._reset_stats()
+        self._reset_gate()
+        self._input_paused = False
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.callback_workers,
+            thread_name_prefix="wakeword-callback"
+        )
         self.is_listening = True
         
-        # Ouverture du stream audio
-        self.stream = self.audio.open(
-            format=self.audio_format,
-            channels=self.channels,
-            rate=self.sample_rate,
-            input=True,
-            frames_per_buffer=self.chunk_size,
-            stream_callback=self._audio_callback
-        )
+        # Abonnement au flux partagé ou ouverture d'un stream audio dédié
+        if self.capture:
+            self.capture.subscribe(self._on_capture_chunk)
+        else:
+            self.stream = self.source.open_stream(
+                self.sample_rate,
+                self.chunk_size,
+                channels=self.channels
+            )
+            self.reading_thread = threading.Thread(target=self._read_audio, daemon=True)
+            self.reading_thread.start()
         
         # Démarrage du thread de traitement
         self.processing_thread = threading.Thread(target=self._process_audio)
@@ -153,13 +697,23 @@ class WakeWordDetector:
             self.processing_thread.join()
         
         # Fermeture du stream
+        if self.capture:
+            self.capture.unsubscribe(self._on_capture_chunk)
+        if self.reading_thread:
+            self.reading_thread.join(timeout=2.0)
+            self.reading_thread = None
         if self.stream:
-            self.stream.stop_stream()
             self.stream.close()
+            self.stream = None
         
         # Vidage de la queue
         while not self.audio_queue.empty():
             self.audio_queue.get()
+
+        # Les callbacks en cours se terminent d'eux-mêmes, ceux en attente sont annulés
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         
         self.logger.info("Détecteur arrêté")
     
@@ -175,5 +729,5 @@ class WakeWordDetector:
     def cleanup(self):
         """Nettoyage des ressources."""
         self.stop()
-        if hasattr(self, 'audio'):
-            self.audio.terminate()
\ No newline at end of file
+        if self._owns_source:
+            self.source.terminate()
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+Offline evaluation of the wake word models over labeled WAV corpora.
+
+Usage:
+    python -m wakeword_eval --model alexa --positives data/alexa/ --negatives data/background/
+    python -m wakeword_eval --model alexa --positives pos.txt --negatives neg.jsonl \
+        --frameworks onnx tflite --thresholds 0.1 0.9 0.05 -o report.json
+
+Every file is streamed in 80 ms chunks through openWakeWord's Model.predict as fast
+as possible, and the scores are run through the same WakeWordTrigger logic as the
+live detector. The report gives, per inference framework, the false accepts per
+hour (negatives) and the false reject rate (positives) at each threshold, the
+per-frame inference latency percentiles and the real-time factor.
+
+With --gate on (or both), frames also go through the detector's EnergyGate:
+silent frames are not scored and the skipped audio is replayed into the feature
+buffers when the gate opens, exactly as in the live detector. The report then
+gives the duty cycle, and the sweep shows the accuracy cost of gating.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from audio_source import load_wav
+from resampler import StreamingResampler
+from stt_batch import read_inputs
+from wakeword_detector import EnergyGate, WakeWordTrigger, prime_features
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 1280  # 80 ms, the openWakeWord frame
+FRAME_SECONDS = CHUNK_SIZE / SAMPLE_RATE
+
+
+def load_clip(path: str, pad_seconds: float = 0.0) -> np.ndarray:
+    """
+    Load a WAV file as 16 kHz int16 mono, optionally padded with silence on both sides.
+
+    Args:
+        path (str): WAV file.
+        pad_seconds (float): Silence added before and after (short positive clips).
+
+    Returns:
+        np.ndarray: int16 samples.
+    """
+    samples, sample_rate = load_wav(path)
+    if sample_rate != SAMPLE_RATE:
+        resampler = StreamingResampler(sample_rate, SAMPLE_RATE)
+        samples = np.concatenate([resampler.process(samples), resampler.flush()])
+    if pad_seconds:
+        pad = np.zeros(int(pad_seconds * SAMPLE_RATE), dtype=np.int16)
+        samples = np.concatenate([pad, samples, pad])
+    return samples
+
+
+def score_corpus(model, entries: list[dict], wakeword: str | None, pad_seconds: float,
+                 gate_settings: dict | None = None) -> dict:
+    """
+    Stream every file through Model.predict.
+
+    Args:
+        model: openWakeWord Model.
+        entries (list[dict]): {"path"} entries (see stt_batch.read_inputs).
+        wakeword (str | None): Prediction key to evaluate. Default: the first one returned.
+        pad_seconds (float): Silence added around each file.
+        gate_settings (dict | None): EnergyGate arguments. None: every frame is scored.
+            Gated frames get a score of 0.
+
+    Returns:
+        dict: "scores" (one array of frame scores per file), "latencies" (seconds per frame),
+            "audio_seconds", "computed_frames" (frames fed to the model, scored or replayed),
+            "failed" (paths that could not be read).
+    """
+    scores, latencies, failed = [], [], []
+    audio_seconds = 0.0
+    computed_frames = 0
+    for entry in entries:
+        try:
+            samples = load_clip(entry["path"], pad_seconds)
+        except Exception as e:
+            print(f"❌ {entry['path']}: {type(e).__name__}: {e}")
+            failed.append(entry["path"])
+            continue
+        model.reset()
+        # One gate per file: its noise floor must not depend on the previous file
+        gate = EnergyGate(sample_rate=SAMPLE_RATE, chunk_size=CHUNK_SIZE, **gate_settings) \
+            if gate_settings is not None else None
+        n_frames = len(samples) // CHUNK_SIZE
+        file_scores = np.zeros(n_frames, dtype=np.float32)
+        for i in range(n_frames):
+            chunk = samples[i * CHUNK_SIZE:(i + 1) * CHUNK_SIZE]
+            start = time.perf_counter()
+            frames = gate.filter(i, chunk) if gate else [(i, chunk, True)]
+            for _, audio, scored in frames:
+                if not scored:
+                    prime_features(model, audio)
+                    continue
+                predictions = model.predict(audio)
+                if wakeword is None:
+                    wakeword = next(iter(predictions))
+                file_scores[i] = predictions[wakeword]
+            latencies.append(time.perf_counter() - start)
+            computed_frames += len(frames)
+        scores.append(file_scores)
+        audio_seconds += n_frames * FRAME_SECONDS
+    return {"scores": scores, "latencies": latencies, "audio_seconds": audio_seconds,
+            "computed_frames": computed_frames, "failed": failed}
+
+
+def count_detections(scores: np.ndarray, trigger_settings: dict) -> int:
+    """
+    Replay the frame scores of one file through a fresh WakeWordTrigger.
+
+    Args:
+        scores (np.ndarray): Frame scores.
+        trigger_settings (dict): WakeWordTrigger arguments, including the threshold.
+
+    Returns:
+        int: Number of detections.
+    """
+    trigger = WakeWordTrigger(**trigger_settings)
+    return sum(trigger.update(score, i * FRAME_SECONDS) is not None for i, score in enumerate(scores))
+
+
+def sweep(positives: dict, negatives: dict, thresholds: list[float], trigger_settings: dict) -> list[dict]:
+    """
+    False reject rate and false accepts per hour at each threshold.
+
+    Args:
+        positives (dict): score_corpus() result of the positive corpus.
+        negatives (dict): score_corpus() result of the negative corpus.
+        thresholds (list[float]): Thresholds to evaluate.
+        trigger_settings (dict): patience, smoothing and refractory.
+
+    Returns:
+        list[dict]: One {"threshold", "frr", "false_accepts", "fa_per_hour"} row per threshold.
+    """
+    negative_hours = negatives["audio_seconds"] / 3600
+    rows = []
+    for threshold in thresholds:
+        settings = {**trigger_settings, "threshold": threshold}
+        missed = sum(count_detections(s, settings) == 0 for s in positives["scores"])
+        false_accepts = sum(count_detections(s, settings) for s in negatives["scores"])
+        rows.append({
+            "threshold": round(threshold, 4),
+            "frr": round(missed / len(positives["scores"]), 4) if positives["scores"] else None,
+            "false_accepts": false_accepts,
+            "fa_per_hour": round(false_accepts / negative_hours, 3) if negative_hours else None,
+        })
+    return rows
+
+
+def cost(results: list[dict]) -> dict:
+    """
+    Per-frame inference latency and real-time factor over every scored corpus.
+
+    Args:
+        results (list[dict]): score_corpus() results.
+
+    Returns:
+        dict: Frames, duty cycle (frames fed to the model), latency percentiles (ms) and real-time factor.
+    """
+    latencies = np.array([latency for r in results for latency in r["latencies"]]) * 1000
+    audio_seconds = sum(r["audio_seconds"] for r in results)
+    if not len(latencies):
+        return {"frames": 0}
+    return {
+        "frames": len(latencies),
+        "duty_cycle": round(sum(r["computed_frames"] for r in results) / len(latencies), 4),
+        "latency_ms_mean": round(float(latencies.mean()), 3),
+        "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+        "latency_ms_p99": round(float(np.percentile(latencies, 99)), 3),
+        # Compute time per second of audio
+        "rtf": round(float(latencies.sum()) / 1000 / audio_seconds, 5) if audio_seconds else None,
+    }
+
+
+def evaluate_framework(framework: str, args, positive_entries: list[dict], negative_entries: list[dict]) -> list[dict]:
+    from openwakeword.model import Model
+
+    print(f"⚙️ {framework}: loading {args.model}...")
+    model = Model(wakeword_models=[args.model], inference_framework=framework)
+    thresholds = [float(t) for t in np.arange(args.thresholds[0], args.thresholds[1] + 1e-9, args.thresholds[2])]
+    trigger_settings = {"patience": args.patience, "smoothing": args.smoothing, "refractory": args.refractory}
+    gate_settings = {"min_threshold": args.gate_min_threshold, "hangover": args.gate_hangover, "replay": args.gate_replay}
+
+    reports = []
+    for gated in {"off": (False,), "on": (True,), "both": (False, True)}[args.gate]:
+        settings = gate_settings if gated else None
+        positives = score_corpus(model, positive_entries, args.wakeword, args.pad, settings)
+        negatives = score_corpus(model, negative_entries, args.wakeword, 0.0, settings)
+        reports.append({
+            "framework": framework,
+            "gate": settings,
+            "positive_files": len(positives["scores"]),
+            "negative_hours": round(negatives["audio_seconds"] / 3600, 4),
+            "failed": positives["failed"] + negatives["failed"],
+            "cost": cost([positives, negatives]),
+            "sweep": sweep(positives, negatives, thresholds, trigger_settings),
+        })
+    return reports
+
+
+def print_report(report: dict) -> None:
+    cost_info = report["cost"]
+    label = f"{report['framework']}, energy gate" if report["gate"] else report["framework"]
+    print(f"\n📊 {label}: {report['positive_files']} positives, "
+          f"{report['negative_hours']:.2f} h of negatives")
+    if cost_info["frames"]:
+        print(f"   latency p50 {cost_info['latency_ms_p50']:.2f} ms, p95 {cost_info['latency_ms_p95']:.2f} ms, "
+              f"p99 {cost_info['latency_ms_p99']:.2f} ms, RTF {cost_info['rtf']:.4f}, "
+              f"duty cycle {cost_info['duty_cycle']:.2f}")
+    print("   threshold    FRR   FA/hour")
+    for row in report["sweep"]:
+        frr = f"{row['frr']:.3f}" if row["frr"] is not None else "  -  "
+        fa = f"{row['fa_per_hour']:.2f}" if row["fa_per_hour"] is not None else "-"
+        print(f"   {row['threshold']:9.2f}  {frr}  {fa:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate wake word accuracy and cost over WAV corpora.")
+    parser.add_argument("--model", default="alexa", help="openWakeWord model name or path.")
+    parser.add_argument("--wakeword", default=None, help="Prediction key to evaluate. Default: the model's first one.")
+    parser.add_argument("--positives", type=Path, default=None,
+                        help="Clips containing the wake word once: directory or .txt / .jsonl manifest.")
+    parser.add_argument("--negatives", type=Path, default=None,
+                        help="Audio without the wake word: directory or .txt / .jsonl manifest.")
+    parser.add_argument("--frameworks", nargs="+", choices=("onnx", "tflite"), default=["onnx"],
+                        help="Inference frameworks to compare.")
+    parser.add_argument("--thresholds", nargs=3, type=float, default=[0.1, 0.9, 0.1], metavar=("START", "STOP", "STEP"),
+                        help="Threshold sweep.")
+    parser.add_argument("--patience", type=int, default=1, help="Frames above the threshold before a detection.")
+    parser.add_argument("--smoothing", type=int, default=1, help="Moving average length of the score, in frames.")
+    parser.add_argument("--refractory", type=float, default=2.0, help="Seconds ignored after a detection.")
+    parser.add_argument("--gate", choices=("off", "on", "both"), default="both",
+                        help="Evaluate without and/or with the detector's energy gate.")
+    parser.add_argument("--gate-min-threshold", type=float, default=100, help="Minimum RMS opening the gate.")
+    parser.add_argument("--gate-hangover", type=float, default=1.0, help="Seconds the gate stays open after sound.")
+    parser.add_argument("--gate-replay", type=float, default=EnergyGate.FEATURE_CONTEXT,
+                        help="Seconds of skipped audio replayed into the features when the gate opens.")
+    parser.add_argument("--pad", type=float, default=1.0, help="Seconds of silence added around each positive clip.")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="Optional JSON file for the report.")
+    args = parser.parse_args()
+
+    positive_entries = read_inputs(args.positives) if args.positives else []
+    negative_entries = read_inputs(args.negatives) if args.negatives else []
+    if not positive_entries and not negative_entries:
+        print("❌ No WAV files found (use --positives and/or --negatives)")
+        return
+
+    reports = []
+    for framework in args.frameworks:
+        try:
+            framework_reports = evaluate_framework(framework, args, positive_entries, negative_entries)
+        except Exception as e:
+            print(f"❌ {framework}: {type(e).__name__}: {e}")
+            continue
+        for report in framework_reports:
+            print_report(report)
+        reports.extend(framework_reports)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()